@@ -1,13 +1,24 @@
 # menuprincipal.py (VERSÃO FINAL, OTIMIZADA E COMPLETA)
 
-import os
 import sys
+# Antes das demais importações, para que elas também sejam medidas
+import perfil_inicializacao
+if "--profile-startup" in sys.argv:
+    perfil_inicializacao.ativar()
+
+import os
+import queue
+import hashlib
+import threading
+import functools
 import importlib
+import multiprocessing
 import customtkinter as ctk
-from tkinter import messagebox, filedialog
-from PIL import Image
-from customtkinter import CTkImage
+from tkinter import messagebox, filedialog, simpledialog
 import traceback
+import progresso
+import resultados
+from cache_paginas import pasta_de_cache
 
 # --- IDENTIDADE VISUAL ---
 COLORS = {
@@ -16,6 +27,25 @@ COLORS = {
 }
 FONTS = {"title": ("Segoe UI", 30, "bold"), "button": ("Segoe UI", 12, "bold"), "status": ("Segoe UI", 12)}
 
+# --- DIÁLOGOS QUE OS CONVERSORES PODEM ABRIR A PARTIR DA THREAD DE CONVERSÃO ---
+DIALOGOS_TK = {
+    filedialog: ("askopenfilename", "askopenfilenames", "asksaveasfilename", "askdirectory"),
+    messagebox: ("showinfo", "showwarning", "showerror", "askyesno", "askokcancel"),
+    simpledialog: ("askstring", "askinteger", "askfloat"),
+}
+INTERVALO_FILA_MS = 100
+
+# --- ÍCONES E PRÉ-CARREGAMENTO ---
+TAMANHO_ICONE = (28, 28)
+# Os PNGs originais têm até 4096 px; o cache guarda uma cópia reduzida (2x, para telas com escala)
+ESCALA_CACHE_ICONE = 2
+# Depois que a janela aparece, os conversores são importados em segundo plano para que o
+# primeiro clique não pague a importação do pandas, pdfplumber, camelot (OpenCV), etc.
+ATRASO_PRECARGA_MS = 300
+MODULOS_BASE_PRECARGA = ("pandas", "pdfplumber")
+# Importado só dentro do conversor do Itaú, mas é a importação mais cara
+MODULOS_EXTRAS_PRECARGA = ("camelot",)
+
 # --- DICIONÁRIO DE CONFIGURAÇÃO DOS CONVERSORES ---
 CONVERTERS = {
     "bb": {
@@ -46,6 +76,49 @@ CONVERTERS = {
     "ofx": { "nome": "Converter Arquivo(s) OFX para Excel", "icone": None, "aba": "ofx", "type": "ofx" },
 }
 
+def modulos_para_precarga():
+    """Módulos importados em segundo plano após a abertura da janela, na ordem dos botões."""
+    modulos = list(MODULOS_BASE_PRECARGA)
+    for key, config in CONVERTERS.items():
+        if config.get('enabled') is False: continue
+        if config["type"] == "model_choice":
+            modulos += [f"conversor_{key}mod{modelo[-1]}" for modelo in config["model_config"]["opcoes"]]
+        elif config["type"] == "itau_special":
+            modulos.append("conversor_itau")
+        elif config["type"] == "ofx":
+            modulos.append("conversor_ofx")
+        else:
+            modulos.append(config["module"])
+    return list(dict.fromkeys(modulos + list(MODULOS_EXTRAS_PRECARGA)))
+
+def carregar_icone(caminho, tamanho=TAMANHO_ICONE):
+    """
+    Imagem do ícone já reduzida. A cópia reduzida fica em cache em disco, identificada pelo
+    conteúdo do PNG original, e as execuções seguintes não decodificam a imagem grande.
+    """
+    from PIL import Image
+
+    with open(caminho, "rb") as arquivo:
+        conteudo = arquivo.read()
+    reduzido = tuple(lado * ESCALA_CACHE_ICONE for lado in tamanho)
+    nome = f"{hashlib.sha1(conteudo).hexdigest()[:16]}_{reduzido[0]}x{reduzido[1]}.png"
+    caminho_cache = os.path.join(pasta_de_cache(), "icones", nome)
+    try:
+        with Image.open(caminho_cache) as imagem:
+            return imagem.copy()
+    except OSError:
+        pass
+    with Image.open(caminho) as original:
+        imagem = original.convert("RGBA").resize(reduzido, Image.LANCZOS)
+    try:
+        os.makedirs(os.path.dirname(caminho_cache), exist_ok=True)
+        temporario = f"{caminho_cache}.{os.getpid()}.tmp"
+        imagem.save(temporario, format="PNG")
+        os.replace(temporario, caminho_cache)
+    except OSError as e:
+        print(f"Não foi possível gravar o ícone em cache: {e}")
+    return imagem
+
 # --- CLASSE DE BOTÃO PARA ESTILO CONSISTENTE ---
 class ModernButton(ctk.CTkButton):
     def __init__(self, master, **kwargs):
@@ -65,23 +138,59 @@ class ConversorApp(ctk.CTk):
         self.resizable(False, False)
         
         self.base_path = self._get_base_path()
-        self.icons = self._load_icons()
+        self.icons = {}
+        self.botoes = {}
+        self._fila_ui = queue.Queue()
+        self._progresso = None
+        self._instalar_dialogos_na_ui()
         self._create_widgets()
+        # A janela aparece primeiro; ícones e conversores são carregados em seguida
+        self.after_idle(self._apos_exibir_janela)
 
     def _get_base_path(self):
         try: return sys._MEIPASS
         except AttributeError: return os.path.dirname(os.path.abspath(__file__))
 
-    def _load_icons(self):
-        icons = {}
-        for key, config in CONVERTERS.items():
-            if not config.get("icone"): continue
+    def _apos_exibir_janela(self):
+        perfil_inicializacao.marcar("janela exibida")
+        self._load_icons(iter([k for k, c in CONVERTERS.items() if c.get("icone")]))
+        self.after(ATRASO_PRECARGA_MS, self._iniciar_precarga)
+
+    def _load_icons(self, pendentes):
+        # Um ícone por ciclo do mainloop, para a janela continuar respondendo na primeira execução (sem cache)
+        key = next(pendentes, None)
+        if key is None:
+            perfil_inicializacao.marcar("ícones carregados")
+            return
+        try:
+            image = carregar_icone(os.path.join(self.base_path, CONVERTERS[key]['icone']))
+            self.icons[key] = ctk.CTkImage(dark_image=image, light_image=image, size=TAMANHO_ICONE)
+            self.botoes[key].configure(image=self.icons[key])
+        except Exception as e: print(f"Erro ao carregar ícone para '{key}': {e}")
+        self.after(1, self._load_icons, pendentes)
+
+    def _iniciar_precarga(self):
+        precarga = threading.Thread(target=self._precarregar_modulos, name="pré-carregamento", daemon=True)
+        precarga.start()
+        if perfil_inicializacao.ativo():
+            self.after(INTERVALO_FILA_MS, self._mostrar_perfil, precarga)
+
+    def _precarregar_modulos(self):
+        """Roda em segundo plano; um clique durante a importação apenas espera ela terminar."""
+        for nome in modulos_para_precarga():
             try:
-                path = os.path.join(self.base_path, config['icone'])
-                image = Image.open(path)
-                icons[key] = CTkImage(dark_image=image, light_image=image, size=(28, 28))
-            except Exception as e: print(f"Erro ao carregar ícone para '{key}': {e}")
-        return icons
+                perfil_inicializacao.importar(nome)
+            except Exception as e:
+                # A falha reaparece (com a janela de erro) quando o conversor for usado
+                print(f"Pré-carregamento de '{nome}' falhou: {e}")
+        perfil_inicializacao.marcar("pré-carregamento concluído")
+
+    def _mostrar_perfil(self, precarga):
+        if precarga.is_alive():
+            self.after(INTERVALO_FILA_MS, self._mostrar_perfil, precarga)
+            return
+        caminho = perfil_inicializacao.mostrar_relatorio(pasta_de_cache())
+        if caminho: self.update_status(f"Perfil de inicialização salvo em {caminho}")
 
     def _create_widgets(self):
         container = ctk.CTkFrame(self, fg_color="transparent")
@@ -109,6 +218,7 @@ class ConversorApp(ctk.CTk):
                              image=self.icons.get(key), command=lambda k=key: self.processar_conversao(k))
             if config.get('enabled') is False: btn.configure(state="disabled", fg_color=COLORS["disabled"])
             btn.grid(row=row, column=col, padx=15, pady=12, sticky="ew")
+            self.botoes[key] = btn
         self.frame_botoes_pdf.grid_columnconfigure((0, 1), weight=1)
 
         for key, config in ofx_buttons.items():
@@ -116,9 +226,14 @@ class ConversorApp(ctk.CTk):
                              command=lambda k=key: self.processar_conversao(k),
                              anchor="center", fg_color="#27AE60", hover_color="#2ECC71")
             btn.pack(fill="x", padx=10, pady=10)
+            self.botoes[key] = btn
             
         self.status_label = ctk.CTkLabel(container, text="Pronto para iniciar.", font=FONTS["status"], text_color=COLORS["text"])
         self.status_label.pack(pady=(20, 0), side="bottom", fill="x")
+        # Só aparece enquanto uma conversão está em andamento
+        self.cancel_button = ctk.CTkButton(container, text="Cancelar", font=FONTS["button"], fg_color=COLORS["error"],
+                                           hover_color=COLORS["warning"], text_color=COLORS["text"], height=32,
+                                           command=self.cancelar_conversao)
 
     def _set_buttons_state(self, new_state: str):
         for frame in [self.frame_botoes_pdf, self.frame_botoes_ofx]:
@@ -128,25 +243,114 @@ class ConversorApp(ctk.CTk):
                     widget.configure(state=new_state)
 
     def update_status(self, message, color=None):
+        if threading.current_thread() is not threading.main_thread():
+            self._fila_ui.put(("chamada", functools.partial(self.update_status, message, color)))
+            return
         self.status_label.configure(text=message, text_color=color or COLORS["text"])
         self.update_idletasks()
 
+    # --- COMUNICAÇÃO ENTRE A THREAD DE CONVERSÃO E A INTERFACE ---
+    def _chamar_na_ui(self, func, *args, **kwargs):
+        """Executa func na thread do Tk e devolve o resultado (bloqueia a thread de conversão até lá)."""
+        if threading.current_thread() is threading.main_thread():
+            return func(*args, **kwargs)
+        concluido = threading.Event()
+        resultado = {}
+        def executar():
+            try: resultado["valor"] = func(*args, **kwargs)
+            except Exception as e: resultado["erro"] = e
+            finally: concluido.set()
+        self._fila_ui.put(("chamada", executar))
+        concluido.wait()
+        if "erro" in resultado: raise resultado["erro"]
+        return resultado.get("valor")
+
+    def _instalar_dialogos_na_ui(self):
+        # Os conversores chamam filedialog/messagebox diretamente; o Tk não pode ser usado fora da sua thread.
+        for modulo, nomes in DIALOGOS_TK.items():
+            for nome in nomes:
+                original = getattr(modulo, nome)
+                setattr(modulo, nome, functools.wraps(original)(functools.partial(self._chamar_na_ui, original)))
+
+    def _processar_fila_ui(self):
+        ultimo_progresso = None
+        try:
+            while True:
+                tipo, *dados = self._fila_ui.get_nowait()
+                if tipo == "progresso":
+                    # Só o estado mais recente é desenhado a cada ciclo
+                    ultimo_progresso = dados[0]
+                elif tipo == "chamada":
+                    dados[0]()
+                elif tipo == "fim":
+                    self._finalizar_conversao(*dados)
+                    return
+        except queue.Empty:
+            pass
+        if ultimo_progresso:
+            self._mostrar_progresso(ultimo_progresso)
+        self.after(INTERVALO_FILA_MS, self._processar_fila_ui)
+
+    def _mostrar_progresso(self, dados):
+        texto = f"Página {dados['paginas']}/{dados['total']}"
+        if dados["linhas"] is not None:
+            texto += f" · {dados['linhas']} linha(s)"
+        texto += f" · {dados['tempo']:.0f}s"
+        if self._progresso is not None and self._progresso.cancelado:
+            texto = "Cancelando... " + texto
+        self.status_label.configure(text=texto, text_color=COLORS["warning"])
+
+    def cancelar_conversao(self):
+        if self._progresso is not None:
+            self._progresso.cancelar()
+            self.cancel_button.configure(state="disabled")
+            self.status_label.configure(text="Cancelando após a página atual...", text_color=COLORS["warning"])
+
     def processar_conversao(self, key):
         self._set_buttons_state("disabled")
         self.update_status(f"Iniciando: {CONVERTERS[key]['nome']}", COLORS["warning"])
-        
+        self._progresso = progresso.Progresso(self._fila_ui)
+        self.cancel_button.configure(state="normal")
+        self.cancel_button.pack(pady=(10, 0), side="bottom")
+
+        threading.Thread(target=self._executar_conversao, args=(key, self._progresso), daemon=True).start()
+        self.after(INTERVALO_FILA_MS, self._processar_fila_ui)
+
+    def _executar_conversao(self, key, acompanhamento):
+        """Roda na thread de conversão; o desfecho volta para a interface pela fila."""
+        with progresso.em_uso(acompanhamento):
+            try:
+                desfecho = ("sucesso", self.run_converter(key))
+            except progresso.ConversaoCancelada:
+                desfecho = ("cancelado", "")
+            except UserWarning as e:
+                desfecho = ("cancelado", str(e))
+            except Exception:
+                desfecho = ("erro", traceback.format_exc())
+        self._fila_ui.put(("fim", key, *desfecho))
+
+    def _finalizar_conversao(self, key, tipo, detalhe):
+        self._progresso = None
+        self.cancel_button.pack_forget()
         try:
-            success = self.run_converter(key)
-            if success:
-                self.update_status("Processo concluído com sucesso!", COLORS["success"])
-                messagebox.showinfo("Sucesso", f"Conversão de '{CONVERTERS[key]['nome']}' concluída com sucesso!")
-        except UserWarning as e:
-            self.update_status("Operação cancelada pelo usuário.", COLORS["warning"])
-            if str(e): messagebox.showwarning("Operação Cancelada", str(e))
-        except Exception:
-            error_details = traceback.format_exc()
-            messagebox.showerror("Erro Crítico na Execução", f"Ocorreu um erro inesperado:\n\n{error_details}")
-            self.update_status("Ocorreu um erro crítico.", COLORS["error"])
+            if tipo == "sucesso":
+                if isinstance(detalhe, list):
+                    # Conversão de vários arquivos: um relatório único com o resultado de cada um
+                    falhas = sum(r["status"] != "ok" for r in detalhe)
+                    if falhas:
+                        self.update_status(f"Concluído com {falhas} arquivo(s) com falha.", COLORS["warning"])
+                    else:
+                        self.update_status("Processo concluído com sucesso!", COLORS["success"])
+                    resultados.mostrar_relatorio(detalhe, CONVERTERS[key]['nome'])
+                elif detalhe:
+                    self.update_status("Processo concluído com sucesso!", COLORS["success"])
+                    messagebox.showinfo("Sucesso", f"Conversão de '{CONVERTERS[key]['nome']}' concluída com sucesso!")
+            elif tipo == "cancelado":
+                self.update_status("Operação cancelada pelo usuário.", COLORS["warning"])
+                if detalhe: messagebox.showwarning("Operação Cancelada", detalhe)
+            else:
+                messagebox.showerror("Erro Crítico na Execução", f"Ocorreu um erro inesperado:\n\n{detalhe}")
+                self.update_status("Ocorreu um erro crítico.", COLORS["error"])
         finally:
             self._set_buttons_state("normal")
 
@@ -156,42 +360,26 @@ class ConversorApp(ctk.CTk):
         
         if handler_type == "ofx":
             return self._run_ofx_converter()
-
-        self.withdraw()
-        try:
-            if handler_type == "model_choice":
-                return self._run_model_choice_converter(key, config)
-            elif handler_type == "single_file":
-                return self._run_single_file_converter(key, config)
-            elif handler_type == "multi_file":
-                return self._run_multi_file_converter(key, config)
-            elif handler_type == "itau_special":
-                return self._run_itau_converter(key, config)
-            elif handler_type == "simple_run":
-                return self._run_simple_converter(key, config)
-        finally:
-            if self.winfo_exists():
-                self.deiconify()
+        elif handler_type == "model_choice":
+            return self._run_model_choice_converter(key, config)
+        elif handler_type == "single_file":
+            return self._run_single_file_converter(key, config)
+        elif handler_type == "multi_file":
+            return self._run_multi_file_converter(key, config)
+        elif handler_type == "itau_special":
+            return self._run_itau_converter(key, config)
+        elif handler_type == "simple_run":
+            return self._run_simple_converter(key, config)
 
     def _run_ofx_converter(self):
-        from ofxparse import OfxParser
-        from openpyxl import Workbook
+        module = importlib.import_module("conversor_ofx")
         caminhos = filedialog.askopenfilenames(title="Selecione os arquivos OFX", filetypes=[("Arquivos OFX", "*.ofx")])
         if not caminhos: raise UserWarning("")
-        wb = Workbook(); wb.remove(wb.active)
-        for path in caminhos:
-            self.update_status(f"Processando {os.path.basename(path)}...")
-            with open(path, 'r', encoding='latin-1', errors='ignore') as f:
-                ofx = OfxParser.parse(f)
-            ws = wb.create_sheet(title=os.path.splitext(os.path.basename(path))[0][:31])
-            ws.append(['Data', 'Descrição', 'Valor'])
-            for t in ofx.account.statement.transactions: ws.append([t.date.strftime('%d/%m/%Y'), t.memo, t.amount])
-        caminho_salvamento = os.path.splitext(caminhos[0])[0] + ".xlsx"
-        wb.save(caminho_salvamento)
+        module.converter_ofx(caminhos, ao_iniciar_arquivo=lambda path: self.update_status(f"Processando {os.path.basename(path)}..."))
         return True
 
     def _run_model_choice_converter(self, key, config):
-        modelo = self._escolher_modelo(config['model_config'])
+        modelo = self._chamar_na_ui(self._escolher_modelo, config['model_config'])
         if not modelo: raise UserWarning("")
         module_name = f"conversor_{key}mod{modelo[-1]}"
         module = importlib.import_module(module_name)
@@ -208,17 +396,16 @@ class ConversorApp(ctk.CTk):
 
     def _run_multi_file_converter(self, key, config):
         module = importlib.import_module(config['module'])
-        paths = module.selecionar_pdfs()
+        paths = self._chamar_na_ui(module.selecionar_pdfs)
         if not paths: raise UserWarning("")
-        for path in paths: module.extrair_texto_pdf(path)
-        return True
+        # As falhas ficam nos resultados e não interrompem os arquivos seguintes
+        return module.processar_pdfs(paths)
     
     def _run_itau_converter(self, key, config):
         path = filedialog.askopenfilename(title="Selecione o PDF do Itaú", filetypes=[("PDF files", "*.pdf")])
         if not path: raise UserWarning("")
-        itau_configs = {'flavor': 'stream', 'page_1': {'table_areas': ['149,257, 552,21'], 'columns': ['144,262, 204,262, 303,262, 351,262, 406,262, 418,262, 467,262, 506,262, 553,262']}, 'page_2_end': {'table_areas': ['151,760, 553,20'], 'columns': ['157,757, 173,757, 269,757, 309,757, 363,757, 380,757, 470,757, 509,757, 545,757']}}
         module = importlib.import_module("conversor_itau")
-        extractor = module.PDFTableExtractor(path, itau_configs)
+        extractor = module.PDFTableExtractor(path, module.DEFAULT_CONFIGS)
         extractor.start()
         return True
 
@@ -227,7 +414,8 @@ class ConversorApp(ctk.CTk):
         func = getattr(module, config['function'])
         success = func() 
         if not success: raise UserWarning("")
-        return True
+        # Conversores de vários arquivos devolvem a lista de resultados para o relatório
+        return success if isinstance(success, list) else True
 
     def _escolher_modelo(self, config_modelo):
         modelo_selecionado = ctk.StringVar()
@@ -246,5 +434,7 @@ class ConversorApp(ctk.CTk):
         return modelo_selecionado.get()
 
 if __name__ == "__main__":
+    # Necessário no executável do PyInstaller: conversores como o do Itaú usam processos trabalhadores
+    multiprocessing.freeze_support()
     app = ConversorApp()
     app.mainloop()
\ No newline at end of file
@@ -0,0 +1,119 @@
+"""
+Confere, com entradas aleatórias, que a conversão vetorizada de datas e saldos
+do conversor_caixa (parse_dates / clean_monetary_values) dá exatamente o mesmo
+resultado que as funções por linha (parse_date / clean_monetary_value), e mede
+as duas numa coluna grande.
+
+    python benchmarks/conversao_caixa.py --casos 2000 --linhas 50000
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import conversor_caixa  # noqa: E402
+from conversor_caixa import (DATE_FORMATS, clean_monetary_value, clean_monetary_values,  # noqa: E402
+                             parse_date, parse_dates)
+
+# Caracteres que aparecem (ou podem aparecer por engano) na coluna de saldo
+ALFABETO_SALDO = "0123456789.,-+DC dcXã"
+
+
+def gerar_saldo(aleatorio):
+    if aleatorio.random() < 0.6:
+        # Valor bem formado, com separador de milhar e indicador D/C
+        inteiro = f"{aleatorio.randint(0, 9999999):,}".replace(',', '.')
+        valor = f"{inteiro},{aleatorio.randint(0, 99):02d}"
+        return aleatorio.choice(['', '-', '+']) + valor + aleatorio.choice(['', 'D', ' D', 'C', ' C', '-'])
+    if aleatorio.random() < 0.1:
+        return "Não identificado"
+    return ''.join(aleatorio.choice(ALFABETO_SALDO) for _ in range(aleatorio.randint(0, 10)))
+
+
+def gerar_data(aleatorio, formato):
+    dia, mes, ano = aleatorio.randint(1, 31), aleatorio.randint(1, 12), aleatorio.randint(1990, 2035)
+    if aleatorio.random() < 0.05:
+        mes = aleatorio.randint(13, 99)  # data inválida
+    return formato.replace('%d', f"{dia:02d}").replace('%m', f"{mes:02d}").replace('%Y', f"{ano:04d}")
+
+
+def por_linha(datas, saldos, padrao):
+    """Conversão anterior: um apply por coluna, com as funções por linha."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            datas = datas.apply(lambda x: parse_date(x, padrao))
+        except Exception:
+            pass  # process_transactions mantinha as datas como texto
+        saldos = saldos.apply(clean_monetary_value)
+    return datas, saldos
+
+
+def vetorizada(datas, saldos, padrao):
+    convertidas, invalidas = parse_dates(datas, padrao)
+    if not (padrao in DATE_FORMATS and invalidas.any()):
+        datas = convertidas
+    return datas, clean_monetary_values(saldos)[0]
+
+
+def conferir(casos, semente):
+    aleatorio = random.Random(semente)
+    padroes = list(DATE_FORMATS) + [None]
+    for caso in range(casos):
+        padrao = aleatorio.choice(padroes)
+        formato = DATE_FORMATS.get(padrao) or aleatorio.choice(conversor_caixa.FALLBACK_DATE_FORMATS)
+        linhas = aleatorio.randint(1, 30)
+        datas = pd.Series([gerar_data(aleatorio, formato) for _ in range(linhas)])
+        saldos = pd.Series([gerar_saldo(aleatorio) for _ in range(linhas)])
+
+        esperado = por_linha(datas, saldos, padrao)
+        obtido = vetorizada(datas, saldos, padrao)
+        for nome, a, b in zip(('datas', 'saldos'), esperado, obtido):
+            if a.dtype != b.dtype or not a.equals(b):
+                print(f"ERRO no caso {caso} ({nome}, padrão {padrao}):")
+                print(pd.DataFrame({'entrada': datas if nome == 'datas' else saldos, 'por_linha': a, 'vetorizada': b}))
+                return False
+    return True
+
+
+def medir(linhas, semente):
+    aleatorio = random.Random(semente)
+    padrao = r'\d{2}/\d{2}/\d{4}'
+    datas = pd.Series([f"{aleatorio.randint(1, 28):02d}/{aleatorio.randint(1, 12):02d}/2024" for _ in range(linhas)])
+    saldos = pd.Series([gerar_saldo(aleatorio) for _ in range(linhas)])
+
+    inicio = time.perf_counter()
+    por_linha(datas, saldos, padrao)
+    tempo_por_linha = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    vetorizada(datas, saldos, padrao)
+    tempo_vetorizada = time.perf_counter() - inicio
+
+    print(f"{linhas} linhas")
+    print(f"  por linha:  {tempo_por_linha * 1000:8.1f} ms")
+    print(f"  vetorizada: {tempo_vetorizada * 1000:8.1f} ms  ({tempo_por_linha / tempo_vetorizada:.1f}x)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--casos', type=int, default=2000)
+    parser.add_argument('--linhas', type=int, default=50000)
+    parser.add_argument('--semente', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if not conferir(args.casos, args.semente):
+        return 1
+    print(f"{args.casos} casos aleatórios: resultados idênticos")
+    medir(args.linhas, args.semente)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+Gera extratos OFX mensais sintéticos (SGML e XML, alguns com duas contas),
+converte todos numa única planilha com um processo e com vários, confere que
+as duas pastas têm as mesmas planilhas, na mesma ordem e com as mesmas linhas,
+e mostra os tempos.
+
+    python benchmarks/conversao_ofx.py --arquivos 100 --transacoes 3000 --workers 4
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+from openpyxl import load_workbook
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from conversor_ofx import converter_ofx  # noqa: E402
+
+CABECALHO_SGML = ("OFXHEADER:100\nDATA:OFXSGML\nVERSION:102\nSECURITY:NONE\nENCODING:USASCII\n"
+                  "CHARSET:1252\nCOMPRESSION:NONE\nOLDFILEUID:NONE\nNEWFILEUID:NONE\n\n")
+CABECALHO_XML = '<?xml version="1.0" encoding="UTF-8"?>\n<?OFX OFXHEADER="200" VERSION="211"?>\n'
+HISTORICOS = ["PIX RECEBIDO", "PIX ENVIADO", "Compra & Cia", "TARIFA Ação", "TED 123", "PAGAMENTO BOLETO"]
+
+
+def gerar_ofx(caminho, mes, transacoes, contas, sgml, aleatorio):
+    fechar = (lambda tag: "") if sgml else (lambda tag: f"</{tag}>")
+    partes = [CABECALHO_SGML if sgml else CABECALHO_XML, "<OFX>\n<BANKMSGSRSV1>\n"]
+    for conta in contas:
+        partes.append(f"<STMTTRNRS>\n<STMTRS>\n<CURDEF>BRL{fechar('CURDEF')}\n<BANKACCTFROM>\n"
+                      f"<BANKID>0336{fechar('BANKID')}\n<ACCTID>{conta}{fechar('ACCTID')}\n"
+                      f"</BANKACCTFROM>\n<BANKTRANLIST>\n")
+        for i in range(transacoes):
+            campos = [("TRNTYPE", aleatorio.choice(["DEBIT", "CREDIT"])),
+                      ("DTPOSTED", f"2025{mes:02d}{aleatorio.randint(1, 28):02d}120000[-3:BRT]"),
+                      ("TRNAMT", f"{aleatorio.choice(['-', ''])}{aleatorio.randint(0, 99999)}.{aleatorio.randint(0, 99):02d}"),
+                      ("FITID", str(i)),
+                      ("MEMO", aleatorio.choice(HISTORICOS).replace("&", "&amp;"))]
+            corpo = "".join(f"<{tag}>{valor}{fechar(tag)}\n" for tag, valor in campos)
+            partes.append(f"<STMTTRN>\n{corpo}</STMTTRN>\n")
+        partes.append("</BANKTRANLIST>\n</STMTRS>\n</STMTTRNRS>\n")
+    partes.append("</BANKMSGSRSV1>\n</OFX>\n")
+    with open(caminho, "w", encoding="utf-8", newline="\r\n") as arquivo:
+        arquivo.write("".join(partes))
+
+
+def gerar_arquivos(pasta, quantidade, transacoes, semente):
+    aleatorio = random.Random(semente)
+    caminhos = []
+    for i in range(quantidade):
+        contas = ("12345-6", "98765-4") if i % 10 == 0 else ("12345-6",)
+        caminho = os.path.join(pasta, f"extrato_{2015 + i // 12}_{i % 12 + 1:02d}.ofx")
+        gerar_ofx(caminho, i % 12 + 1, transacoes, contas, sgml=i % 3 != 0, aleatorio=aleatorio)
+        caminhos.append(caminho)
+    return caminhos
+
+
+def conteudo(caminho):
+    pasta = load_workbook(caminho, read_only=True)
+    try:
+        return [(nome, list(pasta[nome].values)) for nome in pasta.sheetnames]
+    finally:
+        pasta.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--arquivos', type=int, default=100)
+    parser.add_argument('--transacoes', type=int, default=3000, help="transações por conta em cada arquivo")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--semente', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminhos = gerar_arquivos(pasta, args.arquivos, args.transacoes, args.semente)
+        tempos = {}
+        for workers in (1, args.workers):
+            inicio = time.perf_counter()
+            converter_ofx(caminhos, os.path.join(pasta, f"saida_{workers}.xlsx"), max_workers=workers)
+            tempos[workers] = time.perf_counter() - inicio
+
+        if conteudo(os.path.join(pasta, "saida_1.xlsx")) != conteudo(os.path.join(pasta, f"saida_{args.workers}.xlsx")):
+            print("ERRO: as planilhas geradas com 1 e com vários processos são diferentes")
+            return 1
+
+    print(f"{args.arquivos} arquivos OFX: planilhas idênticas")
+    print(f"  1 processo:    {tempos[1]:8.1f} s")
+    print(f"  {args.workers} processo(s): {tempos[args.workers]:8.1f} s  ({tempos[1] / tempos[args.workers]:.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
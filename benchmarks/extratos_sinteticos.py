@@ -0,0 +1,433 @@
+"""
+Gera extratos sintéticos em PDF nos layouts que os conversores leem, com o
+número de páginas desejado (de 1 a alguns milhares), sem serviços externos nem
+bibliotecas além da padrão: o PDF é escrito aqui mesmo (Helvetica, WinAnsi),
+página por página, direto no disco.
+
+Os extratos têm valores no formato brasileiro (1.234,56), sufixos C/D ou
+sinais, históricos de mais de uma linha, saldos do dia e, nos layouts em que o
+conversor junta as linhas entre as páginas, lançamentos que começam numa página
+e terminam na seguinte. Os cabeçalhos seguem os dos extratos reais de cada
+banco (o período do C6 por extenso, por exemplo), para que versões anteriores
+dos conversores também leiam estes arquivos e as vazões possam ser comparadas
+entre commits.
+
+    python benchmarks/extratos_sinteticos.py pasta --paginas 1,10,100 --layouts sicoob1,bradesco
+"""
+
+import argparse
+import os
+import random
+import sys
+import zlib
+from datetime import date, timedelta
+
+LARGURA, ALTURA = 595, 842
+TOPO, BASE = 800, 40
+MARGEM = 40
+ALTURA_LINHA = 12
+TAMANHO_FONTE = 9
+INICIO_PERIODO = date(2025, 1, 1)
+FIM_PERIODO = date(2025, 12, 31)
+NOMES_MESES = ["janeiro", "fevereiro", "março", "abril", "maio", "junho", "julho", "agosto", "setembro",
+               "outubro", "novembro", "dezembro"]
+
+NOMES = ["MARIA DA CONCEIÇÃO SILVA", "JOÃO PEREIRA", "PADARIA SÃO JOSÉ LTDA", "ANA LÚCIA SOUZA",
+         "COMÉRCIO DE PEÇAS ARAÚJO", "JOSÉ ANTÔNIO LIMA", "FARMÁCIA POPULAR", "CONSTRUTORA ITAPUÃ S/A",
+         "LUÍS FERNANDO GONÇALVES", "SUPERMERCADO BOA ESPERANÇA"]
+CREDITOS = ["PIX RECEBIDO", "TED RECEBIDA", "DEPÓSITO EM DINHEIRO", "TRANSFERÊNCIA RECEBIDA", "CRÉDITO DE SALÁRIO"]
+DEBITOS = ["PIX ENVIADO", "PAGAMENTO DE BOLETO", "TARIFA BANCÁRIA", "COMPRA CARTÃO DÉBITO", "DÉBITO AUTOMÁTICO"]
+
+
+class EscritorPdf:
+    """PDF só com texto (Helvetica) e linhas, gravado página a página."""
+
+    def __init__(self, caminho):
+        self.arquivo = open(caminho, "wb")
+        self.posicoes = {}
+        self.paginas = []
+        self._escrever(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._objeto(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+
+    def _escrever(self, dados):
+        self.arquivo.write(dados)
+
+    def _objeto(self, numero, corpo):
+        self.posicoes[numero] = self.arquivo.tell()
+        self._escrever(b"%d 0 obj\n" % numero + corpo + b"\nendobj\n")
+
+    def pagina(self, textos, linhas=()):
+        """``textos``: (x, y, tamanho da fonte, texto); ``linhas``: (x1, y1, x2, y2)."""
+        partes = []
+        for x, y, tamanho, texto in textos:
+            literal = texto.encode("cp1252", "replace").replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+            partes.append(b"BT /F1 %d Tf %.2f %.2f Td (%s) Tj ET" % (tamanho, x, y, literal))
+        if linhas:
+            partes.append(b"0.5 w")
+            partes.extend(b"%.2f %.2f m %.2f %.2f l S" % linha for linha in linhas)
+        conteudo = zlib.compress(b"\n".join(partes))
+        numero = 4 + 2 * len(self.paginas)
+        self._objeto(numero + 1, b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(conteudo)
+                     + conteudo + b"\nendstream")
+        self._objeto(numero, b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Resources << /Font << /F1 3 0 R >> >> "
+                             b"/Contents %d 0 R >>" % (LARGURA, ALTURA, numero + 1))
+        self.paginas.append(numero)
+
+    def fechar(self):
+        self._objeto(2, b"<< /Type /Pages /Kids [%s] /Count %d >>"
+                     % (b" ".join(b"%d 0 R" % n for n in self.paginas), len(self.paginas)))
+        self._objeto(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        inicio_xref = self.arquivo.tell()
+        total = max(self.posicoes) + 1
+        self._escrever(b"xref\n0 %d\n0000000000 65535 f \n" % total)
+        for numero in range(1, total):
+            self._escrever(b"%010d 00000 n \n" % self.posicoes[numero])
+        self._escrever(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (total, inicio_xref))
+        self.arquivo.close()
+
+
+def brl(valor):
+    """1234.5 -> '1.234,50'"""
+    return f"{abs(valor):,.2f}".replace(",", "_").replace(".", ",").replace("_", ".")
+
+
+class Movimento:
+    """Sequência de lançamentos: datas crescentes dentro do período, valores e saldo corrente."""
+
+    def __init__(self, aleatorio, lancamentos_previstos):
+        self.aleatorio = aleatorio
+        dias = (FIM_PERIODO - INICIO_PERIODO).days
+        self.chance_novo_dia = min(1.0, dias / max(lancamentos_previstos, 1))
+        self.data = INICIO_PERIODO
+        self.saldo = 10000.0
+        self.primeiro = True
+        self.documento = aleatorio.randint(100000, 200000)
+
+    def proximo(self):
+        """(data, novo_dia, credito, valor, historico, nome, documento)"""
+        aleatorio = self.aleatorio
+        novo_dia = self.primeiro or (aleatorio.random() < self.chance_novo_dia and self.data < FIM_PERIODO)
+        if novo_dia and not self.primeiro:
+            self.data += timedelta(days=1)
+        self.primeiro = False
+        # Mais créditos com o saldo baixo, para ele não se afastar demais do inicial
+        credito = aleatorio.random() < (0.65 if self.saldo < 10000 else 0.35)
+        valor = round(10 ** aleatorio.uniform(0.5, 5.3), 2)
+        self.saldo += valor if credito else -valor
+        historico = aleatorio.choice(CREDITOS if credito else DEBITOS)
+        self.documento += aleatorio.randint(1, 9)
+        return self.data, novo_dia, credito, valor, historico, aleatorio.choice(NOMES), self.documento
+
+
+def _periodo():
+    return f"{INICIO_PERIODO:%d/%m/%Y} a {FIM_PERIODO:%d/%m/%Y}"
+
+
+def _extenso(data):
+    return f"{data.day} de {NOMES_MESES[data.month - 1]} de {data.year}"
+
+
+# Cada layout devolve um dict com:
+#   cabecalho / continuacao: linhas do topo da primeira página / das seguintes (ou função do Movimento que as devolve)
+#   registro(mov): (linhas de um lançamento, se é uma transação)
+#   final: linhas depois do último lançamento
+#   quebra: se um lançamento pode começar numa página e terminar na seguinte
+# Uma linha é um texto (na margem) ou uma lista de (x, texto); nos layouts com ``colunas``, uma tupla de
+# células posicionadas nas colunas da página.
+
+
+def _sicoob1():
+    def registro(mov):
+        data, novo_dia, credito, valor, historico, nome, doc = mov.proximo()
+        inicio = f"{data:%d/%m/%Y} " if novo_dia else ""
+        linhas = [f"{inicio}{doc} {historico} {brl(valor)}{'C' if credito else 'D'}"]
+        if mov.aleatorio.random() < 0.5:
+            linhas.append(nome)
+        return linhas
+    return {"cabecalho": ["SICOOB - SISTEMA DE COOPERATIVAS DE CRÉDITO DO BRASIL", "EXTRATO CONTA CORRENTE",
+                          f"PERÍODO: {_periodo()}", "COOPERATIVA: 3333 CONTA: 123.456-7",
+                          "DATA DOCUMENTO HISTÓRICO VALOR", "SALDO ANTERIOR 10.000,00C"],
+            "continuacao": ["EXTRATO CONTA CORRENTE"], "registro": registro,
+            "saldo_do_dia": lambda dia, saldo: [f"SALDO DO DIA {brl(saldo)}{'C' if saldo >= 0 else 'D'}"],
+            "final": ["SALDO DO DIA 0,00C"], "quebra": True}
+
+
+def _sicoob2():
+    def registro(mov):
+        data, _, credito, valor, historico, nome, doc = mov.proximo()
+        linhas = [f"{data:%d/%m} {historico} {brl(valor)}{'C' if credito else 'D'}"]
+        if mov.aleatorio.random() < 0.6:
+            linhas += [f"{'Pagador' if credito else 'Recebedor'}: {nome}", f"DOC.: {doc}"]
+        return linhas
+    return {"cabecalho": ["SICOOB", "EXTRATO DE CONTA CORRENTE", f"PERÍODO: {_periodo().replace(' a ', ' - ')}",
+                          "CONTA: 12.345-6", "HISTÓRICO DE MOVIMENTAÇÃO", "DATA HISTÓRICO VALOR",
+                          "SALDO ANTERIOR 10.000,00C"],
+            # O cabeçalho da movimentação só aparece na primeira página
+            "continuacao": [], "registro": registro,
+            "saldo_do_dia": lambda dia, saldo: [f"{dia:%d/%m} SALDO DO DIA {brl(saldo)}{'C' if saldo >= 0 else 'D'}"],
+            "final": ["RESUMO", "SALDO EM CONTA CORRENTE", "LIMITE DE CRÉDITO"], "quebra": True}
+
+
+def _bb1():
+    def registro(mov):
+        data, _, credito, valor, historico, nome, doc = mov.proximo()
+        inicio = f"{data:%d/%m/%Y} {mov.aleatorio.randint(0, 9999):04d} {doc} {historico}"
+        valor_texto = f"{brl(valor)} ({'+' if credito else '-'})"
+        if mov.aleatorio.random() < 0.5:
+            return [f"{inicio} {valor_texto}"]
+        return [f"{inicio}", f"{nome} {valor_texto}"]
+    return {"cabecalho": ["Extrato de Conta Corrente", "Cliente EMPRESA EXEMPLO LTDA", "Agência: 1234-5 Conta: 12345-6",
+                          "Dia Lote Documento Histórico Valor", "Saldo Anterior 10.000,00 (+)"],
+            "continuacao": ["Extrato de Conta Corrente", "Dia Lote Documento Histórico Valor"], "registro": registro,
+            "final": ["Saldo 0,00 (+)", "Informações Adicionais"], "quebra": True}
+
+
+def _bb2():
+    def registro(mov):
+        data, _, credito, valor, historico, nome, doc = mov.proximo()
+        linhas = [f"{data:%d/%m/%Y} {historico} {brl(valor)} {'C' if credito else 'D'}"]
+        if mov.aleatorio.random() < 0.6:
+            linhas += [nome, f"DOC {doc}"]
+        return linhas
+    return {"cabecalho": ["BANCO DO BRASIL", "Extrato conta corrente", "Agência 1234-5 Conta corrente 12345-6",
+                          "Lançamentos", "Dia Histórico Valor", "Saldo Anterior 10.000,00 C"],
+            "continuacao": ["Lançamentos (continuação)"], "registro": registro,
+            "final": ["SALDO 0,00 C"], "quebra": True}
+
+
+def _bradesco():
+    def registro(mov):
+        data, novo_dia, credito, valor, historico, nome, doc = mov.proximo()
+        inicio = f"{data:%d/%m/%Y} " if novo_dia else ""
+        numeros = f"{doc} {'' if credito else '-'}{brl(valor)} {'-' if mov.saldo < 0 else ''}{brl(mov.saldo)}"
+        if mov.aleatorio.random() < 0.5:
+            return [f"{inicio}{historico} {numeros}"]
+        return [f"{inicio}{historico}", numeros, f"REM: {nome}"]
+    return {"cabecalho": ["Bradesco Celular", "Extrato Mensal / Por Período", "Agência: 1234 | Conta: 12345-6",
+                          f"Período: {_periodo()}", "Data Lançamento Dcto. Crédito (R$) Débito (R$) Saldo (R$)"],
+            "continuacao": [], "registro": registro, "final": ["Total 0,00 0,00"], "quebra": True}
+
+
+def _pagbank():
+    def registro(mov):
+        data, _, credito, valor, historico, nome, doc = mov.proximo()
+        inicio = f"{data:%d/%m/%Y} {historico.capitalize()} - {nome}"
+        valor_texto = f"{'' if credito else '-'}R$ {brl(valor)}"
+        if mov.aleatorio.random() < 0.6:
+            return [f"{inicio} {valor_texto}"]
+        return [inicio, valor_texto]
+    return {"cabecalho": ["PagBank", "Extrato da conta", f"Período: {_periodo()}", "Data Descrição Valor"],
+            "continuacao": [], "registro": registro, "final": ["Saldo ao final do período"], "quebra": True}
+
+
+def _santander():
+    def registro(mov):
+        data, novo_dia, credito, valor, historico, nome, doc = mov.proximo()
+        inicio = f"{data:%d/%m/%Y} " if novo_dia else ""
+        valor_texto = f"{doc} {brl(valor)}{'' if credito else '-'}"
+        if mov.aleatorio.random() < 0.6:
+            return [f"{inicio}{historico} {nome} {valor_texto}"]
+        return [f"{inicio}{historico}", f"{nome} {valor_texto}"]
+    return {"cabecalho": ["SANTANDER", "Extrato de Conta Corrente", f"Período: {_periodo()}", "Conta Corrente",
+                          "Movimentação", "Data Descrição Nº Documento Movimentos (R$) Saldo (R$)",
+                          "SALDO ANTERIOR 10.000,00"],
+            # Cada página retoma com o saldo; sem ele o conversor espera uma data logo após o cabeçalho
+            "continuacao": lambda mov: ["Movimentação", "Data Descrição Nº Documento Movimentos (R$) Saldo (R$)",
+                                        f"SALDO EM {mov.data:%d/%m/%Y} {brl(mov.saldo)}{'' if mov.saldo >= 0 else '-'}"],
+            "registro": registro, "final": ["EXTRATO CONSOLIDADO"], "quebra": False}
+
+
+def _cef():
+    def registro(mov):
+        data, _, credito, valor, historico, nome, doc = mov.proximo()
+        linhas = [f"{data:%d/%m/%Y} {doc} {historico} {brl(valor)} {'C' if credito else 'D'} "
+                  f"{brl(mov.saldo)} {'C' if mov.saldo >= 0 else 'D'}"]
+        if mov.aleatorio.random() < 0.3:
+            linhas.append(nome)
+        return linhas
+    return {"cabecalho": ["CAIXA ECONÔMICA FEDERAL", "Extrato por período", "Conta: 1234 | 001 | 00012345-6",
+                          "Data Mov. Nr. Doc. Histórico Valor Saldo"],
+            "continuacao": ["Data Mov. Nr. Doc. Histórico Valor Saldo"], "registro": registro,
+            "saldo_do_dia": lambda dia, saldo: [f"SALDO DIA {brl(saldo)} {'C' if saldo >= 0 else 'D'}"],
+            "final": ["SALDO DIA 0,00 C"], "quebra": True}
+
+
+def _c6():
+    def registro(mov):
+        data, _, credito, valor, historico, nome, doc = mov.proximo()
+        valor_texto = f"{'' if credito else '-'}R$ {brl(valor)}"
+        if mov.aleatorio.random() < 0.6:
+            return [f"{data:%d/%m} {historico.capitalize()} {nome} {valor_texto}"]
+        return [f"{data:%d/%m} {historico.capitalize()}", f"{nome} {valor_texto}"]
+    # O C6 escreve o período por extenso e sem dois-pontos; é dali que o conversor tira o ano
+    return {"cabecalho": ["C6 BANK", "Extrato de conta corrente",
+                          f"Período {_extenso(INICIO_PERIODO)} a {_extenso(FIM_PERIODO)}",
+                          "Data Lançamento Descrição Valor"],
+            "continuacao": ["Data Lançamento Descrição Valor"], "registro": registro,
+            "saldo_do_dia": lambda dia, saldo: [f"Saldo do dia R$ {brl(saldo)}"],
+            "final": ["Saldo do dia R$ 0,00"], "quebra": True}
+
+
+def _inter():
+    def registro(mov):
+        data, novo_dia, credito, valor, historico, nome, doc = mov.proximo()
+        linhas = [f"{data.day} de {NOMES_MESES[data.month - 1].capitalize()} de {data.year}"] if novo_dia else []
+        valor_texto = f"{'' if credito else '-'}R$ {brl(valor)} R$ {brl(mov.saldo)}"
+        if mov.aleatorio.random() < 0.6:
+            return linhas + [f'{historico.capitalize()}: "{nome}" {valor_texto}']
+        return linhas + [f'{historico.capitalize()}: "{nome}"', valor_texto]
+    return {"cabecalho": ["Banco Inter", "Extrato de conta corrente", f"Período: {_periodo()}",
+                          "Data Descrição Valor Saldo"],
+            "continuacao": [], "registro": registro, "final": ["Fim do extrato"], "quebra": False}
+
+
+def _banestes():
+    creditos = ["Pix Recebido", "Deposito", "TED Recebida"]
+    debitos = ["Pix Enviado", "Pagamento Boleto", "Tarifa Bancaria", "Cesta de Serviços"]
+
+    def registro(mov):
+        data, novo_dia, credito, valor, _, nome, doc = mov.proximo()
+        historico = mov.aleatorio.choice(creditos if credito else debitos)
+        linhas = [([(40, f"{data:%d}")] if novo_dia else []) + [(122.5, historico), (490, brl(valor))]]
+        if mov.aleatorio.random() < 0.3:
+            linhas.append([(122.5, nome.title())])
+        return linhas
+    return {"cabecalho": [f"BANESTES Periodo: {_periodo()}", [(40, "Dia"), (122.5, "Lançamento"), (490, "Valor")]],
+            "continuacao": [[(40, "Dia"), (122.5, "Lançamento"), (490, "Valor")]], "registro": registro,
+            "final": [], "quebra": True}
+
+
+def _stone():
+    def registro(mov):
+        data, _, credito, valor, historico, nome, doc = mov.proximo()
+        sinal = "" if credito else "-"
+        return [(f"{data:%d/%m/%Y}", f"{historico.capitalize()} {nome.title()}"[:48],
+                 f"{sinal}R$ {brl(valor)}", f"R$ {brl(mov.saldo)}")]
+    return {"cabecalho": ["STONE", "Extrato de conta", f"Período: {_periodo()}", ("Data", "Descrição", "Valor", "Saldo")],
+            "continuacao": [("Data", "Descrição", "Valor", "Saldo")], "registro": registro, "final": [],
+            "quebra": False, "colunas": lambda pagina: (42, 112, 382, 472), "grade": (40, 110, 380, 470, 555)}
+
+
+def _itau():
+    def registro(mov):
+        data, novo_dia, credito, valor, historico, nome, doc = mov.proximo()
+        return [(f"{data:%d/%m}" if novo_dia else "", f"{historico[:14]} {doc}", "0001", "",
+                 brl(valor) if credito else "", "" if credito else f"{brl(valor)}-", brl(abs(mov.saldo)))]
+    cabecalho = ("data", "lançamento", "ag", "x", "credito", "debito", "saldo")
+    return {"cabecalho": ["ITAÚ UNIBANCO", "extrato conta corrente", f"período: {_periodo()}", cabecalho],
+            "continuacao": [cabecalho], "registro": registro, "final": [], "quebra": False, "fonte": 6,
+            # Colunas e topo da tabela nas áreas de DEFAULT_CONFIGS (a primeira página começa mais abaixo)
+            "colunas": lambda pagina: ((150, 210, 306, 355, 420, 470, 510) if pagina == 0
+                                       else (158, 180, 272, 312, 384, 474, 512)),
+            "topo": lambda pagina: 250 if pagina == 0 else 740}
+
+
+# Nome -> (chave em conversor_lote.PROCESSADORES, modelo, módulo do conversor, layout)
+LAYOUTS = {
+    "sicoob1": ("sicoob", "modelo1", "conversor_sicoobmod1", _sicoob1),
+    "sicoob2": ("sicoob", "modelo2", "conversor_sicoobmod2", _sicoob2),
+    "bb1": ("bb", "modelo1", "conversor_bbmod1", _bb1),
+    "bb2": ("bb", "modelo2", "conversor_bbmod2", _bb2),
+    "bradesco": ("bradesco", None, "conversor_bradesco", _bradesco),
+    "pagbank": ("pagbank", None, "conversor_pagbank", _pagbank),
+    "santander": ("santander", None, "conversor_santander", _santander),
+    "cef": ("cef", None, "conversor_cef", _cef),
+    "c6": ("c6", None, "conversor_c6", _c6),
+    "inter": ("inter", None, "conversor_inter", _inter),
+    "banestes": ("banestes", None, "conversor_banestes", _banestes),
+    "stone": ("stone", None, "conversor_stone", _stone),
+    "itau": ("itau", None, "conversor_itau", _itau),
+}
+
+
+def _desenhar(layout, pagina, linhas, topo):
+    """Textos e linhas da grade de uma página; ``linhas`` já cabem nela."""
+    fonte = layout.get("fonte", TAMANHO_FONTE)
+    textos, grade, y = [], [], topo
+    linhas_da_grade = []
+    for linha in linhas:
+        if isinstance(linha, str):
+            textos.append((MARGEM, y, fonte, linha))
+        elif isinstance(linha, tuple):
+            for x, celula in zip(layout["colunas"](pagina), linha):
+                if celula:
+                    textos.append((x, y, fonte, celula))
+            linhas_da_grade.append(y)
+        else:
+            textos.extend((x, y, fonte, texto) for x, texto in linha)
+        y -= ALTURA_LINHA
+    if layout.get("grade") and linhas_da_grade:
+        bordas = layout["grade"]
+        # Cada linha da tabela fica entre duas horizontais, com as verticais das colunas
+        alto, baixo = linhas_da_grade[0] + ALTURA_LINHA - 3, linhas_da_grade[-1] - 3
+        for y_linha in [y + ALTURA_LINHA - 3 for y in linhas_da_grade] + [baixo]:
+            grade.append((bordas[0], y_linha, bordas[-1], y_linha))
+        grade.extend((x, alto, x, baixo) for x in bordas)
+    return textos, grade
+
+
+def _registro(layout, movimento):
+    """Linhas do próximo lançamento, precedidas do saldo do dia anterior quando o dia muda."""
+    dia, saldo = movimento.data, movimento.saldo
+    linhas = layout["registro"](movimento)
+    if "saldo_do_dia" in layout and movimento.data != dia:
+        linhas = layout["saldo_do_dia"](dia, saldo) + linhas
+    return linhas
+
+
+def gerar(nome, caminho, paginas, semente=0):
+    """Grava o extrato ``nome`` com ``paginas`` páginas e devolve o número de transações geradas."""
+    layout = LAYOUTS[nome][3]()
+    topo = layout.get("topo", lambda pagina: TOPO)
+
+    def capacidade(pagina):
+        return int((topo(pagina) - BASE) / ALTURA_LINHA) + 1
+
+    # Linhas por lançamento numa amostra do layout, para espalhar as datas pelo período todo
+    amostra = Movimento(random.Random(semente), 1)
+    linhas_por_lancamento = sum(len(_registro(layout, amostra)) for _ in range(200)) / 200
+    movimento = Movimento(random.Random(f"{nome}:{semente}"), int(paginas * capacidade(1) / linhas_por_lancamento))
+    escritor = EscritorPdf(caminho)
+    transacoes, pendentes = 0, []
+    try:
+        for pagina in range(paginas):
+            ultima = pagina == paginas - 1
+            cabecalho = layout["cabecalho"] if pagina == 0 else layout["continuacao"]
+            linhas = list(cabecalho(movimento) if callable(cabecalho) else cabecalho)
+            livres = capacidade(pagina) - len(linhas) - (len(layout["final"]) if ultima else 0)
+            while livres > 0:
+                if not pendentes:
+                    pendentes = _registro(layout, movimento)
+                    novo = True
+                # Sem quebra (e na última página), o lançamento que não cabe vai inteiro para a próxima
+                if len(pendentes) > livres and (ultima or not layout["quebra"]):
+                    break
+                transacoes += novo
+                novo = False
+                linhas.extend(pendentes[:livres])
+                pendentes, livres = pendentes[livres:], max(livres - len(pendentes), 0)
+            escritor.pagina(*_desenhar(layout, pagina, linhas + (layout["final"] if ultima else []), topo(pagina)))
+    finally:
+        escritor.fechar()
+    return transacoes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('pasta')
+    parser.add_argument('--layouts', default=",".join(LAYOUTS), help=f"separados por vírgula: {', '.join(LAYOUTS)}")
+    parser.add_argument('--paginas', default="1,10,100", help="números de páginas, separados por vírgula")
+    parser.add_argument('--semente', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.pasta, exist_ok=True)
+    for nome in args.layouts.split(","):
+        for paginas in (int(p) for p in args.paginas.split(",")):
+            caminho = os.path.join(args.pasta, f"{nome}_{paginas}.pdf")
+            transacoes = gerar(nome, caminho, paginas, args.semente)
+            print(f"{caminho}: {paginas} página(s), {transacoes} transação(ões)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
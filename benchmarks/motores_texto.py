@@ -0,0 +1,119 @@
+"""
+Compara os motores de extração de texto (motores.py) nos extratos informados.
+
+Para cada PDF e cada motor instalado, mostra:
+
+  * páginas/s na extração do texto e das palavras de todas as páginas;
+  * quantas linhas do texto diferem das do pdfplumber (a referência);
+  * quantas linhas da saída do conversor do banco mudam quando ele lê o texto
+    desse motor em vez do seu motor padrão, mesmo que o conversor não o declare
+    em MOTORES. É o que decide se um motor pode entrar no MOTORES do conversor,
+    e só vale com extratos reais do banco. Um motor que não extrai o que o
+    conversor usa (palavras, por exemplo) não é usado, e a saída não muda.
+
+O cache em disco das páginas e a extração em paralelo ficam desligados.
+
+    python benchmarks/motores_texto.py extratos/*.pdf --diferencas 5
+"""
+
+import argparse
+import difflib
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ["CONVERSOR_CACHE_PAGINAS"] = "0"
+os.environ["CONVERSOR_WORKERS_PAGINAS"] = "1"
+
+import conversor_lote  # noqa: E402
+import motores  # noqa: E402
+
+
+def medir(motor, caminho, senha):
+    """(páginas/s do texto, páginas/s das palavras ou None, linhas do texto)"""
+    with motores.abrir(motor, caminho, senha) as documento:
+        inicio = time.perf_counter()
+        linhas = [linha for indice in range(len(documento)) for linha in documento.linhas(indice)]
+        por_segundo_texto = len(documento) / max(time.perf_counter() - inicio, 1e-9)
+    # Outro documento: o pdfplumber guarda os caracteres de cada página lida
+    with motores.abrir(motor, caminho, senha) as documento:
+        por_segundo_palavras = None
+        if documento.suporta_palavras:
+            inicio = time.perf_counter()
+            for indice in range(len(documento)):
+                documento.palavras(indice)
+            por_segundo_palavras = len(documento) / max(time.perf_counter() - inicio, 1e-9)
+    return por_segundo_texto, por_segundo_palavras, linhas
+
+
+def linhas_diferentes(referencia, outras):
+    return [linha for linha in difflib.ndiff(referencia, outras) if linha[:1] in "+-"]
+
+
+def saida_do_conversor(banco, caminho, opcoes, motor):
+    """Linhas do arquivo gerado pelo conversor (motor None = o padrão de cada conversor), ou a falha."""
+    motores.configurar(motor, forcar=motor is not None)
+    try:
+        resultado = conversor_lote.processar_arquivo(banco, caminho, opcoes)
+    finally:
+        motores.configurar()
+    if resultado["status"] != "ok":
+        return resultado["banco"], None, resultado["erro"]
+    with open(resultado["saida"], "rb") as arquivo:
+        conteudo = arquivo.read().decode("utf-8", errors="replace").splitlines()
+    os.remove(resultado["saida"])
+    return resultado["banco"], conteudo, None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('pdfs', nargs='+')
+    parser.add_argument('--banco', default='auto', choices=sorted(conversor_lote.PROCESSADORES) + ['auto'])
+    parser.add_argument('--modelo', choices=['modelo1', 'modelo2'])
+    parser.add_argument('--senha', help="senha dos PDFs (C6)")
+    parser.add_argument('--motores', default=",".join(motores.MOTORES),
+                        help="motores comparados, separados por vírgula (padrão: todos)")
+    parser.add_argument('--diferencas', type=int, default=3, help="linhas diferentes mostradas por comparação")
+    args = parser.parse_args(argv)
+    nomes = [nome for nome in args.motores.split(",") if motores.disponivel(nome)]
+    opcoes = {"modelo": args.modelo, "senha": args.senha, "paginas": None, "motor": None}
+
+    for pdf in args.pdfs:
+        print(f"\n{os.path.basename(pdf)}")
+        print(f"  {'motor':<11} {'texto pág/s':>12} {'palavras pág/s':>15} {'linhas ≠ pdfplumber':>20} "
+              f"{'saída ≠ padrão':>15}")
+        medidas = {nome: medir(nome, pdf, args.senha) for nome in nomes}
+        referencia = medidas[motores.REFERENCIA][2] if motores.REFERENCIA in medidas else None
+
+        with tempfile.TemporaryDirectory() as pasta:
+            copia = os.path.join(pasta, os.path.basename(pdf))
+            shutil.copy(pdf, copia)
+            banco, saida_padrao, erro_padrao = saida_do_conversor(args.banco, copia, opcoes, None)
+            exemplos = []
+            for nome in nomes:
+                texto, palavras, linhas = medidas[nome]
+                diferentes_texto = "-" if referencia is None else len(linhas_diferentes(referencia, linhas))
+                _, saida, erro = saida_do_conversor(args.banco, copia, opcoes, nome)
+                if saida is None or saida_padrao is None:
+                    diferentes_saida = "falha"
+                    exemplos.append((nome, [erro or erro_padrao]))
+                else:
+                    diferencas = linhas_diferentes(saida_padrao, saida)
+                    diferentes_saida = len(diferencas)
+                    if diferencas:
+                        exemplos.append((nome, diferencas[:args.diferencas]))
+                palavras = f"{palavras:15.1f}" if palavras is not None else f"{'-':>15}"
+                print(f"  {nome:<11} {texto:12.1f} {palavras} {diferentes_texto:>20} {diferentes_saida:>15}")
+        print(f"  conversor: {banco}")
+        for nome, linhas in exemplos:
+            for linha in linhas:
+                print(f"    [{nome}] {linha}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
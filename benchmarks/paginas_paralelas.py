@@ -0,0 +1,95 @@
+"""
+Converte um extrato em PDF com a extração das páginas em 1, 2, 4 e 8
+processos (sessao_documento), confere que o arquivo gerado é idêntico byte a
+byte ao da conversão num só processo e mostra os tempos.
+
+Para simular um extrato grande, ``--repetir`` junta N cópias das páginas do
+PDF num arquivo só (o estado entre as páginas, como a data corrente, continua
+valendo de uma cópia para a seguinte). O cache em disco das páginas fica
+desligado, para que todas as rodadas extraiam tudo de novo.
+
+    python benchmarks/paginas_paralelas.py extrato.pdf --banco sicoob --repetir 20
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ["CONVERSOR_CACHE_PAGINAS"] = "0"  # Também nos processos trabalhadores
+
+import conversor_lote  # noqa: E402
+import sessao_documento  # noqa: E402
+
+
+def repetir_paginas(origem, destino, vezes, senha=None):
+    from PyPDF2 import PdfReader, PdfWriter
+
+    leitor = PdfReader(origem)
+    if leitor.is_encrypted:
+        leitor.decrypt(senha or "")
+    escritor = PdfWriter()
+    for _ in range(vezes):
+        for pagina in leitor.pages:
+            escritor.add_page(pagina)
+    with open(destino, "wb") as arquivo:
+        escritor.write(arquivo)
+
+
+def converter(banco, caminho, opcoes, workers):
+    """Converte ``caminho`` com ``workers`` processos e devolve (segundos, bytes da saída, resultado)."""
+    sessao_documento.configurar(workers=workers)
+    os.environ["CONVERSOR_WORKERS_PAGINAS"] = str(workers)
+    resultado = conversor_lote.processar_arquivo(banco, caminho, opcoes)
+    if resultado["status"] != "ok":
+        raise RuntimeError(resultado["erro"])
+    with open(resultado["saida"], "rb") as arquivo:
+        saida = arquivo.read()
+    os.remove(resultado["saida"])
+    return resultado["tempo"], saida, resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('pdf', help="extrato em PDF")
+    parser.add_argument('--banco', default='auto', choices=sorted(conversor_lote.PROCESSADORES) + ['auto'])
+    parser.add_argument('--modelo', choices=['modelo1', 'modelo2'])
+    parser.add_argument('--senha', help="senha do PDF (C6)")
+    parser.add_argument('--repetir', type=int, default=1, help="cópias das páginas no PDF convertido")
+    parser.add_argument('--workers', default="1,2,4,8", help="números de processos, separados por vírgula")
+    args = parser.parse_args(argv)
+    contagens = [int(n) for n in args.workers.split(",")]
+    opcoes = {"modelo": args.modelo, "senha": args.senha, "paginas": None, "motor": None}
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, os.path.basename(args.pdf))
+        if args.repetir > 1:
+            repetir_paginas(args.pdf, caminho, args.repetir, args.senha)
+            opcoes["senha"] = None  # A cópia sai sem senha
+        else:
+            shutil.copy(args.pdf, caminho)
+
+        _, referencia, resultado = converter(args.banco, caminho, opcoes, 1)
+        print(f"{os.path.basename(args.pdf)} ({resultado['banco']}): {resultado['paginas']} página(s), "
+              f"{resultado['linhas'] if resultado['linhas'] is not None else '?'} linha(s)")
+        tempos = {}
+        for workers in contagens:
+            tempos[workers], saida, _ = converter(args.banco, caminho, opcoes, workers)
+            if saida != referencia:
+                print(f"ERRO: a saída com {workers} processo(s) é diferente da saída com 1")
+                return 1
+
+    base = tempos.get(1) or tempos[contagens[0]]
+    print("Saídas idênticas byte a byte")
+    for workers in contagens:
+        print(f"  {workers:2d} processo(s): {tempos[workers]:7.2f} s  "
+              f"{resultado['paginas'] / tempos[workers]:7.1f} páginas/s  ({base / tempos[workers]:.2f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
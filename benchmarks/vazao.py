@@ -0,0 +1,202 @@
+"""
+Mede a vazão ponta a ponta de cada conversor em extratos sintéticos
+(benchmarks/extratos_sinteticos.py) de vários tamanhos.
+
+Cada conversão roda num processo novo, pela mesma entrada do lote
+(conversor_lote.processar_arquivo), com o cache em disco das páginas desligado.
+Para cada layout e número de páginas são medidos páginas/s, linhas/s e o pico
+de memória residente (RSS) do processo; a importação do conversor fica fora do
+tempo. Os resultados vão para um JSON, que pode servir de base numa próxima
+execução (--comparar) para ver o que mudou.
+
+    python benchmarks/vazao.py --paginas 1,100,2000 --saida vazao.json
+    python benchmarks/vazao.py --layouts sicoob2,itau --paginas 50 --comparar vazao.json
+"""
+
+import argparse
+import contextlib
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from importlib import metadata
+from multiprocessing import get_context
+
+PASTA_PROJETO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PASTA_PROJETO)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+os.environ["CONVERSOR_CACHE_PAGINAS"] = "0"
+
+import extratos_sinteticos  # noqa: E402
+
+BIBLIOTECAS = ("pdfplumber", "pdfminer.six", "pypdfium2", "PyPDF2", "camelot-py", "pandas")
+
+
+def pico_rss_mb():
+    """(pico de RSS deste processo, maior pico entre os processos filhos) em MB; None onde não há como medir."""
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None, None
+        memoria = psutil.Process().memory_info()
+        return getattr(memoria, "peak_wset", memoria.rss) / 2 ** 20, None
+    # ru_maxrss vem em KB no Linux e em bytes no macOS
+    escala = 2 ** 20 if sys.platform == "darwin" else 2 ** 10
+    filhos = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / escala
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / escala, filhos or None
+
+
+def _medir(banco, modelo, modulo, caminho, opcoes):
+    """Roda no processo de medição: converte o PDF e devolve o resultado do lote com a memória."""
+    import conversor_lote
+    importlib.import_module(modulo)
+    base, _ = pico_rss_mb()
+    # Os conversores imprimem o andamento; só o resultado interessa aqui
+    with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+        resultado = conversor_lote.processar_arquivo(banco, caminho, dict(opcoes, modelo=modelo))
+    resultado["rss_base_mb"] = base
+    resultado["pico_rss_mb"], resultado["pico_rss_filhos_mb"] = pico_rss_mb()
+    return resultado
+
+
+def medir(nome, paginas, pasta, opcoes, repeticoes=1, semente=0):
+    """Gera o extrato e converte ``repeticoes`` vezes, cada uma num processo novo; fica o melhor tempo."""
+    banco, modelo, modulo, _ = extratos_sinteticos.LAYOUTS[nome]
+    caminho = os.path.join(pasta, f"{nome}_{paginas}.pdf")
+    transacoes = extratos_sinteticos.gerar(nome, caminho, paginas, semente)
+    medicao = {"layout": nome, "banco": banco, "modelo": modelo, "paginas": paginas, "transacoes": transacoes}
+    execucoes = []
+    for _ in range(repeticoes):
+        # spawn: o processo começa vazio, sem a memória deste, e o RSS medido é só o da conversão
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+            resultado = executor.submit(_medir, banco, modelo, modulo, caminho, opcoes).result()
+        if resultado.get("saida") and os.path.exists(resultado["saida"]):
+            os.remove(resultado["saida"])
+        if resultado["status"] != "ok":
+            return dict(medicao, status="falha", erro=resultado["erro"])
+        execucoes.append(resultado)
+
+    melhor = min(execucoes, key=lambda resultado: resultado["tempo"])
+    # Se o conversor não informar as linhas geradas, as linhas/s usam as transações do extrato
+    linhas = melhor["linhas"] if melhor["linhas"] is not None else transacoes
+    picos_filhos = [r["pico_rss_filhos_mb"] for r in execucoes if r["pico_rss_filhos_mb"]]
+    return dict(medicao, status="ok", linhas=melhor["linhas"], segundos=melhor["tempo"],
+                tempos=[r["tempo"] for r in execucoes],
+                paginas_por_s=paginas / max(melhor["tempo"], 1e-9), linhas_por_s=linhas / max(melhor["tempo"], 1e-9),
+                rss_base_mb=melhor["rss_base_mb"],
+                pico_rss_mb=max((r["pico_rss_mb"] for r in execucoes), default=None, key=lambda v: v or 0),
+                pico_rss_filhos_mb=max(picos_filhos) if picos_filhos else None)
+
+
+def ambiente():
+    """Dados da máquina e das versões, para saber se duas execuções são comparáveis."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PASTA_PROJETO, capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    versoes = {}
+    for biblioteca in BIBLIOTECAS:
+        try:
+            versoes[biblioteca] = metadata.version(biblioteca)
+        except metadata.PackageNotFoundError:
+            pass
+    return {"data": datetime.now().isoformat(timespec="seconds"), "commit": commit,
+            "python": platform.python_version(), "plataforma": platform.platform(),
+            "processadores": os.cpu_count(), "versoes": versoes}
+
+
+def _mb(valor):
+    return "?" if valor is None else f"{valor:.0f} MB"
+
+
+def imprimir(medicao):
+    if medicao["status"] != "ok":
+        print(f"{medicao['layout']:<10} {medicao['paginas']:>5} pág  [FALHA] {medicao['erro']}")
+        return
+    linhas = "?" if medicao["linhas"] is None else medicao["linhas"]
+    print(f"{medicao['layout']:<10} {medicao['paginas']:>5} pág  {linhas:>6} linhas  {medicao['segundos']:8.2f}s  "
+          f"{medicao['paginas_por_s']:8.1f} pág/s  {medicao['linhas_por_s']:9.0f} linhas/s  "
+          f"pico {_mb(medicao['pico_rss_mb'])} (base {_mb(medicao['rss_base_mb'])})")
+
+
+def comparar(anterior, atual):
+    """Razão entre as vazões (atual/anterior) e a variação do pico de memória, por layout e tamanho."""
+    antes = {(m["layout"], m["paginas"]): m for m in anterior["medicoes"] if m["status"] == "ok"}
+    print(f"\nComparação com {anterior['ambiente'].get('commit') or '?'} de {anterior['ambiente']['data']}:")
+    for medicao in atual["medicoes"]:
+        base = antes.get((medicao["layout"], medicao["paginas"]))
+        if medicao["status"] != "ok" or base is None:
+            continue
+        memoria = ""
+        if medicao["pico_rss_mb"] is not None and base.get("pico_rss_mb") is not None:
+            memoria = f"  pico {base['pico_rss_mb']:.0f} -> {medicao['pico_rss_mb']:.0f} MB"
+        print(f"{medicao['layout']:<10} {medicao['paginas']:>5} pág  "
+              f"{base['paginas_por_s']:8.1f} -> {medicao['paginas_por_s']:8.1f} pág/s  "
+              f"({medicao['paginas_por_s'] / max(base['paginas_por_s'], 1e-9):.2f}x){memoria}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--layouts', default=",".join(extratos_sinteticos.LAYOUTS),
+                        help=f"separados por vírgula: {', '.join(extratos_sinteticos.LAYOUTS)}")
+    parser.add_argument('--paginas', default="1,10,100", help="tamanhos dos extratos, separados por vírgula")
+    parser.add_argument('--repeticoes', type=int, default=1, help="conversões por extrato (fica a mais rápida)")
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--pasta', help="onde guardar os PDFs gerados (padrão: pasta temporária, apagada no fim)")
+    parser.add_argument('--workers-paginas', type=int, default=1,
+                        help="processos de extração de páginas por arquivo (padrão: 1)")
+    parser.add_argument('--motor-texto', help="força o motor de extração de texto (ver motores.py)")
+    parser.add_argument('--saida', default="vazao.json", help="arquivo JSON com os resultados")
+    parser.add_argument('--comparar', help="JSON de uma execução anterior")
+    args = parser.parse_args(argv)
+
+    layouts = args.layouts.split(",")
+    desconhecidos = [nome for nome in layouts if nome not in extratos_sinteticos.LAYOUTS]
+    if desconhecidos:
+        parser.error(f"layout(s) desconhecido(s): {', '.join(desconhecidos)}")
+    anterior = None
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            anterior = json.load(arquivo)
+
+    # Herdados pelos processos de medição
+    os.environ["CONVERSOR_WORKERS_PAGINAS"] = str(args.workers_paginas)
+    if args.motor_texto:
+        os.environ["CONVERSOR_MOTOR_TEXTO"] = args.motor_texto
+
+    opcoes = {"senha": None, "paginas": None, "workers_por_arquivo": 1}
+    atual = {"ambiente": ambiente(),
+             "parametros": {"repeticoes": args.repeticoes, "semente": args.semente,
+                            "workers_paginas": args.workers_paginas, "motor_texto": args.motor_texto},
+             "medicoes": []}
+    inicio = time.perf_counter()
+    with contextlib.ExitStack() as pilha:
+        pasta = args.pasta or pilha.enter_context(tempfile.TemporaryDirectory(prefix="vazao_"))
+        os.makedirs(pasta, exist_ok=True)
+        for nome in layouts:
+            for paginas in (int(p) for p in args.paginas.split(",")):
+                medicao = medir(nome, paginas, pasta, opcoes, args.repeticoes, args.semente)
+                imprimir(medicao)
+                atual["medicoes"].append(medicao)
+
+    with open(args.saida, "w", encoding="utf-8") as arquivo:
+        json.dump(atual, arquivo, ensure_ascii=False, indent=2)
+    print(f"\n{len(atual['medicoes'])} medição(ões) em {time.perf_counter() - inicio:.1f}s, salvas em {args.saida}")
+    if anterior:
+        comparar(anterior, atual)
+    return 1 if any(m["status"] != "ok" for m in atual["medicoes"]) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,291 @@
+"""
+Cache em disco do texto e das palavras extraídos das páginas.
+
+A análise de layout do pdfplumber é a parte cara das conversões, e o mesmo PDF
+costuma ser convertido mais de uma vez (por exemplo, o BB no modelo 1 e depois
+no modelo 2). ``texto(pagina, **parametros)`` e ``palavras(pagina, **parametros)``
+devolvem o mesmo que ``extract_text``/``extract_words``, mas guardam o resultado
+num banco SQLite na pasta de cache do usuário.
+
+A chave é o conteúdo do PDF (hash), a versão do pdfplumber, os parâmetros de
+abertura (laparams, unicode_norm), o número da página, o recorte e os parâmetros
+da extração (x_tolerance, y_tolerance, keep_blank_chars...). Os resultados são
+gravados em JSON compactado com zlib (as palavras em colunas, não um dict por
+palavra), e as entradas usadas há mais tempo são removidas quando o banco passa
+de ``MAX_BYTES``. Qualquer erro do cache apenas faz a página ser extraída
+normalmente. ``estatisticas()`` devolve os acertos e as faltas do processo.
+
+O banco guarda o texto dos extratos (dados de conta), por isso o cache vem
+desligado: para ligar, variável de ambiente ``CONVERSOR_CACHE_PAGINAS=1`` ou
+``configurar(ativo=True)``. Fica em ``%LOCALAPPDATA%\\ConversorBancario\\paginas.sqlite3``
+(``~/.cache/ConversorBancario/paginas.sqlite3`` fora do Windows). As páginas de PDFs
+protegidos por senha (C6) nunca são gravadas, mesmo com o cache ligado.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import weakref
+import zlib
+
+MAX_BYTES = 256 * 1024 * 1024
+# Após passar do limite, remove as entradas mais antigas até ficar nesta fração dele
+FRACAO_APOS_LIMPEZA = 0.9
+# O tamanho total só é recalculado depois de gravar esta fração do limite
+FRACAO_ENTRE_VERIFICACOES = 0.05
+NIVEL_COMPRESSAO = 6
+ARQUIVO_BANCO = "paginas.sqlite3"
+VERSAO_FORMATO = 1
+
+_config = {
+    "ativo": os.environ.get("CONVERSOR_CACHE_PAGINAS", "0") == "1",
+    "pasta": None,
+    "max_bytes": MAX_BYTES,
+    "geracao": 0,  # Muda a cada configurar(), para que as threads reabram a conexão
+}
+_estatisticas = {"acertos": 0, "faltas": 0, "gravacoes": 0, "removidas": 0, "erros": 0}
+_trava = threading.Lock()
+_local = threading.local()
+_chaves_dos_pdfs = weakref.WeakKeyDictionary()
+_bytes_desde_verificacao = 0
+
+
+def pasta_de_cache():
+    # Fora do _MEIPASS: no executável de arquivo único ele é recriado a cada execução
+    base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "ConversorBancario")
+
+
+def configurar(ativo=None, pasta=None, max_bytes=None):
+    """Liga/desliga o cache, troca a pasta do banco ou o limite de tamanho (para este processo)."""
+    with _trava:
+        if ativo is not None:
+            _config["ativo"] = ativo
+        if pasta is not None:
+            _config["pasta"] = pasta
+        if max_bytes is not None:
+            _config["max_bytes"] = max_bytes
+        _config["geracao"] += 1
+
+
+def estatisticas():
+    with _trava:
+        return dict(_estatisticas)
+
+
+def zerar_estatisticas():
+    with _trava:
+        for chave in _estatisticas:
+            _estatisticas[chave] = 0
+
+
+def _contar(chave, quantidade=1):
+    with _trava:
+        _estatisticas[chave] += quantidade
+
+
+def caminho_do_banco():
+    return os.path.join(_config["pasta"] or pasta_de_cache(), ARQUIVO_BANCO)
+
+
+def _conexao():
+    """Uma conexão por thread e por processo (conexões SQLite não podem atravessar um fork)."""
+    identificacao = (os.getpid(), _config["geracao"])
+    if getattr(_local, "identificacao", None) == identificacao:
+        return _local.conexao
+    import sqlite3
+
+    _local.identificacao, _local.conexao = identificacao, None
+    try:
+        caminho = caminho_do_banco()
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        conexao = sqlite3.connect(caminho, timeout=10, isolation_level=None)
+        conexao.execute("PRAGMA journal_mode=WAL")
+        conexao.execute("PRAGMA synchronous=NORMAL")
+        conexao.execute("CREATE TABLE IF NOT EXISTS paginas (chave TEXT PRIMARY KEY, dados BLOB NOT NULL, "
+                        "tamanho INTEGER NOT NULL, acesso REAL NOT NULL)")
+        conexao.execute("CREATE INDEX IF NOT EXISTS paginas_acesso ON paginas (acesso)")
+        _local.conexao = conexao
+    except (sqlite3.Error, OSError) as e:
+        # Sem cache neste processo/thread; as páginas continuam sendo extraídas normalmente
+        print(f"Cache de páginas indisponível: {e}")
+        _contar("erros")
+    return _local.conexao
+
+
+def hash_do_arquivo(arquivo):
+    """Hash do conteúdo de um arquivo aberto em modo binário (a posição de leitura é preservada)."""
+    posicao = arquivo.tell()
+    arquivo.seek(0)
+    resumo = hashlib.blake2b(digest_size=20)
+    for bloco in iter(lambda: arquivo.read(1 << 20), b""):
+        resumo.update(bloco)
+    arquivo.seek(posicao)
+    return resumo.hexdigest()
+
+
+def chave_do_arquivo(caminho):
+    """Chave de documento para PDFs lidos por outras bibliotecas (ex.: PyPDF2)."""
+    with open(caminho, "rb") as arquivo:
+        return hash_do_arquivo(arquivo)
+
+
+def protegido(pdf):
+    """Se o PDF (do pdfplumber) foi aberto com senha: o texto dele não vai para o disco."""
+    return getattr(pdf.doc, "encryption", None) is not None
+
+
+def chave_do_pdf(pdf):
+    """Conteúdo do arquivo mais os parâmetros de abertura que mudam o texto extraído."""
+    chave = _chaves_dos_pdfs.get(pdf)
+    if chave is None:
+        import pdfplumber
+
+        laparams = vars(pdf.laparams) if pdf.laparams is not None else None
+        opcoes = json.dumps([pdfplumber.__version__, laparams, pdf.unicode_norm], sort_keys=True, default=repr)
+        chave = f"{hash_do_arquivo(pdf.stream)}:{hashlib.sha1(opcoes.encode('utf-8')).hexdigest()[:12]}"
+        _chaves_dos_pdfs[pdf] = chave
+    return chave
+
+
+def _ler(conexao, chave):
+    linha = conexao.execute("SELECT dados FROM paginas WHERE chave = ?", (chave,)).fetchone()
+    if linha is None:
+        return None
+    conexao.execute("UPDATE paginas SET acesso = ? WHERE chave = ?", (time.time(), chave))
+    return json.loads(zlib.decompress(linha[0]))
+
+
+def _gravar(conexao, chave, valor):
+    global _bytes_desde_verificacao
+    dados = zlib.compress(json.dumps(valor, ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+                          NIVEL_COMPRESSAO)
+    conexao.execute("INSERT OR REPLACE INTO paginas (chave, dados, tamanho, acesso) VALUES (?, ?, ?, ?)",
+                    (chave, dados, len(dados), time.time()))
+    _contar("gravacoes")
+    with _trava:
+        _bytes_desde_verificacao += len(dados)
+        verificar = _bytes_desde_verificacao >= _config["max_bytes"] * FRACAO_ENTRE_VERIFICACOES
+        if verificar:
+            _bytes_desde_verificacao = 0
+    if verificar:
+        limpar(conexao)
+
+
+def limpar(conexao=None):
+    """Remove as entradas usadas há mais tempo até o banco caber no limite (LRU)."""
+    conexao = conexao or _conexao()
+    if conexao is None:
+        return 0
+    limite = _config["max_bytes"]
+    total = conexao.execute("SELECT COALESCE(SUM(tamanho), 0) FROM paginas").fetchone()[0]
+    if total <= limite:
+        return 0
+    removidas, excesso = [], total - limite * FRACAO_APOS_LIMPEZA
+    for chave, tamanho in conexao.execute("SELECT chave, tamanho FROM paginas ORDER BY acesso").fetchall():
+        if excesso <= 0:
+            break
+        removidas.append((chave,))
+        excesso -= tamanho
+    conexao.executemany("DELETE FROM paginas WHERE chave = ?", removidas)
+    _contar("removidas", len(removidas))
+    return len(removidas)
+
+
+def obter(chave_documento, numero_pagina, tipo, parametros, calcular, codificar=None, decodificar=None):
+    """
+    Resultado em cache de ``calcular()`` para a página, ou o calcula e grava. ``parametros`` deve
+    ser serializável em JSON; ``codificar``/``decodificar`` convertem o resultado de/para JSON
+    (``codificar`` devolve None para resultados que não podem ser guardados sem perda).
+    ``chave_documento`` None (ex.: PDF protegido por senha) não usa o cache.
+    """
+    if not _config["ativo"] or chave_documento is None:
+        return calcular()
+    try:
+        descricao = json.dumps([VERSAO_FORMATO, chave_documento, numero_pagina, tipo, parametros], sort_keys=True)
+    except (TypeError, ValueError):
+        return calcular()  # Parâmetros que não viram texto (ex.: funções) não entram no cache
+    chave = hashlib.sha1(descricao.encode("utf-8")).hexdigest()
+
+    conexao = _conexao()
+    if conexao is not None:
+        try:
+            valor = _ler(conexao, chave)
+        except Exception as e:
+            print(f"Erro ao ler o cache de páginas: {e}")
+            _contar("erros")
+            valor = None
+        if valor is not None:
+            _contar("acertos")
+            return decodificar(valor) if decodificar else valor
+
+    _contar("faltas")
+    resultado = calcular()
+    codificado = codificar(resultado) if codificar else resultado
+    if conexao is not None and codificado is not None:
+        try:
+            _gravar(conexao, chave, codificado)
+        except Exception as e:
+            print(f"Erro ao gravar no cache de páginas: {e}")
+            _contar("erros")
+    return resultado
+
+
+# Tipos que voltam do JSON exatamente como foram gravados (tuplas, por exemplo, voltariam como listas)
+TIPOS_EXATOS_EM_JSON = (str, int, float, bool, type(None))
+
+
+def _palavras_em_colunas(palavras):
+    campos = list(palavras[0]) if palavras else []
+    colunas = [[palavra.get(campo) for palavra in palavras] for campo in campos]
+    if any(list(palavra) != campos for palavra in palavras) or \
+            any(type(valor) not in TIPOS_EXATOS_EM_JSON for coluna in colunas for valor in coluna):
+        return None  # Ex.: extra_attrs com cores (tuplas); essas palavras não vão para o cache
+    return {"campos": campos, "colunas": colunas}
+
+
+def _palavras_de_colunas(valor):
+    campos = valor["campos"]
+    return [dict(zip(campos, linha)) for linha in zip(*valor["colunas"])]
+
+
+def _cacheavel(pagina):
+    from pdfplumber.page import Page
+
+    # Páginas derivadas (crop, within_bbox, filter) não se distinguem pela chave: use ``recorte``
+    return type(pagina) is Page and not protegido(pagina.pdf)
+
+
+def _recortar(pagina, recorte):
+    return pagina.crop(recorte) if recorte is not None else pagina
+
+
+def texto(pagina, recorte=None, **parametros):
+    """``pagina.extract_text(**parametros)`` (da área ``recorte``, se informada), via cache."""
+    def calcular():
+        return _recortar(pagina, recorte).extract_text(**parametros)
+
+    if not _cacheavel(pagina):
+        return calcular()
+    if recorte is not None:
+        parametros_chave = dict(parametros, recorte=[round(float(v), 3) for v in recorte])
+    else:
+        parametros_chave = parametros
+    return obter(chave_do_pdf(pagina.pdf), pagina.page_number, "texto", parametros_chave, calcular)
+
+
+def palavras(pagina, recorte=None, **parametros):
+    """``pagina.extract_words(**parametros)`` (da área ``recorte``, se informada), via cache."""
+    def calcular():
+        return _recortar(pagina, recorte).extract_words(**parametros)
+
+    if not _cacheavel(pagina):
+        return calcular()
+    if recorte is not None:
+        parametros_chave = dict(parametros, recorte=[round(float(v), 3) for v in recorte])
+    else:
+        parametros_chave = parametros
+    return obter(chave_do_pdf(pagina.pdf), pagina.page_number, "palavras", parametros_chave, calcular,
+                 _palavras_em_colunas, _palavras_de_colunas)
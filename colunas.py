@@ -0,0 +1,223 @@
+"""
+Montagem de linhas e colunas a partir das coordenadas das palavras.
+
+Para layouts descritos por limites no eixo x (ex.: "data até x=75, valor a
+partir de x=480"). As palavras da página viram arrays NumPy; as linhas são
+agrupadas por proximidade vertical (tolerância em y, em vez de arredondar o
+``top``), as colunas são atribuídas com ``searchsorted`` contra o vetor de
+limites e o texto de cada célula é juntado de uma vez, já na ordem do x.
+
+Os limites podem ser calibrados pelo histograma das posições x das palavras
+nas primeiras páginas (``limites_calibrados``): se o banco deslocar o layout
+alguns pontos, os limites acompanham as lacunas entre as colunas. Só
+deslocamentos até ``TOLERANCIA_DESLOCAMENTO`` são aplicados; um deslocamento
+maior é relatado e os limites configurados ficam como estão. O deslocamento
+encontrado vai para o cache em disco (``cache_paginas``, quando ligado) pela
+impressão digital do layout (tamanho da página e texto do cabeçalho), e os
+arquivos seguintes com o mesmo layout não recalibram.
+"""
+
+import hashlib
+import re
+
+import numpy as np
+
+import cache_paginas
+
+TOLERANCIA_Y = 2
+
+# Calibração: quantas páginas entram no histograma, quanto os limites podem se deslocar
+# (em pontos) e a fração das linhas que uma faixa pode cruzar e ainda contar como lacuna
+PAGINAS_CALIBRACAO = 3
+MAX_DESLOCAMENTO = 40
+LIMIAR_LACUNA = 0.03
+# Maior deslocamento (em pontos) aplicado sem conferência; acima disso ele só é relatado
+TOLERANCIA_DESLOCAMENTO = 25
+# Faixa superior da página usada na impressão digital do layout
+FRACAO_CABECALHO = 0.15
+
+DIGITOS = re.compile(r"\d")
+
+
+def palavras_em_arrays(palavras):
+    """Lista de palavras do pdfplumber -> dict de arrays (x0, x1, top, bottom, text)."""
+    return {
+        "x0": np.fromiter((p["x0"] for p in palavras), dtype=float, count=len(palavras)),
+        "x1": np.fromiter((p["x1"] for p in palavras), dtype=float, count=len(palavras)),
+        "top": np.fromiter((p["top"] for p in palavras), dtype=float, count=len(palavras)),
+        "bottom": np.fromiter((p["bottom"] for p in palavras), dtype=float, count=len(palavras)),
+        "text": np.array([p["text"] for p in palavras], dtype=object),
+    }
+
+
+def palavras_da_pagina(pagina, sessao=None, **opcoes):
+    """
+    Palavras da página (``extract_words(**opcoes)``, via cache em disco) já em arrays.
+    Com ``sessao``, as palavras ficam memorizadas nela (ex.: entre a calibração e o laço principal).
+    """
+    extrair = sessao.palavras if sessao is not None else cache_paginas.palavras
+    return palavras_em_arrays(extrair(pagina, **opcoes))
+
+
+def agrupar_linhas(top, tolerancia=TOLERANCIA_Y):
+    """
+    Número da linha de cada palavra, em ordem de cima para baixo. Uma nova linha começa
+    quando o ``top`` se afasta mais que ``tolerancia`` da palavra anterior (em ordem de y).
+    """
+    if not len(top):
+        return np.zeros(0, dtype=int)
+    ordem = np.argsort(top, kind="stable")
+    quebras = np.diff(top[ordem]) > tolerancia
+    linhas = np.empty(len(top), dtype=int)
+    linhas[ordem] = np.concatenate(([0], np.cumsum(quebras)))
+    return linhas
+
+
+def atribuir_colunas(x0, limites):
+    """Coluna de cada palavra: 0 antes do primeiro limite, 1 entre o primeiro e o segundo, etc."""
+    return np.searchsorted(np.asarray(limites, dtype=float), x0, side="right")
+
+
+def montar_linhas(arrays, limites, tolerancia=TOLERANCIA_Y, separadores=" "):
+    """
+    Devolve uma lista de linhas (de cima para baixo), cada uma com o texto de suas
+    ``len(limites) + 1`` colunas. ``separadores`` é o texto usado para juntar as palavras
+    de uma mesma célula: um só para todas as colunas ou um por coluna.
+    """
+    n_colunas = len(limites) + 1
+    if isinstance(separadores, str):
+        separadores = [separadores] * n_colunas
+    if not len(arrays["x0"]):
+        return []
+
+    linhas = agrupar_linhas(arrays["top"], tolerancia)
+    colunas = atribuir_colunas(arrays["x0"], limites)
+    ordem = np.lexsort((arrays["x0"], colunas, linhas))
+    linhas, colunas, textos = linhas[ordem], colunas[ordem], arrays["text"][ordem]
+
+    # Uma célula por par (linha, coluna) consecutivo após a ordenação
+    celula = linhas * n_colunas + colunas
+    inicios = np.flatnonzero(np.concatenate(([True], celula[1:] != celula[:-1])))
+    fins = np.append(inicios[1:], len(celula))
+
+    resultado = [[""] * n_colunas for _ in range(linhas[-1] + 1)]
+    for inicio, fim in zip(inicios.tolist(), fins.tolist()):
+        coluna = colunas[inicio]
+        resultado[linhas[inicio]][coluna] = separadores[coluna].join(textos[inicio:fim])
+    return resultado
+
+
+def linhas_da_pagina(pagina, limites, tolerancia=TOLERANCIA_Y, separadores=" ", sessao=None, **opcoes):
+    """Atalho: extrai as palavras da página e monta as linhas por colunas."""
+    return montar_linhas(palavras_da_pagina(pagina, sessao, **opcoes), limites, tolerancia, separadores)
+
+
+def cobertura(arrays, origem, tamanho):
+    """Quantas palavras cobrem cada faixa de 1 ponto a partir de ``origem`` (histograma de x0..x1)."""
+    inicios = np.clip(np.floor(arrays["x0"]).astype(int) - origem, 0, tamanho)
+    fins = np.clip(np.ceil(arrays["x1"]).astype(int) - origem, 0, tamanho)
+    diferencas = np.zeros(tamanho + 1, dtype=int)
+    np.add.at(diferencas, inicios, 1)
+    np.add.at(diferencas, fins, -1)
+    return np.cumsum(diferencas)[:tamanho]
+
+
+def calibrar_deslocamento(arrays, limites, max_deslocamento=MAX_DESLOCAMENTO, limiar=LIMIAR_LACUNA):
+    """
+    Deslocamento horizontal (em pontos) que leva os limites para as lacunas entre colunas.
+
+    Cada deslocamento candidato é avaliado pelo número de limites que caem sobre texto
+    mais o número de colunas que ficam vazias. Sem ganho sobre o layout original, devolve 0;
+    caso contrário, o meio do intervalo de melhores deslocamentos mais próximo de zero.
+    """
+    if not len(arrays["x0"]) or not len(limites):
+        return 0
+    limites = np.unique(np.asarray(limites, dtype=float))
+    origem = int(np.floor(min(arrays["x0"].min(), limites[0]))) - max_deslocamento - 1
+    tamanho = int(np.ceil(max(arrays["x1"].max(), limites[-1]))) + max_deslocamento + 2 - origem
+
+    n_linhas = agrupar_linhas(arrays["top"]).max() + 1
+    ocupado = cobertura(arrays, origem, tamanho) > max(1, limiar * n_linhas)
+    acumulado = np.concatenate(([0], np.cumsum(ocupado)))
+
+    deslocamentos = np.arange(-max_deslocamento, max_deslocamento + 1)
+    posicoes = np.clip(np.round(limites[None, :] + deslocamentos[:, None]).astype(int) - origem, 0, tamanho - 1)
+    sobre_texto = ocupado[posicoes].sum(axis=1)
+    # Texto em cada coluna: antes do primeiro limite, entre limites e depois do último
+    bordas = np.concatenate((np.zeros((len(deslocamentos), 1), dtype=int), posicoes,
+                             np.full((len(deslocamentos), 1), tamanho)), axis=1)
+    vazias = (np.diff(acumulado[bordas], axis=1) == 0).sum(axis=1)
+    custos = sobre_texto + vazias
+
+    zero = max_deslocamento
+    melhor = custos.min()
+    if custos[zero] == melhor:
+        return 0
+    candidatos = np.flatnonzero(custos == melhor)
+    mais_proximo = candidatos[np.argmin(np.abs(candidatos - zero))]
+    # Intervalo contíguo de deslocamentos com o mesmo custo mínimo
+    inicio = fim = mais_proximo
+    while inicio > 0 and custos[inicio - 1] == melhor:
+        inicio -= 1
+    while fim < len(custos) - 1 and custos[fim + 1] == melhor:
+        fim += 1
+    return int(deslocamentos[(inicio + fim) // 2])
+
+
+def impressao_layout(pagina, fracao=FRACAO_CABECALHO):
+    """
+    Identifica o layout: tamanho da página e texto do cabeçalho (sem os dígitos de datas e
+    números), com a posição x de cada trecho, para que um cabeçalho deslocado não reaproveite
+    a calibração do layout anterior.
+    """
+    limite = pagina.bbox[1] + (pagina.bbox[3] - pagina.bbox[1]) * fracao
+    chars = [char for char in pagina.chars if char["top"] < limite]
+    texto = DIGITOS.sub("0", "".join(char["text"] for char in chars))
+    texto += "|" + ",".join(str(round(char["x0"])) for char in chars if not char["text"].isspace())
+    resumo = hashlib.sha1(texto.encode("utf-8")).hexdigest()[:16]
+    return f"{round(float(pagina.width))}x{round(float(pagina.height))}:{resumo}"
+
+
+def _palavras_na_area(pagina, area, sessao, opcoes):
+    arrays = palavras_da_pagina(pagina, sessao, **opcoes)
+    if area is None or not len(arrays["x0"]):
+        return arrays
+    x0, topo, x1, base = area
+    dentro = (arrays["x0"] >= x0) & (arrays["x1"] <= x1) & (arrays["top"] >= topo) & (arrays["bottom"] <= base)
+    return {chave: valores[dentro] for chave, valores in arrays.items()}
+
+
+def _deslocamento_calibrado(paginas, limites, area, sessao, opcoes):
+    partes = [_palavras_na_area(pagina, area, sessao, opcoes) for pagina in paginas]
+    arrays = {campo: np.concatenate([parte[campo] for parte in partes]) for campo in partes[0]}
+    # Linhas de páginas diferentes não podem se fundir no agrupamento por y
+    altura = max(float(pagina.height) for pagina in paginas)
+    arrays["top"] = np.concatenate([parte["top"] + i * (altura + 10 * TOLERANCIA_Y)
+                                    for i, parte in enumerate(partes)])
+    return calibrar_deslocamento(arrays, limites)
+
+
+def limites_calibrados(paginas, limites, area=None, chave="", sessao=None, tolerancia=TOLERANCIA_DESLOCAMENTO,
+                       **opcoes):
+    """
+    Devolve (limites, calibração) pelas primeiras páginas. A calibração é um dict com o
+    ``deslocamento`` encontrado e se ele foi ``aplicado`` (só até ``tolerancia`` pontos;
+    acima disso os limites voltam sem deslocamento). ``area`` (x0, top, x1, bottom, nas
+    coordenadas do pdfplumber) restringe as palavras consideradas. ``chave`` separa layouts
+    de bancos diferentes com o mesmo cabeçalho. O deslocamento encontrado fica no cache de
+    páginas pela impressão digital do layout da primeira página.
+    """
+    paginas = list(paginas)[:PAGINAS_CALIBRACAO]
+    if not paginas:
+        return list(limites), {"deslocamento": 0, "aplicado": False}
+    # Páginas de PDFs protegidos por senha não deixam rastro no disco
+    protegido = cache_paginas.protegido(paginas[0].pdf)
+    documento = None if protegido else f"layout:{impressao_layout(paginas[0])}"
+    parametros = {"chave": chave, "limites": [float(limite) for limite in limites],
+                  "area": [round(float(valor), 3) for valor in area] if area is not None else None,
+                  "opcoes": opcoes}
+    deslocamento = cache_paginas.obter(documento, None, "calibracao", parametros,
+                                       lambda: _deslocamento_calibrado(paginas, limites, area, sessao, opcoes))
+    aplicado = 0 < abs(deslocamento) <= tolerancia
+    calibracao = {"deslocamento": deslocamento, "aplicado": aplicado}
+    return [limite + deslocamento if aplicado else limite for limite in limites], calibracao
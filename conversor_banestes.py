@@ -1,11 +1,17 @@
 import tkinter as tk
 from tkinter import filedialog,messagebox
 import pandas as pd
-import pdfplumber
 import traceback
 import re
 import os
-from collections import defaultdict
+import numpy as np
+import motores
+import sessao_documento
+from metadados import MESES_ABREV, mes_inicial, metadados_do_extrato, proximo_mes
+from colunas import limites_calibrados, linhas_da_pagina
+
+# Motores de extração cujas palavras este parser aceita (ver motores)
+MOTORES = ("pdfplumber",)
 
 def selecionar_arquivo_pdf():
     """Abre uma janela para o usuário selecionar um arquivo PDF."""
@@ -29,38 +35,40 @@ def extrair_dados_do_pdf(caminho_pdf):
     # --- Parâmetros de Layout ---
     COLUNA_DATA_FIM_X = 75
     COLUNA_VALOR_INICIO_X = 480
+    # Data: x0 < 75 | Lançamento | Valor: x0 > 480 (o limite da busca é "a partir de")
+    LIMITES = [COLUNA_DATA_FIM_X, np.nextafter(COLUNA_VALOR_INICIO_X, np.inf)]
+    # Data e valor são colados sem espaço; o lançamento separa as palavras com espaço
+    SEPARADORES = ["", " ", ""]
+    OPCOES_PALAVRAS = motores.opcoes(MOTORES, usa_palavras=True, x_tolerance=2, y_tolerance=2, keep_blank_chars=True)
     # ---------------------------
 
     transacoes = []
     
     try:
-        with pdfplumber.open(caminho_pdf) as pdf:
+        with sessao_documento.abrir(caminho_pdf) as sessao:
+            # O extrato traz só o dia; mês e ano vêm do período no cabeçalho da primeira página
+            mes_ano = mes_inicial(metadados_do_extrato(caminho_pdf, pdf=sessao))
+            if not mes_ano:
+                hoje = pd.Timestamp.now()
+                print("Período do extrato não encontrado. Usando o mês atual como padrão.")
+                mes_ano = (hoje.month, hoje.year)
+            # Acompanha deslocamentos de alguns pontos no layout (em cache por layout)
+            limites, calibracao = limites_calibrados(sessao.paginas, LIMITES, chave="banestes", sessao=sessao,
+                                                     **OPCOES_PALAVRAS)
             dia_atual = ""
-            for page in pdf.pages:
-                words = page.extract_words(x_tolerance=2, y_tolerance=2, keep_blank_chars=True)
-                linhas_agrupadas = defaultdict(list)
-                for word in words:
-                    chave_y = round(word['top'], 0) 
-                    linhas_agrupadas[chave_y].append(word)
-
-                for y in sorted(linhas_agrupadas.keys()):
-                    palavras_na_linha = sorted(linhas_agrupadas[y], key=lambda w: w['x0'])
-                    
-                    col_data_str, col_desc_str, col_valor_str = "", "", ""
-
-                    for palavra in palavras_na_linha:
-                        if palavra['x0'] < COLUNA_DATA_FIM_X:
-                            col_data_str += palavra['text']
-                        elif palavra['x0'] > COLUNA_VALOR_INICIO_X:
-                            col_valor_str += palavra['text']
-                        else:
-                            col_desc_str += palavra['text'] + " "
+            # A extração das páginas pode rodar em paralelo; dia_atual segue página a página, em ordem
+            for page in sessao.percorrer(transacoes, extrair=[("palavras", OPCOES_PALAVRAS)]):
+                linhas = linhas_da_pagina(page, limites, separadores=SEPARADORES, sessao=sessao, **OPCOES_PALAVRAS)
 
+                for col_data_str, col_desc_str, col_valor_str in linhas:
                     col_data_str = col_data_str.strip()
                     col_desc_str = col_desc_str.strip()
                     col_valor_str = col_valor_str.strip()
 
                     if re.match(r'^\d{2}$', col_data_str):
+                        # Dia menor que o anterior: o extrato passou para o mês seguinte
+                        if dia_atual and int(col_data_str) < int(dia_atual):
+                            mes_ano = proximo_mes(*mes_ano)
                         dia_atual = col_data_str
 
                     if col_desc_str and col_valor_str and re.search(r'[\d]', col_valor_str):
@@ -74,8 +82,9 @@ def extrair_dados_do_pdf(caminho_pdf):
                         if any(keyword in col_desc_str for keyword in palavras_debito) and valor_numerico > 0:
                             valor_numerico *= -1
                         
+                        mes, ano = mes_ano
                         transacoes.append({
-                            "Data": f"{dia_atual}/JUN/25",
+                            "Data": f"{dia_atual}/{MESES_ABREV[mes - 1]}/{ano % 100:02d}",
                             "Lançamento": col_desc_str,
                             "Valor (R$)": valor_numerico
                         })
@@ -88,6 +97,8 @@ def extrair_dados_do_pdf(caminho_pdf):
         return None
 
     df = pd.DataFrame(transacoes)
+    # Deslocamento das colunas encontrado na calibração, aplicado ou não (vai para o resultado do lote)
+    df.attrs["calibracao"] = {"colunas": calibracao} if calibracao["deslocamento"] else {}
     return df
 def iniciar_processamento():
     """
@@ -1,10 +1,15 @@
-import pdfplumber
 import re
 import pandas as pd
 from typing import Optional, List
 import os
 import tkinter as tk
 from tkinter import filedialog
+import motores
+import sessao_documento
+
+OPCOES_TEXTO = {"x_tolerance": 2, "y_tolerance": 3}
+# Motores de extração cujo texto este parser aceita (ver motores)
+MOTORES = ("pdfplumber",)
 
 # Substitua a sua função antiga por esta
 def limpar_e_converter_valor_cac(valor_str: Optional[str]) -> float:
@@ -49,13 +54,14 @@ def extrair_formato_cac(caminho_pdf: str) -> Optional[pd.DataFrame]:
     )
 
     try:
-        with pdfplumber.open(caminho_pdf) as pdf:
+        with sessao_documento.abrir(caminho_pdf) as sessao:
             texto_completo = ""
             # --- BLOCO CORRIGIDO ---
             # O 'if' que pulava a página foi removido daqui.
             # Agora o script lê todas as páginas.
-            for pagina in pdf.pages:
-                texto_pagina = pagina.extract_text(x_tolerance=2, y_tolerance=3)
+            opcoes = motores.opcoes(MOTORES, **OPCOES_TEXTO)
+            for pagina in sessao.percorrer(extrair=[("texto", opcoes)]):
+                texto_pagina = sessao.texto(pagina, **opcoes)
                 if texto_pagina:
                     texto_completo += texto_pagina + "\n"
             
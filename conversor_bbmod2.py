@@ -1,10 +1,15 @@
-import pdfplumber
 import re
 import pandas as pd
 from typing import Optional, List
 import os
 import tkinter as tk
 from tkinter import filedialog
+import motores
+import sessao_documento
+
+OPCOES_TEXTO = {"x_tolerance": 2, "y_tolerance": 3}
+# Motores de extração cujo texto este parser aceita (ver motores)
+MOTORES = ("pdfplumber",)
 
 # Se a lógica for diferente, altere estas funções.
 # Caso contrário, pode deixar como está.
@@ -26,10 +31,11 @@ def _extrair_transacoes_de_pdf(caminho_pdf: str) -> Optional[pd.DataFrame]:
     padrao_linha_transacao = re.compile(r'^\d{2}/\d{2}/\d{2,4}')
     padrao_valor_geral = re.compile(r'([\d\.,]+\s[CD])')
 
-    with pdfplumber.open(caminho_pdf) as pdf:
+    with sessao_documento.abrir(caminho_pdf) as sessao:
         linhas_texto: List[str] = []
-        for pagina in pdf.pages:
-            texto_pagina = pagina.extract_text(x_tolerance=2, y_tolerance=3)
+        opcoes = motores.opcoes(MOTORES, **OPCOES_TEXTO)
+        for pagina in sessao.percorrer(extrair=[("texto", opcoes)]):
+            texto_pagina = sessao.texto(pagina, **opcoes)
             if texto_pagina:
                 linhas_texto.extend(texto_pagina.split('\n'))
         
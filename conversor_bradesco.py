@@ -1,13 +1,26 @@
 import os
 import re
-import pdfplumber
+from collections import deque
 import tkinter as tk
 from tkinter import filedialog
 from xlwt import Workbook
+import motores
+import sessao_documento
 
-def extract_pdf_to_text():
-    root = tk.Tk()
-    root.withdraw()
+# Motores de extração cujo texto este parser aceita (ver motores)
+MOTORES = ("pdfplumber",)
+AMOUNT = r'\d{1,3}(?:\.\d{3})*(?:,\d{2})?'
+# "<dcto> <valor> <saldo>" ocupando a linha inteira / no final da linha
+NUMBERS_LINE_PATTERN = re.compile(rf'^(\d+)\s+(-?{AMOUNT})\s+(-?{AMOUNT})$')
+NUMBERS_TAIL_PATTERN = re.compile(rf'(\d+)\s+(-?{AMOUNT})\s+(-?{AMOUNT})$')
+NUMBERS_TAIL_STRIP_PATTERN = re.compile(rf'\s+\d+\s+[-+]?{AMOUNT}\s+[-+]?{AMOUNT}$')
+DATE_START_PATTERN = re.compile(r'^(\d{2}/\d{2}/\d{4})')
+# Regex para ENCONTRAR uma data em qualquer lugar na linha
+DATE_ANY_PATTERN = re.compile(r'(\d{2}/\d{2}/\d{4})')
+VALUE_TOKEN_PATTERN = re.compile(r'^-?[\d.,]+$')
+NEWLINE_PATTERN = re.compile(r'\r\n|\r|\n')
+
+def select_pdf():
     pdf_path = filedialog.askopenfilename(
         title="Bradesco",
         filetypes=[("PDF files", "*.pdf"), ("All files", "*.*")]
@@ -15,159 +28,222 @@ def extract_pdf_to_text():
     if not pdf_path:
         print("No file selected. Exiting.")
         return None
+    return pdf_path
 
-    output_path = os.path.join(os.path.dirname(pdf_path), "teste.txt")
-    try:
-        with pdfplumber.open(pdf_path) as pdf:
-            with open(output_path, 'w', encoding='utf-8') as txt_file:
-                for page in pdf.pages:
-                    text = page.extract_text()
-                    if text:
-                        txt_file.write(text + '\n\n')
-        print(f"Successfully extracted text to: {output_path}")
-        return output_path
-    except Exception as e:
-        print(f"An error occurred: {str(e)}")
-        return None
+def iter_pdf_lines(pdf_path):
+    """Gera as linhas do texto de cada página, como o pdfplumber as extrai, uma página por vez."""
+    with sessao_documento.abrir(pdf_path) as session:
+        options = motores.opcoes(MOTORES)
+        for page in session.percorrer(extrair=[("texto", options)]):
+            text = session.texto(page, **options)
+            if text:
+                yield from NEWLINE_PATTERN.split(text)
 
-def clean_statement(file_path: str):
-    with open(file_path, 'r', encoding='utf-8') as file:
-        lines = [line.strip() for line in file.readlines() if line.strip()]
-    if len(lines) > 5:
-        lines = lines[5:]
+def extract_pdf_to_text(pdf_path=None, output_path=None):
+    if pdf_path is None:
+        pdf_path = select_pdf()
+        if not pdf_path:
+            return None
+
+    output_path = output_path or os.path.join(os.path.dirname(pdf_path), "teste.txt")
+    # Erros de leitura seguem para quem chamou, como nas demais etapas
+    with sessao_documento.abrir(pdf_path) as session:
+        with open(output_path, 'w', encoding='utf-8') as txt_file:
+            options = motores.opcoes(MOTORES)
+            for page in session.percorrer(extrair=[("texto", options)]):
+                text = session.texto(page, **options)
+                if text:
+                    txt_file.write(text + '\n\n')
+    print(f"Successfully extracted text to: {output_path}")
+    return output_path
+
+# --- ETAPAS EM MEMÓRIA ---
+# Cada etapa recebe e devolve linhas (sem espaços nas pontas e não vazias) de forma preguiçosa.
+# Encadeadas, formam uma única passada sobre o texto do PDF; as funções que
+# reescrevem o teste.txt (modo de depuração) usam exatamente as mesmas etapas.
+
+class _Lookahead:
+    """Janela sobre um iterador que lê adiante só o necessário."""
+
+    def __init__(self, iterable):
+        self._iterator = iter(iterable)
+        self._buffer = deque()
+
+    def has(self, count):
+        while len(self._buffer) < count:
+            try:
+                self._buffer.append(next(self._iterator))
+            except StopIteration:
+                return False
+        return True
 
-    else:
-        lines = []
-    total_index = -1
-    for i, line in enumerate(lines):
+    def __getitem__(self, index):
+        return self._buffer[index]
+
+    def advance(self, count):
+        for _ in range(count):
+            self._buffer.popleft()
+
+def normalize_lines(lines):
+    for line in lines:
+        line = line.strip()
+        if line:
+            yield line
+
+def clean_statement_lines(lines):
+    """Pula as 5 primeiras linhas e para na primeira que contém 'total'."""
+    for index, line in enumerate(lines):
+        if index < 5:
+            continue
         if "total" in line.lower():
-            total_index = i
-            break
-    if total_index != -1:
-        lines = lines[:total_index]
-    with open(file_path, 'w', encoding='utf-8') as file:
-        file.write('\n'.join(lines))
-    print(f"File '{file_path}' cleaned - removed first 5 lines and everything after 'Total'.")
+            return
+        yield line
 
-def mark_all_transaction_blocks(file_path: str):
-    with open(file_path, 'r', encoding='utf-8') as file:
-        lines = [line.strip() for line in file.readlines() if line.strip()]
+def mark_transaction_blocks_lines(lines):
+    window = _Lookahead(lines)
+    while window.has(1):
+        current_line = window[0]
+        if window.has(3) and NUMBERS_LINE_PATTERN.match(window[1]):
+            yield f"*{current_line}"
+            yield window[1]
+            yield f"{window[2]}*"
+            window.advance(3)
+            continue
+        yield current_line
+        window.advance(1)
+
+def process_marked_blocks_lines(lines):
+    window = _Lookahead(lines)
+    while window.has(1):
+        current_line = window[0]
+        if current_line.startswith('*') and window.has(3) and window[2].endswith('*'):
+            yield f"*{current_line[1:]} {window[2][:-1]} {window[1]}*"
+            window.advance(3)
+        else:
+            yield current_line
+            window.advance(1)
 
-    marked_lines = []
-    i = 0
-    while i < len(lines):
-        current_line = lines[i]
-        if i + 2 < len(lines):
-            numbers_line = lines[i + 1]
-            next_string_line = lines[i + 2]
-            num_match = re.match(r'^(\d+)\s+(-?\d{1,3}(?:\.\d{3})*(?:,\d{2})?)\s+(-?\d{1,3}(?:\.\d{3})*(?:,\d{2})?)$', numbers_line)
-            if num_match:
-                marked_lines.append(f"*{current_line}")
-                marked_lines.append(numbers_line)
-                marked_lines.append(f"{next_string_line}*")
-                i += 3
+def first_exception_lines(lines):
+    window = _Lookahead(lines)
+    while window.has(1):
+        current_line = window[0]
+        if not current_line.startswith('*') and window.has(2) and not window[1].startswith('*'):
+            first_line_match = NUMBERS_TAIL_PATTERN.search(current_line)
+            if first_line_match and not NUMBERS_TAIL_PATTERN.search(window[1]):
+                desc_part = NUMBERS_TAIL_STRIP_PATTERN.sub('', current_line)
+                yield f"{desc_part} {window[1]} {first_line_match.group(0)}"
+                window.advance(2)
                 continue
-        marked_lines.append(current_line)
-        i += 1
-    with open(file_path, 'w', encoding='utf-8') as file:
-        file.write('\n'.join(marked_lines))
-    print(f"File '{file_path}' updated with marked transaction blocks.")
+        yield current_line
+        window.advance(1)
 
-def process_marked_blocks(file_path: str):
+def second_exception_lines(lines):
+    window = _Lookahead(lines)
+    while window.has(1):
+        current_line = window[0]
+        if not current_line.startswith('*') and window.has(2) and not window[1].startswith('*'):
+            if not NUMBERS_TAIL_PATTERN.search(current_line) and NUMBERS_TAIL_PATTERN.search(window[1]):
+                yield f"{current_line} {window[1]}"
+                window.advance(2)
+                continue
+        yield current_line
+        window.advance(1)
+
+def propagate_dates_lines(lines):
+    current_date = None
+    for line in lines:
+        line = line.strip('*').strip()
+        date_match = DATE_START_PATTERN.match(line)
+
+        if date_match:
+            current_date = date_match.group(1)
+            yield line
+        elif current_date:
+            yield f"{current_date} {line}"
+        else:
+            yield line
+
+def statement_lines(raw_lines):
+    """Aplica todas as etapas às linhas das páginas, numa única passada."""
+    lines = clean_statement_lines(normalize_lines(raw_lines))
+    for stage in (mark_transaction_blocks_lines, process_marked_blocks_lines,
+                  first_exception_lines, second_exception_lines, propagate_dates_lines):
+        lines = stage(normalize_lines(lines))
+    return normalize_lines(lines)
+
+# --- MODO ARQUIVO (DEPURAÇÃO) ---
+def _rewrite_file(file_path: str, stage):
     with open(file_path, 'r', encoding='utf-8') as file:
         lines = [line.strip() for line in file.readlines() if line.strip()]
-    processed_lines = []
-    i = 0
-    while i < len(lines):
-        current_line = lines[i]
-        if current_line.startswith('*') and i + 2 < len(lines) and lines[i+2].endswith('*'):
-            line1 = current_line[1:]
-
-            line2 = lines[i+1]
-            line3 = lines[i+2][:-1]
-            concatenated = f"*{line1} {line3} {line2}*"
-            processed_lines.append(concatenated)
-            i += 3
-        else:
-            processed_lines.append(current_line)
-            i += 1
+    processed_lines = list(stage(lines))
     with open(file_path, 'w', encoding='utf-8') as file:
         file.write('\n'.join(processed_lines))
+
+def clean_statement(file_path: str):
+    _rewrite_file(file_path, clean_statement_lines)
+    print(f"File '{file_path}' cleaned - removed first 5 lines and everything after 'Total'.")
+
+def mark_all_transaction_blocks(file_path: str):
+    _rewrite_file(file_path, mark_transaction_blocks_lines)
+    print(f"File '{file_path}' updated with marked transaction blocks.")
+
+def process_marked_blocks(file_path: str):
+    _rewrite_file(file_path, process_marked_blocks_lines)
     print(f"File '{file_path}' processed with wrapped concatenated blocks.")
 
 def first_exception(file_path: str):
-    with open(file_path, 'r', encoding='utf-8') as file:
-        lines = [line.strip() for line in file.readlines() if line.strip()]
-    processed_lines = []
-    i = 0
-    while i < len(lines):
-        current_line = lines[i]
-        if (not current_line.startswith('*')) and (i + 1 < len(lines)) and (not lines[i+1].startswith('*')):
-            first_line_match = re.search(r'(\d+)\s+(-?\d{1,3}(?:\.\d{3})*(?:,\d{2})?)\s+(-?\d{1,3}(?:\.\d{3})*(?:,\d{2})?)$', current_line)
-            second_line_match = re.search(r'(\d+)\s+(-?\d{1,3}(?:\.\d{3})*(?:,\d{2})?)\s+(-?\d{1,3}(?:\.\d{3})*(?:,\d{2})?)$', lines[i+1])
-            if first_line_match and not second_line_match:
-                desc_part = re.sub(r'\s+\d+\s+[-+]?\d{1,3}(?:\.\d{3})*(?:,\d{2})?\s+[-+]?\d{1,3}(?:\.\d{3})*(?:,\d{2})?$', '', current_line)
-                numbers_part = first_line_match.group(0)
-                new_line = f"{desc_part} {lines[i+1]} {numbers_part}"
-                processed_lines.append(new_line)
-                i += 2
-                continue
-        processed_lines.append(current_line)
-        i += 1
-    with open(file_path, 'w', encoding='utf-8') as file:
-        file.write('\n'.join(processed_lines))
+    _rewrite_file(file_path, first_exception_lines)
     print(f"File '{file_path}' processed with unmarked sections reformatted.")
 
 def second_exception(file_path: str):
-    with open(file_path, 'r', encoding='utf-8') as file:
-        lines = [line.strip() for line in file.readlines() if line.strip()]
-    processed_lines = []
-    i = 0
-    while i < len(lines):
-        current_line = lines[i]
-        if not current_line.startswith('*') and i + 1 < len(lines) and not lines[i+1].startswith('*'):
-            first_line_has_numbers = re.search(r'(\d+)\s+(-?\d{1,3}(?:\.\d{3})*(?:,\d{2})?)\s+(-?\d{1,3}(?:\.\d{3})*(?:,\d{2})?)$', current_line)
-            second_line_has_numbers = re.search(r'(\d+)\s+(-?\d{1,3}(?:\.\d{3})*(?:,\d{2})?)\s+(-?\d{1,3}(?:\.\d{3})*(?:,\d{2})?)$', lines[i+1])
-            if not first_line_has_numbers and second_line_has_numbers:
-                concatenated = f"{current_line} {lines[i+1]}"
-                processed_lines.append(concatenated)
-                i += 2
-                continue
-        processed_lines.append(current_line)
-        i += 1
-    with open(file_path, 'w', encoding='utf-8') as file:
-        file.write('\n'.join(processed_lines))
+    _rewrite_file(file_path, second_exception_lines)
     print(f"File '{file_path}' processed - unmarked sections concatenated.")
 
 def propagate_and_format(file_path: str):
-    with open(file_path, 'r', encoding='utf-8') as file:
-        lines = [line.strip() for line in file.readlines() if line.strip()]
-    cleaned_lines = [line.strip('*').strip() for line in lines]
-    
-    processed_lines = []
-    current_date = None
-    date_pattern = re.compile(r'^(\d{2}/\d{2}/\d{4})')
-
-    for line in cleaned_lines:
-        date_match = date_pattern.match(line)
-        
-        if date_match:
-            current_date = date_match.group(1)
-            processed_lines.append(line)
-        elif current_date:
-            processed_lines.append(f"{current_date} {line}")
-        else:
-            processed_lines.append(line)
-            
-    with open(file_path, 'w', encoding='utf-8') as file:
-        file.write('\n'.join(processed_lines))
+    _rewrite_file(file_path, propagate_dates_lines)
     print(f"File '{file_path}' processed - dates propagated correctly.")
 
 # --- FUNÇÃO CORRIGIDA ---
-def txt_to_xls(input_file: str, output_file: str):
-    with open(input_file, 'r', encoding='utf-8') as file:
-        lines = [line.strip() for line in file.readlines() if line.strip()]
+def line_to_row(line, last_valid_date):
+    """Devolve ([data, histórico, dcto, valor, saldo], last_valid_date) de uma linha já formatada."""
+    current_line_date = ''
+    remaining_text = line
 
+    # Procura pelo padrão de data na linha
+    match = DATE_ANY_PATTERN.search(line)
+
+    if match:
+        # Se encontrou, extrai a data
+        current_line_date = match.group(1)
+        last_valid_date = current_line_date
+        # Remove a data da linha para criar o histórico, substituindo apenas a primeira ocorrência
+        remaining_text = line.replace(current_line_date, '', 1).strip()
+    elif last_valid_date:
+        # Se não encontrou, usa a última data válida e o texto da linha inteira como histórico
+        current_line_date = last_valid_date
+        remaining_text = line
+
+    # O resto da lógica opera sobre o 'remaining_text' já sem a data
+    final_parts = remaining_text.split()
+    valores = []
+    for part in final_parts[-3:]:
+        if VALUE_TOKEN_PATTERN.match(part):
+            clean_val = part.replace('.', '').replace(',', '.')
+            try:
+                valores.append(float(clean_val) if '.' in clean_val else int(clean_val))
+            except ValueError:
+                valores.append(part)
+        else:
+            valores.append(part)
+
+    historico_parts = final_parts[:-3] if len(final_parts) > 3 else []
+    historico = ' '.join(historico_parts)
+
+    row = [current_line_date, historico]
+    row.extend(valores[col] if col < len(valores) else '' for col in range(3))
+    return row, last_valid_date
+
+def write_xls(lines, output_file: str):
     wb = Workbook()
     ws = wb.add_sheet('Transacoes')
     headers = ['Data', 'Histórico', 'Dcto.', 'Valor', 'Saldo']
@@ -176,69 +252,53 @@ def txt_to_xls(input_file: str, output_file: str):
 
     row = 1
     last_valid_date = None
-    # Regex para ENCONTRAR uma data em qualquer lugar na linha
-    date_pattern = re.compile(r'(\d{2}/\d{2}/\d{4})')
-    
     for line in lines:
-        current_line_date = ''
-        remaining_text = line
-        
-        # Procura pelo padrão de data na linha
-        match = date_pattern.search(line)
-        
-        if match:
-            # Se encontrou, extrai a data
-            current_line_date = match.group(1)
-            last_valid_date = current_line_date
-            # Remove a data da linha para criar o histórico, substituindo apenas a primeira ocorrência
-            remaining_text = line.replace(current_line_date, '', 1).strip()
-        elif last_valid_date:
-            # Se não encontrou, usa a última data válida e o texto da linha inteira como histórico
-            current_line_date = last_valid_date
-            remaining_text = line
-
-        # O resto da lógica opera sobre o 'remaining_text' já sem a data
-        final_parts = remaining_text.split()
-        valores = []
-        for part in final_parts[-3:]:
-            if re.match(r'^-?[\d.,]+$', part):
-                clean_val = part.replace('.', '').replace(',', '.')
-                try:
-                    valores.append(float(clean_val) if '.' in clean_val else int(clean_val))
-                except ValueError:
-                    valores.append(part)
-            else:
-                valores.append(part)
-                
-        historico_parts = final_parts[:-3] if len(final_parts) > 3 else []
-        historico = ' '.join(historico_parts)
-
-        ws.write(row, 0, current_line_date)
-        ws.write(row, 1, historico)
-        for col in range(3):
-            val = valores[col] if col < len(valores) else ''
-            ws.write(row, col+2, val)
+        values, last_valid_date = line_to_row(line, last_valid_date)
+        for col, val in enumerate(values):
+            ws.write(row, col, val)
         row += 1
-        
+
     ws.col(0).width = 3000
     ws.col(1).width = 12000
     for col in range(2,5):
         ws.col(col).width = 4000
     wb.save(output_file)
     print(f'Successfully exported to {output_file}')
+    return row - 1
+
+def txt_to_xls(input_file: str, output_file: str):
+    with open(input_file, 'r', encoding='utf-8') as file:
+        lines = [line.strip() for line in file.readlines() if line.strip()]
+    return write_xls(lines, output_file)
 # --- FIM DA FUNÇÃO CORRIGIDA ---
 
+def convert_pdf(pdf_path, xls_path=None, debug=False, txt_path=None):
+    """
+    Converte um extrato do Bradesco em .xls e devolve (caminho da planilha, linhas gravadas).
+    Por padrão o texto do PDF passa por todas as etapas em memória; com debug=True o antigo
+    teste.txt é gravado e reescrito a cada etapa, para ser inspecionado.
+    Erros em qualquer etapa (inclusive na leitura do PDF) seguem para quem chamou.
+    """
+    output_file = xls_path or os.path.join(os.path.dirname(pdf_path), 'transacoes.xls')
+    if debug:
+        file_path = extract_pdf_to_text(pdf_path, txt_path)
+        clean_statement(file_path)
+        mark_all_transaction_blocks(file_path)
+        process_marked_blocks(file_path)
+        first_exception(file_path)
+        second_exception(file_path)
+        propagate_and_format(file_path)
+        return output_file, txt_to_xls(file_path, output_file)
+
+    return output_file, write_xls(statement_lines(iter_pdf_lines(pdf_path)), output_file)
+
 def main():
-    file_path = extract_pdf_to_text()
-    if not file_path:
-        return
-    clean_statement(file_path)
-    mark_all_transaction_blocks(file_path)
-    process_marked_blocks(file_path)
-    first_exception(file_path)
-    second_exception(file_path)
-    propagate_and_format(file_path)
-    txt_to_xls(file_path, os.path.join(os.path.dirname(file_path), 'transacoes.xls'))
-    
+    pdf_path = select_pdf()
+    if not pdf_path:
+        return None
+    return convert_pdf(pdf_path)
+
 if __name__ == "__main__":
+    root = tk.Tk()
+    root.withdraw()
     main()
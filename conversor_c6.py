@@ -2,10 +2,17 @@
 
 import os
 import re
-import pdfplumber
 import pandas as pd
 from tkinter import filedialog, messagebox
 import traceback
+import motores
+import sessao_documento
+from metadados import ano_do_mes, metadados_do_extrato
+
+SENHA_PADRAO = '062237'
+OPCOES_TEXTO = {"x_tolerance": 2}
+# Motores de extração cujo texto este parser aceita (ver motores)
+MOTORES = ("pdfplumber",)
 
 def limpar_valor(valor_str):
     """
@@ -33,20 +40,18 @@ def extrair_dados_do_pdf(pdf_path, senha):
     """
     transacoes = []
     
-    with pdfplumber.open(pdf_path, password=senha) as pdf:
-        ano = None
-        texto_completo_para_ano = "".join([p.extract_text() or "" for p in pdf.pages])
-        ano_match = re.search(r'Período \d{1,2} de \w+ de (\d{4})', texto_completo_para_ano) or \
-                    re.search(r'exportado no dia \d{1,2} de \w+ de (\d{4})', texto_completo_para_ano)
-        if ano_match:
-            ano = ano_match.group(1)
-        else:
+    with sessao_documento.abrir(pdf_path, senha) as sessao:
+        # O ano vem do cabeçalho da primeira página ("Período ..." ou "exportado no dia ...")
+        metadados = metadados_do_extrato(pdf_path, pdf=sessao)
+        if not metadados["ano"]:
             raise ValueError("Não foi possível encontrar o ano no extrato.")
 
         data_transacao_atual = None
 
-        for page in pdf.pages:
-            texto_pagina = page.extract_text(x_tolerance=2)
+        # A extração das páginas pode rodar em paralelo; data_transacao_atual segue em ordem
+        opcoes = motores.opcoes(MOTORES, **OPCOES_TEXTO)
+        for page in sessao.percorrer(transacoes, extrair=[("texto", opcoes)]):
+            texto_pagina = sessao.texto(page, **opcoes)
             if not texto_pagina:
                 continue
 
@@ -65,7 +70,7 @@ def extrair_dados_do_pdf(pdf_path, senha):
                         # Valida se a data extraída é válida (ex: não contém mês "00")
                         dia, mes = data_match.group(1).split('/')
                         if 1 <= int(mes) <= 12 and 1 <= int(dia) <= 31:
-                            data_transacao_atual = f"{data_match.group(1)}/{ano}"
+                            data_transacao_atual = f"{data_match.group(1)}/{ano_do_mes(mes, metadados)}"
                     except (ValueError, IndexError):
                         continue # Pula se o formato da data estiver quebrado
                 
@@ -106,7 +111,7 @@ def iniciar_processamento(pdf_path=None):
             return False
 
     try:
-        df = extrair_dados_do_pdf(pdf_path, senha='062237')
+        df = extrair_dados_do_pdf(pdf_path, senha=SENHA_PADRAO)
 
         if df.empty:
             messagebox.showwarning("Aviso", "Nenhuma transação válida foi encontrada no arquivo.")
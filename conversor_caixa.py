@@ -9,9 +9,79 @@ import os
 import re
 import sys
 from datetime import datetime
+from bisect import bisect_left
+from itertools import chain
+from functools import lru_cache
 
+import numpy as np
 import pandas as pd
-import pdfplumber  # Biblioteca mais robusta para extrair texto de PDFs
+
+import motores
+import sessao_documento
+
+TEXT_OPTIONS = {"x_tolerance": 3, "y_tolerance": 3}
+# Motores de extração cujo texto este parser aceita (ver motores)
+MOTORES = ("pdfplumber",)
+
+# Formatos de data, na ordem de preferência. MM/DD/YYYY tem o mesmo padrão que DD/MM/YYYY
+# e por isso nunca é escolhido: a regex identifica o formato, não a ordem dos campos.
+DATE_PATTERNS = [
+    r'\d{2}/\d{2}/\d{4}',    # DD/MM/YYYY (mais comum em extratos brasileiros)
+    r'\d{4}-\d{2}-\d{2}',     # YYYY-MM-DD
+    r'\d{4}/\d{2}/\d{2}',     # YYYY/MM/DD
+    r'\d{2}\.\d{2}\.\d{4}',  # DD.MM.YYYY
+]
+# Formato do strptime de cada padrão (o mesmo usado por parse_date) e, para padrões
+# desconhecidos, os formatos tentados em sequência
+DATE_FORMATS = {
+    r'\d{2}/\d{2}/\d{4}': '%d/%m/%Y',
+    r'\d{4}-\d{2}-\d{2}': '%Y-%m-%d',
+    r'\d{4}/\d{2}/\d{2}': '%Y/%m/%d',
+    r'\d{2}\.\d{2}\.\d{4}': '%d.%m.%Y',
+}
+FALLBACK_DATE_FORMATS = ('%d/%m/%Y', '%m/%d/%Y', '%Y-%m-%d', '%Y/%m/%d', '%d.%m.%Y')
+# Trecho inicial do texto usado para identificar o formato de data; o texto todo só é
+# percorrido se nenhum formato aparecer nele
+DATE_SAMPLE_SIZE = 5000
+
+# Valor com indicador opcional de débito/crédito. O indicador fica num grupo opcional
+# (e não "\s*[DC]?") para que o espaço entre dois valores só possa ser consumido de um jeito.
+AMOUNT = r'[\d\.,]+(?:\s*[DC])?'
+# O valor do fim da linha começa sempre no início de uma sequência de dígitos; o lookbehind
+# descarta logo as posições do meio dela, e cada sequência é percorrida uma vez só
+BALANCE_AT_END_PATTERN = re.compile(rf'(?<![\d\.,])({AMOUNT})\s*$')
+# Peças dos padrões 1 e 2, casadas uma a uma a partir de uma posição (ver match_structured)
+SPACE = re.compile(r'\s+')
+AMOUNT_DIGITS = re.compile(r'[\d\.,]+')
+AMOUNT_SUFFIX = re.compile(r'\s*[DC]')
+CODE = re.compile(r'\w+')
+# O que float() aceita depois que clean_monetary_value remove todo o resto
+NUMBER_PATTERN = r'[+-]?(?:\d+\.?\d*|\.\d+)'
+# Quantas linhas não convertidas são listadas nos avisos
+MAX_REPORTED_ROWS = 20
+
+# Linhas que são cabeçalhos ou totais, e não transações reais
+SKIP_WORDS = ("SALDO DIA", "SALDO ANTERIOR", "TOTAL", "Data Mov", "Histórico", "Valor")
+PATTERN_NAMES = ("data/código/descrição/valor/saldo", "data/descrição/valor/saldo", "data + texto livre")
+
+
+def iter_pdf_lines(pdf_path):
+    """
+    Gera as linhas de texto do PDF página a página, abrindo o arquivo uma única vez.
+    Páginas sem texto extraível caem para a extração de tabelas (uma linha por linha de tabela)
+    """
+    # A sessão libera os objetos de cada página já lida, para a memória não crescer com o número de páginas
+    with sessao_documento.abrir(pdf_path) as sessao:
+        options = motores.opcoes(MOTORES, **TEXT_OPTIONS)
+        for number, page in enumerate(sessao.percorrer(extrair=[("texto", options)]), 1):
+            text = sessao.texto(page, **options)
+            if text and text.strip():
+                yield from text.split('\n')
+            else:
+                print(f"Aviso: A página {number} não tem texto extraível diretamente; tentando extrair tabelas.")
+                for table in sessao.tabelas(page):
+                    for row in table:
+                        yield " ".join([cell or "" for cell in row])
 
 
 def extract_text_from_pdf(pdf_path):
@@ -19,53 +89,158 @@ def extract_text_from_pdf(pdf_path):
     Extrai o texto completo de um arquivo PDF usando pdfplumber,
     que é mais robusto para extrair textos com formatação estruturada
     """
-    all_text = ""
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text(x_tolerance=3, y_tolerance=3)
-                if text:
-                    all_text += text + "\n"
-        
-        if not all_text.strip():
-            print("Aviso: O PDF parece estar vazio ou o texto não pôde ser extraído diretamente.")
-            # Tente outra abordagem - extrair tabelas
-            with pdfplumber.open(pdf_path) as pdf:
-                for page in pdf.pages:
-                    tables = page.extract_tables()
-                    for table in tables:
-                        for row in table:
-                            all_text += " ".join([cell or "" for cell in row]) + "\n"
-        
-        return all_text
+        return "".join(line + "\n" for line in iter_pdf_lines(pdf_path))
     except Exception as e:
         print(f"Erro ao extrair texto do PDF: {e}")
         return None
 
 
-def identify_date_pattern(text):
+def identify_date_pattern(text, sample_size=DATE_SAMPLE_SIZE):
     """
     Identifica o padrão de data usado no extrato bancário
     Suporta DD/MM/YYYY e outros formatos comuns
     """
-    # Verifica o padrão DD/MM/YYYY (mais comum em extratos brasileiros)
-    if re.search(r'\d{2}/\d{2}/\d{4}', text):
-        return r'\d{2}/\d{2}/\d{4}'
-    # Verifica o padrão MM/DD/YYYY
-    elif re.search(r'\d{2}/\d{2}/\d{4}', text):
-        return r'\d{2}/\d{2}/\d{4}'
-    # Verifica o padrão YYYY-MM-DD
-    elif re.search(r'\d{4}-\d{2}-\d{2}', text):
-        return r'\d{4}-\d{2}-\d{2}'
-    # Verifica o padrão YYYY/MM/DD
-    elif re.search(r'\d{4}/\d{2}/\d{2}', text):
-        return r'\d{4}/\d{2}/\d{2}'
-    # Verifica o padrão DD.MM.YYYY
-    elif re.search(r'\d{2}\.\d{2}\.\d{4}', text):
-        return r'\d{2}\.\d{2}\.\d{4}'
-    else:
+    samples = (text[:sample_size], text) if len(text) > sample_size else (text,)
+    for sample in samples:
+        for pattern in DATE_PATTERNS:
+            if re.search(pattern, sample):
+                return pattern
+    return None
+
+
+def identify_date_pattern_in_lines(lines, sample_size=DATE_SAMPLE_SIZE):
+    """
+    Versão em fluxo de identify_date_pattern: lê do início só o necessário para a amostra.
+    Devolve o padrão, as linhas já lidas e um iterador com todas as linhas (inclusive essas)
+    """
+    lines = iter(lines)
+    sample, size = [], 0
+    for line in lines:
+        sample.append(line)
+        size += len(line) + 1
+        if size >= sample_size:
+            break
+    date_pattern = identify_date_pattern('\n'.join(sample))
+
+    # Sem data na amostra, segue lendo até a primeira linha que tenha uma
+    while date_pattern is None:
+        line = next(lines, None)
+        if line is None:
+            break
+        sample.append(line)
+        date_pattern = identify_date_pattern(line)
+
+    return date_pattern, sample, chain(sample, lines)
+
+
+@lru_cache(maxsize=None)
+def compile_transaction_patterns(date_pattern):
+    r"""
+    Compila, uma vez por formato de data, a regex de data, a que encontra todos os inícios
+    de data da linha (inclusive sobrepostos, como a busca da regex faria) e o padrão 3.
+
+    Os padrões 1 e 2 são casados por match_structured, que dá o mesmo resultado das regex
+    originais em tempo linear no tamanho da linha:
+        Padrão 1: data, código, descrição, valor, saldo
+            ({data})\s+(\d+|\w+)\s+(.*?)\s+({AMOUNT})\s+({AMOUNT})
+        Padrão 2: data, descrição, valor, saldo (sem código)
+            ({data})\s+(.*?)\s+({AMOUNT})\s+({AMOUNT})
+    """
+    return (re.compile(date_pattern), re.compile(rf'(?=({date_pattern}))'),
+            # Padrão 3: data no início da linha seguida por qualquer conteúdo
+            re.compile(rf'({date_pattern})(.+)'))
+
+
+def amount_end(line, pos):
+    """
+    Fim do valor (AMOUNT) que começa em pos, ou None. Os dígitos e o indicador D/C são
+    sempre tomados inteiros: uma parte deles nunca é seguida do espaço que a regex exige
+    """
+    digits = AMOUNT_DIGITS.match(line, pos)
+    if not digits:
+        return None
+    suffix = AMOUNT_SUFFIX.match(line, digits.end())
+    return suffix.end() if suffix else digits.end()
+
+
+def balance_after(line, pos):
+    r"""
+    Saldo de \s+({AMOUNT})\s+({AMOUNT}) casado a partir de pos, ou None
+    """
+    space = SPACE.match(line, pos)
+    end = space and amount_end(line, space.end())
+    space = end and SPACE.match(line, end)
+    end = space and amount_end(line, space.end())
+    return line[space.end():end] if end else None
+
+
+def match_structured(line, date_starts):
+    """
+    Casa os padrões 1 e 2 na linha, com o mesmo resultado de re.search nas regex originais.
+    Devolve ((data, descrição, saldo) ou None, para o padrão 1; idem para o padrão 2).
+
+    A regex procura a primeira data seguida de espaço; o (.*?) termina no primeiro espaço,
+    depois do início da descrição, que é seguido de dois valores. Se nenhum servir e o
+    espaço antes da descrição tiver dois caracteres ou mais, a regex devolve a descrição
+    vazia com os valores logo depois dele. Aqui cada espaço da linha é testado uma vez e,
+    para cada data, o primeiro espaço que serve é achado por busca binária.
+    """
+    spaces = [(space.start(), space.end()) for space in SPACE.finditer(line)]
+    starts = [start for start, _ in spaces]
+    # next_ok[i]: primeiro espaço a partir do i-ésimo seguido de dois valores (e o saldo)
+    next_ok = [None] * (len(spaces) + 1)
+    for i in range(len(spaces) - 1, -1, -1):
+        balance = balance_after(line, spaces[i][0])
+        next_ok[i] = (i, balance) if balance is not None else next_ok[i + 1]
+
+    def description_and_balance(space_index):
+        # Descrição que começa depois do espaço space_index
+        start, end = spaces[space_index]
+        found = next_ok[space_index + 1]
+        if found:
+            return line[end:spaces[found[0]][0]], found[1]
+        if end - start >= 2 and next_ok[space_index] and next_ok[space_index][0] == space_index:
+            return "", next_ok[space_index][1]
         return None
 
+    results = [None, None]
+    for date in date_starts.finditer(line):
+        space_index = bisect_left(starts, date.end(1))
+        if space_index == len(spaces) or starts[space_index] != date.end(1):
+            continue  # A data não é seguida de espaço
+        if results[1] is None:
+            found = description_and_balance(space_index)
+            if found:
+                results[1] = (date.group(1), found[0].strip(), found[1].strip())
+        if results[0] is None:
+            code = CODE.match(line, spaces[space_index][1])
+            code_space = code and bisect_left(starts, code.end())
+            if code and code_space < len(spaces) and starts[code_space] == code.end():
+                found = description_and_balance(code_space)
+                if found:
+                    results[0] = (date.group(1), found[0].strip(), found[1].strip())
+        if results[0] is not None:
+            break
+    return tuple(results)
+
+
+def transaction_fields(match):
+    """
+    Devolve (data, descrição, saldo) de uma correspondência do padrão 3
+    """
+    date = match.group(1)
+    remaining_text = match.group(2).strip()
+    # Tenta extrair o último número da linha como saldo
+    balance_match = BALANCE_AT_END_PATTERN.search(remaining_text)
+    if balance_match:
+        balance = balance_match.group(1).strip()
+        # O que sobra pode ser a descrição
+        description = remaining_text.rsplit(balance, 1)[0].strip()
+        return date, description, balance
+    # Se não conseguir extrair o saldo, usa o texto restante como descrição
+    return date, remaining_text, "Não identificado"
+
 
 def parse_date(date_str, date_pattern):
     """
@@ -95,100 +270,70 @@ def parse_date(date_str, date_pattern):
             return None
 
 
-def extract_transactions_from_text(text):
+def extract_transactions_from_text(text, date_pattern=None):
     """
     Extrai transações do texto do extrato bancário usando padrões mais flexíveis
     """
+    return extract_transactions_from_lines(text.split('\n'), date_pattern or identify_date_pattern(text))
+
+
+def extract_transactions_from_lines(lines, date_pattern=None):
+    """
+    Extrai transações de um iterável de linhas (por exemplo, iter_pdf_lines), numa única passada.
+    Os padrões são tentados em ordem em cada linha; o tempo de cada uma é linear no seu tamanho.
+    """
     # Detecta o padrão de data usado no documento
-    date_pattern = identify_date_pattern(text)
+    if not date_pattern:
+        date_pattern, _, lines = identify_date_pattern_in_lines(lines)
     if not date_pattern:
         print("Não foi possível identificar o padrão de data no extrato.")
         return []
 
+    date_regex, date_starts, free_text_pattern = compile_transaction_patterns(date_pattern)
+    hits = [0] * len(PATTERN_NAMES)
+
     transactions = []
-    lines = text.split('\n')
-    
+
     # Para diagnóstico, mostra algumas linhas
     print("\nPrimeiras 5 linhas do texto extraído:")
-    for i, line in enumerate(lines[:5]):
-        print(f"{i+1}: {line}")
-    
-    # Diferentes padrões para extrair transações
-    patterns = [
-        # Padrão 1: data, código, descrição, valor, saldo
-        fr'({date_pattern})\s+(\d+|\w+)\s+(.*?)\s+([\d\.,]+\s*[DC]?)\s+([\d\.,]+\s*[DC]?)',
-        
-        # Padrão 2: data, descrição, valor, saldo (sem código)
-        fr'({date_pattern})\s+(.*?)\s+([\d\.,]+\s*[DC]?)\s+([\d\.,]+\s*[DC]?)',
-        
-        # Padrão 3: data no início da linha seguida por qualquer conteúdo
-        fr'({date_pattern})(.+)'
-    ]
     
-    for line in lines:
+    for i, line in enumerate(lines):
+        if i < 5:
+            print(f"{i+1}: {line}")
         line = line.strip()
         if not line:
             continue
             
         # Se a linha não tiver uma data, pule
-        if not re.search(date_pattern, line):
+        if not date_regex.search(line):
             continue
-            
-        # Tenta cada padrão de extração
-        for pattern_index, pattern in enumerate(patterns):
-            match = re.search(pattern, line)
-            if match:
-                try:
-                    if pattern_index == 0:  # Padrão 1
-                        date = match.group(1)
-                        description = match.group(3).strip()
-                        # Determina qual grupo tem o saldo
-                        if 'C' in match.group(5) or 'D' in match.group(5):
-                            balance = match.group(5).strip()
-                        else:
-                            # Tenta inferir se não há indicador C/D
-                            balance = match.group(5).strip()
-                    
-                    elif pattern_index == 1:  # Padrão 2
-                        date = match.group(1)
-                        description = match.group(2).strip()
-                        balance = match.group(4).strip()
-                    
-                    elif pattern_index == 2:  # Padrão 3 - extração mais básica
-                        date = match.group(1)
-                        remaining_text = match.group(2).strip()
-                        
-                        # Tenta extrair o último número da linha como saldo
-                        balance_match = re.search(r'([\d\.,]+\s*[DC]?)\s*$', remaining_text)
-                        if balance_match:
-                            balance = balance_match.group(1).strip()
-                            # O que sobra pode ser a descrição
-                            description_parts = remaining_text.rsplit(balance, 1)
-                            description = description_parts[0].strip()
-                        else:
-                            # Se não conseguir extrair o saldo, usa o texto restante como descrição
-                            description = remaining_text
-                            balance = "Não identificado"
-                    
-                    # Filtra linhas que são cabeçalhos ou não são transações reais
-                    skip_words = ["SALDO DIA", "SALDO ANTERIOR", "TOTAL", "Data Mov", "Histórico", "Valor"]
-                    if any(word in description for word in skip_words):
-                        continue
-                        
-                    transactions.append({
-                        'Data': date,
-                        'Histórico': description,
-                        'Saldo': balance
-                    })
-                    
-                    # Se encontrou uma correspondência, não precisa tentar os outros padrões
-                    break
-                        
-                except Exception as e:
-                    print(f"Erro ao processar linha '{line}': {e}")
-                    continue
+
+        # Tenta cada padrão de extração; o 3 só é casado se os estruturados não servirem
+        for pattern_index, fields in enumerate(chain(match_structured(line, date_starts), [None])):
+            if pattern_index == 2:
+                match = free_text_pattern.search(line)
+                fields = match and transaction_fields(match)
+            if not fields:
+                continue
+            date, description, balance = fields
+
+            # Filtra linhas que são cabeçalhos ou não são transações reais
+            if any(word in description for word in SKIP_WORDS):
+                continue
+
+            transactions.append({
+                'Data': date,
+                'Histórico': description,
+                'Saldo': balance
+            })
+            hits[pattern_index] += 1
+
+            # Se encontrou uma correspondência, não precisa tentar os outros padrões
+            break
     
     print(f"Total de transações encontradas: {len(transactions)}")
+    for name, count in zip(PATTERN_NAMES, hits):
+        print(f"  {name}: {count}")
     return transactions
 
 
@@ -229,6 +374,63 @@ def clean_monetary_value(value_str):
         return None
 
 
+def parse_dates(dates, date_pattern):
+    """
+    Versão vetorizada de parse_date para a coluna inteira.
+    Devolve as datas convertidas e a máscara das linhas que não puderam ser convertidas
+    """
+    date_format = DATE_FORMATS.get(date_pattern)
+    if date_format:
+        parsed = pd.to_datetime(dates, format=date_format, errors='coerce')
+    else:
+        # Como parse_date: tenta os formatos comuns, na ordem, para cada linha ainda não convertida
+        parsed = None
+        for date_format in FALLBACK_DATE_FORMATS:
+            attempt = pd.to_datetime(dates, format=date_format, errors='coerce')
+            # Um formato sem nenhum acerto não define a coluna (evita herdar a resolução de uma coluna só de NaT)
+            parsed = attempt if parsed is None or parsed.isna().all() else parsed.fillna(attempt)
+        if parsed.isna().all():
+            # Sem nenhuma data válida, o apply de parse_date produzia uma coluna de None
+            return pd.Series([None] * len(dates), index=dates.index, dtype=object), parsed.isna()
+    return parsed, parsed.isna()
+
+
+def clean_monetary_values(values):
+    """
+    Versão vetorizada de clean_monetary_value: converte a coluna inteira, tratando os
+    indicadores D/C e o separador de milhar brasileiro.
+    Devolve os valores e a máscara das linhas que não puderam ser convertidas
+    """
+    # Só dígitos, pontos, vírgulas e sinais (D e C saem logo em seguida no original)
+    cleaned = values.str.replace(r'[^\d\.,\-+]', '', regex=True)
+    is_debit = values.str.contains('D', regex=False) | values.str.contains('-', regex=False)
+
+    # Com vírgula, ela é o separador decimal e os pontos são de milhar (1.234,56 ou 1234,56)
+    has_comma = cleaned.str.contains(',', regex=False, na=False)
+    cleaned = cleaned.where(~has_comma, cleaned.str.replace('.', '', regex=False).str.replace(',', '.', regex=False))
+
+    valid = cleaned.str.fullmatch(NUMBER_PATTERN).fillna(False).astype(bool)
+    if not valid.any():
+        # Sem nenhum número, o apply de clean_monetary_value produzia uma coluna de None
+        return pd.Series([None] * len(values), index=values.index, dtype=object), ~valid
+
+    converted = pd.Series(np.nan, index=values.index)
+    converted[valid] = cleaned[valid].to_numpy(dtype=object).astype(float)
+    # Se for débito, torna o valor negativo (se já não for)
+    negate = (is_debit.fillna(False).astype(bool) & (converted > 0)).to_numpy()
+    converted[negate] = -converted[negate]
+    return converted, ~valid
+
+
+def describe_rows(mask):
+    """
+    Lista (limitada) dos índices marcados em mask, para os avisos
+    """
+    rows = mask[mask].index.tolist()
+    listed = ', '.join(str(row) for row in rows[:MAX_REPORTED_ROWS])
+    return f"{listed}, ..." if len(rows) > MAX_REPORTED_ROWS else listed
+
+
 def process_transactions(transactions, date_pattern):
     """
     Processa a lista de transações e cria um DataFrame
@@ -239,34 +441,22 @@ def process_transactions(transactions, date_pattern):
     # Cria o DataFrame
     df = pd.DataFrame(transactions)
     
-    # Tenta converter datas
-    try:
-        df['Data'] = df['Data'].apply(lambda x: parse_date(x, date_pattern))
-    except Exception as e:
-        print(f"Aviso: Não foi possível converter as datas: {e}")
+    # Converte as datas de uma vez
+    dates, invalid = parse_dates(df['Data'], date_pattern)
+    if invalid.any():
+        print(f"Aviso: {invalid.sum()} datas não puderam ser convertidas (linhas {describe_rows(invalid)}).")
+    if date_pattern in DATE_FORMATS and invalid.any():
         # Mantém as datas como strings se a conversão falhar
+        print("Aviso: As datas foram mantidas como texto.")
+    else:
+        df['Data'] = dates
     
-    # Tenta converter valores de saldo
+    # Converte os valores de saldo de uma vez
     if 'Saldo' in df.columns:
-        try:
-            # Cria uma cópia da coluna original antes de tentar converter
-            df['Saldo_Original'] = df['Saldo']
-            df['Saldo'] = df['Saldo'].apply(clean_monetary_value)
-            
-            # Se houve valores que não puderam ser convertidos (None), restaura o valor original
-            mask = df['Saldo'].isna()
-            if mask.any():
-                print(f"Aviso: {mask.sum()} valores de saldo não puderam ser convertidos.")
-                # Opcionalmente: df.loc[mask, 'Saldo'] = df.loc[mask, 'Saldo_Original']
-        except Exception as e:
-            print(f"Aviso: Não foi possível converter os valores de saldo: {e}")
-            # Restaura a coluna original se a conversão falhar completamente
-            if 'Saldo_Original' in df.columns:
-                df['Saldo'] = df['Saldo_Original']
-        finally:
-            # Remove a coluna temporária
-            if 'Saldo_Original' in df.columns:
-                df.drop('Saldo_Original', axis=1, inplace=True)
+        balances, invalid = clean_monetary_values(df['Saldo'])
+        df['Saldo'] = balances
+        if invalid.any():
+            print(f"Aviso: {invalid.sum()} valores de saldo não puderam ser convertidos (linhas {describe_rows(invalid)}).")
     
     return df
 
@@ -290,25 +480,29 @@ def main():
         args.output = f"{base_name}_processado.csv"
     
     print(f"Extraindo dados do arquivo: {args.pdf_path}")
-    text = extract_text_from_pdf(args.pdf_path)
-    
-    if not text:
-        print("Erro: Não foi possível extrair texto do PDF.")
-        sys.exit(1)
-    
-    if args.verbose:
-        print("\n--- Trecho do texto extraído ---")
-        print(text[:500])
-        print("--- Fim do trecho ---\n")
-    
-    date_pattern = identify_date_pattern(text)
-    if not date_pattern:
-        print("Erro: Não foi possível identificar o padrão de data no extrato.")
+    try:
+        # As linhas são lidas página a página; só a amostra inicial fica guardada
+        date_pattern, sample, lines = identify_date_pattern_in_lines(iter_pdf_lines(args.pdf_path))
+
+        if not any(line.strip() for line in sample):
+            print("Erro: Não foi possível extrair texto do PDF.")
+            sys.exit(1)
+
+        if args.verbose:
+            print("\n--- Trecho do texto extraído ---")
+            print("\n".join(sample)[:500])
+            print("--- Fim do trecho ---\n")
+
+        if not date_pattern:
+            print("Erro: Não foi possível identificar o padrão de data no extrato.")
+            sys.exit(1)
+
+        print(f"Padrão de data identificado: {date_pattern}")
+        transactions = extract_transactions_from_lines(lines, date_pattern)
+    except Exception as e:
+        print(f"Erro ao extrair texto do PDF: {e}")
         sys.exit(1)
     
-    print(f"Padrão de data identificado: {date_pattern}")
-    transactions = extract_transactions_from_text(text)
-    
     if not transactions:
         print("Erro: Nenhuma transação foi encontrada no texto extraído.")
         sys.exit(1)
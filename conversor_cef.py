@@ -1,28 +1,32 @@
 # Seu código original de 'conversor_caixa.py' parece ser projetado para linha de comando.
 # Esta versão é simplificada para ser chamada pelo menu.
-import pdfplumber
 import pandas as pd
 import os
 from tkinter import filedialog
+import sessao_documento
 
 def main():
     pdf_path = filedialog.askopenfilename(title="Selecione o PDF da Caixa", filetypes=[("PDF files", "*.pdf")])
     if not pdf_path:
         raise UserWarning("Nenhum arquivo selecionado.")
-    
-    all_text = ""
-    with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
-            text = page.extract_text()
+    converter_pdf(pdf_path)
+    return True
+
+def iter_pdf_lines(pdf_path):
+    # Linhas do extract_text() de cada página, em ordem, com o PDF aberto uma vez; páginas sem texto são puladas
+    with sessao_documento.abrir(pdf_path) as sessao:
+        for page in sessao.percorrer(extrair=[("texto", {})]):
+            text = sessao.texto(page)
             if text:
-                all_text += text + "\n"
-    
+                yield from text.split('\n')
+
+def converter_pdf(pdf_path):
     # Esta é uma extração simplificada. A lógica complexa do seu script original
     # pode ser colada aqui se esta não for suficiente.
     import re
     transactions = []
     date_pattern = re.compile(r'(\d{2}/\d{2}/\d{4})')
-    for line in all_text.split('\n'):
+    for line in iter_pdf_lines(pdf_path):
         if date_pattern.search(line):
             parts = line.split()
             if len(parts) > 2:
@@ -36,4 +40,5 @@ def main():
 
     df = pd.DataFrame(transactions, columns=['Data', 'Histórico', 'Valor/Saldo'])
     csv_path = os.path.splitext(pdf_path)[0] + ".csv"
-    df.to_csv(csv_path, index=False, sep=';', encoding='utf-8-sig')
\ No newline at end of file
+    df.to_csv(csv_path, index=False, sep=';', encoding='utf-8-sig')
+    return df
\ No newline at end of file
@@ -1,8 +1,13 @@
 import pandas as pd
-import pdfplumber
 import re
 import os
 from tkinter import messagebox
+import motores
+import sessao_documento
+from metadados import MESES, metadados_do_extrato
+
+# Motores de extração cujo texto este parser aceita (ver motores)
+MOTORES = ("pdfplumber",)
 
 # A função agora se chama iniciar_processamento para corresponder ao CONVERTERS
 def iniciar_processamento(pdf_path):
@@ -18,26 +23,26 @@ def iniciar_processamento(pdf_path):
         csv_path = os.path.splitext(pdf_path)[0] + ".csv"
         datas, historicos, valores = [], [], []
 
-        meses = {
-            "Janeiro": "01", "Fevereiro": "02", "Março": "03", "Abril": "04",
-            "Maio": "05", "Junho": "06", "Julho": "07", "Agosto": "08",
-            "Setembro": "09", "Outubro": "10", "Novembro": "11", "Dezembro": "12"
-        }
-
         date_pattern = re.compile(r"(\d{1,2}) de (\w+) de (\d{4})")
         valor_pattern = re.compile(r"(-?)R\$\s*(\d{1,3}(?:\.\d{3})*,\d{2})")
         ultima_data = "01/01/2000"
 
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text()
+        with sessao_documento.abrir(pdf_path) as sessao:
+            # Lançamentos anteriores à primeira data do extrato ficam com o início do período
+            inicio = metadados_do_extrato(pdf_path, pdf=sessao)["inicio"]
+            if inicio:
+                ultima_data = inicio.strftime("%d/%m/%Y")
+            # A extração das páginas pode rodar em paralelo; ultima_data segue página a página, em ordem
+            opcoes = motores.opcoes(MOTORES)
+            for page in sessao.percorrer(datas, extrair=[("texto", opcoes)]):
+                text = sessao.texto(page, **opcoes)
                 if text:
                     lines = text.split("\n")
                     for line in lines:
                         date_match = date_pattern.search(line)
                         if date_match:
                             dia, mes, ano = date_match.groups()
-                            mes_numero = meses.get(mes, "00")
+                            mes_numero = f"{MESES.get(mes.lower(), 0):02d}"
                             ultima_data = f"{dia}/{mes_numero}/{ano}"
 
                         match = valor_pattern.search(line)
@@ -54,6 +59,7 @@ def iniciar_processamento(pdf_path):
 
         df = pd.DataFrame({"Data": datas, "Histórico": historicos, "Valor": valores})
         df.to_csv(csv_path, index=False, sep=';', encoding="utf-8-sig")
+        return df
         
         # O menu principal já mostra uma mensagem de sucesso, então esta é opcional
         # messagebox.showinfo("Sucesso (Inter)", f"Arquivo salvo com sucesso:\n{csv_path}")
@@ -1,40 +1,91 @@
 import os
-import camelot
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
 import pandas as pd
+import pdfplumber
 import re
 from unidecode import unidecode
 from tkinter import Tk, simpledialog
 from tkinter.filedialog import askopenfilenames
+import cache_paginas
+from progresso import acompanhar_paginas, reportar_progresso, verificar_cancelamento
+from colunas import MAX_DESLOCAMENTO, PAGINAS_CALIBRACAO, limites_calibrados
+
+try:
+    # Shipped with recent pdfplumber releases; reads the text inside a rectangle without layout analysis
+    import pypdfium2
+except ImportError:
+    pypdfium2 = None
+
+# A page holds the movement table when its table area has a dd/mm date and a 1.234,56 amount
+DATE_PATTERN = re.compile(r'\d{2}/\d{2}')
+AMOUNT_PATTERN = re.compile(r'\d{1,3}(?:\.\d{3})*,\d{2}')
+# Trailing minus of a debit ("1234,56-") moved to the front
+TRAILING_MINUS_PATTERN = r'(\d+),(\d+)-$'
+
+# 'camelot' (default) or 'pdfplumber': the column-box engine reads the same table areas and
+# column boundaries straight from pdfplumber's words, without importing camelot
+ENGINES = ('camelot', 'pdfplumber')
+# Same vertical tolerance camelot's stream flavor uses to group text into rows
+ROW_TOLERANCE = 2
+# pdfminer's defaults, as used by camelot to join characters into text lines: a gap below
+# CHAR_MARGIN char widths keeps the line going, and a gap above WORD_MARGIN widths adds a space
+CHAR_MARGIN = 1.0
+WORD_MARGIN = 0.1
+
+DEFAULT_CONFIGS = {
+    'flavor': 'stream',
+    'page_1': {
+        'table_areas': ['149,257, 552,21'],
+        'columns': ['144,262, 204,262, 303,262, 351,262, 406,262, 418,262, 467,262, 506,262, 553,262'],
+        'strip_text': ''
+    },
+    'page_2_end': {
+        'table_areas': ['151,760, 553,20'],
+        'columns': ['157,757, 173,757, 269,757, 309,757, 363,757, 380,757, 470,757, 509,757, 545,757'],
+        'strip_text': ''
+    }
+}
+
+def extract_block(path, page_key, pages, configs):
+    """PDFTableExtractor.extract_block in a worker process, rebuilt from the path and configs."""
+    return PDFTableExtractor(path, configs).extract_block(page_key, pages)
+
 
 class PDFTableExtractor:
-    def __init__(self, file_path, configs):
+    def __init__(self, file_path, configs, output_name="extratoconvertido.csv", block_size=5, max_workers=None, engine=None):
         self.path = file_path
         self.csv_path = os.path.dirname(file_path)
         self.configs = configs
-
-    def start(self):
-        pages_with_tables = simpledialog.askstring("Extrair Informações", "Digite as páginas que contêm tabelas (ex: 1,2,4-6):")
+        self.output_name = output_name
+        self.engine = engine or configs.get('engine', 'camelot')
+        if self.engine not in ENGINES:
+            raise ValueError(f"Motor de extração desconhecido: {self.engine}")
+        # Each block is one camelot.read_pdf run; blocks run in parallel worker processes
+        self.block_size = block_size
+        self.max_workers = max_workers or os.cpu_count() or 1
+        # Column shifts found by calibrate_columns, applied or not
+        self.calibration = {}
+
+    def start(self, pages_with_tables=None, ask_pages=True):
+        if pages_with_tables is None:
+            pages_with_tables = ','.join(self.detect_transaction_pages())
+            # Falls back to asking the operator only when the pre-scan finds nothing
+            if not pages_with_tables and ask_pages:
+                pages_with_tables = simpledialog.askstring("Extrair Informações", "Digite as páginas que contêm tabelas (ex: 1,2,4-6):")
         if not pages_with_tables or not pages_with_tables.strip():
             raise ValueError("Nenhuma página válida foi especificada.")
 
         page_numbers = self.parse_pages(pages_with_tables)
-        main = pd.DataFrame()
-        if '1' in page_numbers:
-            header = self.get_table_data('page_1', '1')
-            page_numbers.remove('1')
+        if self.configs.get('calibrate', True):
+            self.calibrate_columns(page_numbers)
+        blocks = self.build_blocks(page_numbers)
+        results = self.extract_blocks(blocks)
 
-            if not header.empty:
-                header = self.clean_data(header)
-                main = pd.concat([main, header], ignore_index=True)
-
-        for i in range(0, len(page_numbers), 5):
-            pages_block = page_numbers[i:i+5]
-            block_data = self.get_table_data('page_2_end', ','.join(pages_block))
-
-            if not block_data.empty:
-                block_data = self.clean_data(block_data)
-                self.debug_dataframes(main, block_data)
-                main = pd.concat([main, block_data], ignore_index=True)
+        # Blocks come back in completion order; concatenate once, in page order
+        frames = [results[i] for i in range(len(blocks)) if not results[i].empty]
+        main = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
 
         if not main.empty:
             main = self.sanitize_column_names(main)
@@ -44,46 +95,181 @@ class PDFTableExtractor:
             final_csv_path = self.save_csv(main)
             self.finalize_csv(final_csv_path)
 
+        return main
+
+    def detect_transaction_pages(self):
+        """Pre-scans the PDF and returns the page numbers (as strings) that contain the movement table."""
+        # Kept in the page cache (when it is on) under the PDF content hash, the table areas and the reader
+        areas = [self.configs.get(key, {}).get('table_areas', [''])[0] for key in ('page_1', 'page_2_end')]
+        if pypdfium2 is not None:
+            reader = ['pdfium', pypdfium2.version.PYPDFIUM_INFO.version]
+        else:
+            reader = ['pdfplumber', pdfplumber.__version__]
+        return list(cache_paginas.obter(cache_paginas.chave_do_arquivo(self.path), None, 'paginas_itau',
+                                        {'areas': areas, 'leitor': reader}, self.scan_pages))
+
+    def calibrate_columns(self, page_numbers):
+        """
+        Shifts each page type's column boundaries and table area when the layout moved horizontally,
+        using the x-position histogram of its first pages. Runs before the blocks are dispatched, so
+        every worker reads the calibrated configs. Shifts beyond colunas.TOLERANCIA_DESLOCAMENTO are
+        not applied; every shift found is recorded in self.calibration ({page_key: {'deslocamento', 'aplicado'}}).
+        """
+        groups = {'page_1': [n for n in page_numbers if n == '1'],
+                  'page_2_end': [n for n in page_numbers if n != '1'][:PAGINAS_CALIBRACAO]}
+        wanted = sorted(int(n) for numbers in groups.values() for n in numbers)
+        if not wanted:
+            return
+        configs = dict(self.configs)
+        with pdfplumber.open(self.path, pages=wanted) as pdf:
+            pages = {page.page_number: page for page in pdf.pages}
+            for page_key, numbers in groups.items():
+                config = configs.get(page_key)
+                if not numbers or not config or not config.get('columns'):
+                    continue
+                calibration_pages = [pages[int(n)] for n in numbers if int(n) in pages]
+                if not calibration_pages:
+                    continue
+                boundaries = [float(value) for value in config['columns'][0].split(',')]
+                area = self.table_area(page_key)
+                search_area = None
+                if area:
+                    # Words a little beyond the area are kept, so a shifted column is still seen
+                    x1, y1, x2, y2 = area
+                    height = calibration_pages[0].height
+                    search_area = (x1 - MAX_DESLOCAMENTO, height - y1, x2 + MAX_DESLOCAMENTO, height - y2)
+                _, calibration = limites_calibrados(calibration_pages, boundaries, area=search_area,
+                                                    chave=f"itau:{page_key}")
+                if calibration['deslocamento']:
+                    self.calibration[page_key] = calibration
+                if not calibration['aplicado']:
+                    continue
+                shift = calibration['deslocamento']
+                config = dict(config)
+                config['columns'] = [','.join(f"{value + shift:g}" for value in boundaries)]
+                if area:
+                    config['table_areas'] = [f"{x1 + shift:g},{y1:g},{x2 + shift:g},{y2:g}"]
+                configs[page_key] = config
+        self.configs = configs
+
+    def scan_pages(self):
+        pages = []
+        for number, text in enumerate(self.iter_table_area_text(), 1):
+            if DATE_PATTERN.search(text) and AMOUNT_PATTERN.search(text):
+                pages.append(str(number))
+        return pages
+
+    def table_area(self, page_key):
+        """Returns the first table area of page_key as (x1, y1, x2, y2), in camelot's bottom-left coordinates."""
+        areas = self.configs.get(page_key, {}).get('table_areas')
+        if not areas:
+            return None
+        return tuple(float(value) for value in areas[0].split(','))
+
+    def iter_table_area_text(self):
+        """Yields, page by page, the raw text inside the configured table area."""
+        if pypdfium2 is None:
+            yield from self.iter_table_area_text_pdfplumber()
+            return
+
+        pdf = pypdfium2.PdfDocument(self.path)
+        try:
+            for index in acompanhar_paginas(range(len(pdf))):
+                page = pdf[index]
+                text_page = page.get_textpage()
+                area = self.table_area('page_1' if index == 0 else 'page_2_end')
+                if area:
+                    x1, y1, x2, y2 = area
+                    yield text_page.get_text_bounded(left=x1, bottom=y2, right=x2, top=y1)
+                else:
+                    yield text_page.get_text_range()
+                text_page.close()
+                page.close()
+        finally:
+            pdf.close()
+
+    def iter_table_area_text_pdfplumber(self):
+        with pdfplumber.open(self.path) as pdf:
+            for index, page in enumerate(acompanhar_paginas(pdf.pages)):
+                chars = page.chars
+                area = self.table_area('page_1' if index == 0 else 'page_2_end')
+                if area:
+                    # pdfplumber measures top/bottom from the top of the page
+                    x1, y1, x2, y2 = area
+                    top, bottom = page.height - y1, page.height - y2
+                    chars = [char for char in chars
+                             if char['x0'] >= x1 and char['x1'] <= x2 and char['top'] >= top and char['bottom'] <= bottom]
+                yield ''.join(char['text'] for char in chars)
+                page.close()
+
+    def build_blocks(self, page_numbers):
+        """Splits the pages into (page_key, pages) blocks: page 1 alone, the rest in groups of block_size."""
+        page_numbers = list(page_numbers)
+        blocks = []
+        if '1' in page_numbers:
+            page_numbers.remove('1')
+            blocks.append(('page_1', ['1']))
+        for i in range(0, len(page_numbers), self.block_size):
+            blocks.append(('page_2_end', page_numbers[i:i + self.block_size]))
+        return blocks
+
+    def extract_block(self, page_key, pages):
+        block_data = self.get_table_data(page_key, ','.join(pages))
+        if not block_data.empty:
+            block_data = self.clean_data(block_data)
+        return block_data
+
+    def extract_blocks(self, blocks):
+        """Runs extract_block for every block and returns {block index: DataFrame}."""
+        total_pages = sum(len(pages) for _, pages in blocks)
+        done_pages, rows, results = 0, 0, {}
+
+        if self.max_workers <= 1 or len(blocks) <= 1:
+            for i, (page_key, pages) in enumerate(blocks):
+                verificar_cancelamento()
+                results[i] = self.extract_block(page_key, pages)
+                done_pages, rows = done_pages + len(pages), rows + len(results[i])
+                reportar_progresso(done_pages, total_pages, rows)
+            return results
+
+        executor = ProcessPoolExecutor(max_workers=min(self.max_workers, len(blocks)))
+        try:
+            # The worker gets the path, pages and configs (with the engine), not the whole extractor
+            configs = dict(self.configs, engine=self.engine)
+            futures = {executor.submit(extract_block, self.path, page_key, pages, configs): i
+                       for i, (page_key, pages) in enumerate(blocks)}
+            for future in as_completed(futures):
+                i = futures[future]
+                results[i] = future.result()
+                done_pages, rows = done_pages + len(blocks[i][1]), rows + len(results[i])
+                reportar_progresso(done_pages, total_pages, rows)
+                verificar_cancelamento()
+        finally:
+            # On error or cancellation, blocks not yet started are dropped
+            executor.shutdown(wait=True, cancel_futures=True)
+        return results
+
     def clean_data(self, df):
         df = df.reset_index(drop=True)  # Garante que os índices sejam únicos
-        df = df.loc[:, ~df.columns.duplicated()]  # Remove colunas duplicadas
-        df = df.dropna(axis=1, how='all')  # Remove colunas vazias
-        df.columns = df.columns.str.strip()  # Remove espaços extras dos nomes das colunas
-        
-        # Adiciona mais algumas limpezas específicas para as colunas
-        df = df.reset_index(drop=True)
-        df = df.loc[:, ~df.columns.duplicated()]
-        df = df.dropna(axis=1, how='all')
+        # Remove colunas duplicadas e vazias, depois as que ficam duplicadas após o strip dos nomes
+        keep = ~df.columns.duplicated() & df.notna().any().to_numpy()
+        df = df.iloc[:, keep]
         df.columns = df.columns.str.strip()
-
-        if 'data' in df.columns:
-            df['data'] = df['data'].str.strip()  # Remove espaços extras dos valores das colunas
-            df['data'] = df['data'].str.strip()
-
-        for column in df.columns:
-            df[column] = df[column].apply(self.fix_hyphen)
-
-        return df
-
-    def fix_hyphen(self, value):
-        if isinstance(value, str):
-            value = value.strip()
-            value = value.replace(".", "")
-            value = re.sub(r'(\d+),(\d+)-$', r'-\1,\2', value)
-        return value
-
-    def debug_dataframes(self, df1, df2):
-        print("DataFrame principal:")
-        print("Colunas:", df1.columns)
-        print("Índices:", df1.index)
-        print("Exemplo de dados:")
-        print(df1.head())
-
-        print("\nDataFrame do bloco:")
-        print("Colunas:", df2.columns)
-        print("Índices:", df2.index)
-        print("Exemplo de dados:")
-        print(df2.head())
+        df = df.iloc[:, ~df.columns.duplicated()]
+        if df.empty:
+            return df
+
+        # Todas as células de uma vez (as vazias, maioria nas tabelas do camelot, são puladas):
+        # strip, remove pontos de milhar e move o "-" final dos débitos para a frente
+        cells = df.to_numpy(dtype=object, copy=True).ravel()
+        positions = np.flatnonzero(cells != '')
+        text = pd.Series(cells[positions], dtype=object).str.strip().str.replace('.', '', regex=False)
+        debits = text.str.endswith('-', na=False)
+        text[debits] = text[debits].str.replace(TRAILING_MINUS_PATTERN, r'-\1,\2', regex=True)
+
+        is_text = text.notna().to_numpy()  # valores que não são texto ficam como estão
+        cells[positions[is_text]] = text[is_text].to_numpy()
+        return pd.DataFrame(cells.reshape(df.shape), columns=df.columns)
 
     def parse_pages(self, pages):
         page_numbers = []
@@ -97,8 +283,20 @@ class PDFTableExtractor:
         return page_numbers
 
     def get_table_data(self, page_key, pages):
+        if self.engine == 'pdfplumber':
+            tables = self.read_column_boxes(page_key, pages)
+        else:
+            tables = [table.df for table in self.read_camelot(page_key, pages)]
+
+        table_data = [self.fix_header(table).reset_index(drop=True) for table in tables if not table.empty]
+        return pd.concat(table_data, ignore_index=True) if table_data else pd.DataFrame()
+
+    def read_camelot(self, page_key, pages):
+        # Imported here: camelot (and its OpenCV/ghostscript stack) is only loaded when this engine is used
+        import camelot
+
         config = self.configs.get(page_key, {})
-        tables = camelot.read_pdf(
+        return camelot.read_pdf(
             self.path,
             flavor=self.configs.get('flavor', 'stream'),
             table_areas=config.get('table_areas'),
@@ -107,8 +305,100 @@ class PDFTableExtractor:
             strip_text=config.get('strip_text', '')
         )
 
-        table_data = [self.fix_header(table.df).reset_index(drop=True) for table in tables if not table.df.empty]
-        return pd.concat(table_data, ignore_index=True) if table_data else pd.DataFrame()
+    def read_column_boxes(self, page_key, pages):
+        """pdfplumber engine: one DataFrame per page, shaped like camelot's table.df."""
+        config = self.configs.get(page_key, {})
+        columns = config.get('columns')
+        # Like camelot, every comma-separated number is a column boundary
+        boundaries = [float(value) for value in columns[0].split(',')] if columns else []
+        area = self.table_area(page_key)
+
+        tables = []
+        with pdfplumber.open(self.path, pages=[int(page) for page in pages.split(',')]) as pdf:
+            for page in pdf.pages:
+                tables.append(self.column_box_table(page, area, boundaries, config.get('strip_text', '')))
+                page.close()
+        return tables
+
+    @staticmethod
+    def text_lines(chars):
+        """Joins pdfplumber chars, in content-stream order, into horizontal text lines like pdfminer's."""
+        lines, line = [], None
+        for char in chars:
+            if not char.get('upright', True):
+                continue
+            if line is not None:
+                last = line['last']
+                width = max(last['x1'] - last['x0'], char['x1'] - char['x0'])
+                overlap = min(last['bottom'], char['bottom']) - max(last['top'], char['top'])
+                height = min(last['bottom'] - last['top'], char['bottom'] - char['top'])
+                gap = max(char['x0'] - last['x1'], last['x0'] - char['x1'], 0)
+                if overlap > height * 0.5 and gap < width * CHAR_MARGIN:
+                    if char['x0'] - line['x1'] > WORD_MARGIN * max(char['x1'] - char['x0'], height):
+                        line['text'].append(' ')
+                    line['text'].append(char['text'])
+                    line['x0'], line['x1'] = min(line['x0'], char['x0']), max(line['x1'], char['x1'])
+                    line['top'], line['bottom'] = min(line['top'], char['top']), max(line['bottom'], char['bottom'])
+                    line['last'] = char
+                    continue
+                lines.append(line)
+            line = {'text': [char['text']], 'x0': char['x0'], 'x1': char['x1'],
+                    'top': char['top'], 'bottom': char['bottom'], 'last': char}
+        if line is not None:
+            lines.append(line)
+        return lines
+
+    @classmethod
+    def column_box_table(cls, page, area, boundaries, strip_text=''):
+        """
+        Groups the text lines inside area into rows (ROW_TOLERANCE apart) and assigns each one to
+        the column it overlaps the most, following the same rules as camelot's stream flavor.
+        """
+        words = []
+        for line in cls.text_lines(page.chars):
+            text = ''.join(line['text']).strip()
+            if not text:
+                continue
+            # Bottom-left coordinates, as in the configured table areas
+            x0, x1 = line['x0'], line['x1']
+            y0, y1 = page.height - line['bottom'], page.height - line['top']
+            if area:
+                left, top, right, bottom = area
+                x_mid, y_mid = (x0 + x1) / 2, (y0 + y1) / 2
+                if not (left <= x_mid <= right and bottom <= y_mid <= top):
+                    continue
+            words.append((x0, y0, x1, text))
+        if not words:
+            return pd.DataFrame()
+
+        words.sort(key=lambda word: (-word[1], word[0]))
+        rows, row, row_y = [], [], words[0][1]
+        for word in words:
+            if abs(word[1] - row_y) > ROW_TOLERANCE:
+                rows.append(row)
+                row, row_y = [], word[1]
+            row.append(word)
+        rows.append(row)
+
+        # Boundaries are paired in the given order (not sorted), exactly as camelot does
+        edges = [min(word[0] for word in words)] + boundaries + [max(word[2] for word in words)]
+        columns = list(zip(edges, edges[1:]))
+
+        table = []
+        for row in rows:
+            cells = [''] * len(columns)
+            for x0, _, x1, text in sorted(row, key=lambda word: word[0]):
+                best_column, best_overlap = -1, -1.0
+                for index, (c_left, c_right) in enumerate(columns):
+                    if c_left <= x1 and c_right >= x0 and c_left != c_right:
+                        overlap = abs(max(c_left, x0) - min(c_right, x1)) / abs(c_left - c_right)
+                        if overlap > best_overlap:
+                            best_column, best_overlap = index, overlap
+                if best_column >= 0:
+                    # strip_text removes those characters anywhere in the text, like camelot
+                    cells[best_column] += re.sub(f'[{re.escape(strip_text)}]', '', text) if strip_text else text
+            table.append(cells)
+        return pd.DataFrame(table)
 
     def save_csv(self, df):
         base_name = os.path.splitext(os.path.basename(self.path))[0]
@@ -130,13 +420,12 @@ class PDFTableExtractor:
 
     @staticmethod
     def sanitize_column_names(df):
-        df.columns = df.columns.map(lambda x: unidecode(str(x)))  
-        df.columns = df.columns.map(lambda x: re.sub(r'[^\w\s]', '', x))  
-        df.columns = df.columns.map(lambda x: x.replace(' ', '_'))  
-        df.columns = df.columns.map(lambda x: x.lower())  
+        columns = pd.Index([unidecode(str(x)) for x in df.columns])
+        df.columns = (columns.str.replace(r'[^\w\s]', '', regex=True)
+                             .str.replace(' ', '_', regex=False)
+                             .str.lower())
 
         df = df.loc[:, ~df.columns.duplicated()]  # Remove colunas duplicadas
-        df = df.loc[:, ~df.columns.duplicated()]
         df = df.loc[:, ~df.columns.str.contains(r'^Unnamed:\s*\d+', regex=True)]
         if 'data_de_insercao' in df.columns:
             df = df.drop('data_de_insercao', axis=1)
@@ -145,29 +434,18 @@ class PDFTableExtractor:
 
     def fill_empty_dates(self, df, date_column_name):
         if date_column_name in df.columns:
-            df[date_column_name] = df[date_column_name].replace('', pd.NA)  # Substitui strings vazias por NA
-            df[date_column_name] = df[date_column_name].ffill()  # Preenche valores vazios com a última data válida
-            df[date_column_name] = df[date_column_name].replace('', pd.NA)
-            df[date_column_name] = df[date_column_name].ffill()
+            # Substitui strings vazias por NA e preenche com a última data válida
+            df[date_column_name] = df[date_column_name].replace('', pd.NA).ffill()
         return df
 
     def remove_credit_debit_repeats(self, df):
-        credit_column = 'credito'
-        debit_column = 'debito'
-        history_column = 'historico'
-
-        if credit_column in df.columns:
-            df[credit_column] = df[credit_column].replace('', pd.NA)
-            df[credit_column] = df[credit_column].bfill()
-
-        if debit_column in df.columns:
-            df[debit_column] = df[debit_column].replace('', pd.NA)
-            df[debit_column] = df[debit_column].bfill()
-
+        columns = [column for column in ('credito', 'debito') if column in df.columns]
+        if columns:
+            df[columns] = df[columns].replace('', pd.NA).bfill()
         return df
 
     def finalize_csv(self, final_csv):
-        final_aligned_path = os.path.join(self.csv_path, "extratoconvertido.csv")
+        final_aligned_path = os.path.join(self.csv_path, self.output_name)
 
         with open(final_csv, 'r', encoding='utf-8') as file:
             csv_content = file.read()
@@ -178,25 +456,12 @@ class PDFTableExtractor:
             file.write(csv_content)
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     root = Tk()
     root.withdraw()
     file_path = askopenfilenames(filetypes=[("PDF files", "*.pdf")])
     root.destroy()
 
     if file_path:
-        configs = {
-            'flavor': 'stream',
-            'page_1': {
-                'table_areas': ['149,257, 552,21'],
-                'columns': ['144,262, 204,262, 303,262, 351,262, 406,262, 418,262, 467,262, 506,262, 553,262'],
-                'strip_text': ''
-            },
-            'page_2_end': {
-                'table_areas': ['151,760, 553,20'],
-                'columns': ['157,757, 173,757, 269,757, 309,757, 363,757, 380,757, 470,757, 509,757, 545,757'],
-                'strip_text': ''
-            }
-        }
-
-        extractor = PDFTableExtractor(file_path, configs)
+        extractor = PDFTableExtractor(file_path, DEFAULT_CONFIGS)
         extractor.start()
\ No newline at end of file
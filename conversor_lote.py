@@ -0,0 +1,358 @@
+"""
+Conversão em lote, sem interface gráfica, de extratos bancários em PDF.
+
+Distribui os arquivos entre processos com ProcessPoolExecutor e imprime,
+ao final, um resumo por arquivo (sucesso/falha) com a vazão total.
+
+Exemplos:
+    python conversor_lote.py itau extratos/ --workers 4
+    python conversor_lote.py sicoob extratos/*.pdf --modelo modelo2
+    python conversor_lote.py auto extratos/ -r
+"""
+
+import argparse
+import contextlib
+import importlib
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+import pdfplumber
+from pdfminer.pdfdocument import PDFPasswordIncorrect
+from pdfplumber.utils.exceptions import PdfminerException
+
+import cache_paginas
+import motores
+import sessao_documento
+from resultados import caminho_csv, contar_paginas, novo_resultado
+
+# Bancos com mais de um layout (type "model_choice" em Conversor.CONVERTERS).
+MODELOS = {"bb": ("modelo1", "modelo2"), "sicoob": ("modelo1", "modelo2")}
+
+# Assinaturas procuradas no texto da primeira página para o modo "auto".
+# A ordem importa: as mais específicas vêm primeiro.
+ASSINATURAS = [
+    ("HISTÓRICO DE MOVIMENTAÇÃO", "sicoob", "modelo2"),
+    ("SICOOB", "sicoob", "modelo1"),
+    ("DIA LOTE", "bb", "modelo1"),
+    ("BANCO DO BRASIL", "bb", "modelo2"),
+    ("BRADESCO", "bradesco", None),
+    ("ITAÚ", "itau", None),
+    ("ITAU", "itau", None),
+    ("SANTANDER", "santander", None),
+    ("PAGBANK", "pagbank", None),
+    ("PAGSEGURO", "pagbank", None),
+    ("BANESTES", "banestes", None),
+    ("C6 BANK", "c6", None),
+    ("BANCO INTER", "inter", None),
+    ("CAIXA", "cef", None),
+    ("STONE", "stone", None),
+]
+
+
+def _salvar_df(df, pdf_path, **kwargs):
+    if df is None or df.empty:
+        raise ValueError("Nenhuma transação encontrada.")
+    caminho = caminho_csv(pdf_path)
+    df.to_csv(caminho, index=False, sep=';', encoding='utf-8-sig', **kwargs)
+    return len(df), caminho
+
+
+def _converter_bb(pdf_path, opcoes):
+    if opcoes["modelo"] == "modelo1":
+        df = importlib.import_module("conversor_bbmod1").extrair_formato_cac(pdf_path)
+    else:
+        df = importlib.import_module("conversor_bbmod2")._extrair_transacoes_de_pdf(pdf_path)
+    return _salvar_df(df, pdf_path, decimal=',')
+
+
+def _converter_sicoob(pdf_path, opcoes):
+    if opcoes["modelo"] == "modelo1":
+        df = importlib.import_module("conversor_sicoobmod1").extrair_dados_do_pdf(pdf_path)
+        return _salvar_df(df, pdf_path)
+    df = importlib.import_module("conversor_sicoobmod2").extrair_dados_do_pdf(pdf_path)
+    return _salvar_df(df, pdf_path, decimal=',')
+
+
+def _converter_inter(pdf_path, opcoes):
+    df = importlib.import_module("conversor_inter").iniciar_processamento(pdf_path)
+    return len(df), caminho_csv(pdf_path)
+
+
+def _converter_itau(pdf_path, opcoes):
+    module = importlib.import_module("conversor_itau")
+    base_name = os.path.splitext(os.path.basename(pdf_path))[0]
+    extractor = module.PDFTableExtractor(pdf_path, module.DEFAULT_CONFIGS, output_name=f"{base_name}_convertido.csv",
+                                         max_workers=opcoes.get("workers_por_arquivo"), engine=opcoes.get("motor"))
+    # Sem --paginas, as páginas com movimentação são detectadas automaticamente
+    df = extractor.start(opcoes.get("paginas"), ask_pages=False)
+    if df is None or df.empty:
+        raise ValueError("Nenhuma transação encontrada.")
+    return len(df), os.path.join(os.path.dirname(pdf_path), extractor.output_name), extractor.calibration
+
+
+def _converter_bradesco(pdf_path, opcoes):
+    base = os.path.splitext(pdf_path)[0]
+    saida, linhas = importlib.import_module("conversor_bradesco").convert_pdf(pdf_path, xls_path=base + ".xls")
+    return linhas, saida
+
+
+def _converter_pagbank(pdf_path, opcoes):
+    linhas = importlib.import_module("conversor_pagbank").extrair_texto_pdf(pdf_path)
+    return linhas, caminho_csv(pdf_path)
+
+
+def _converter_santander(pdf_path, opcoes):
+    df = importlib.import_module("conversor_santander").processar_pdf(pdf_path)
+    if df is None:
+        raise ValueError("Nenhuma transação encontrada.")
+    return len(df), caminho_csv(pdf_path)
+
+
+def _converter_cef(pdf_path, opcoes):
+    df = importlib.import_module("conversor_cef").converter_pdf(pdf_path)
+    return len(df), caminho_csv(pdf_path)
+
+
+def _converter_c6(pdf_path, opcoes):
+    df = importlib.import_module("conversor_c6").extrair_dados_do_pdf(pdf_path, senha=opcoes["senha"])
+    if not df.empty:
+        df['Data'] = pd.to_datetime(df['Data'], format='%d/%m/%Y').dt.strftime('%d/%m/%Y')
+    return _salvar_df(df, pdf_path, decimal=',')
+
+
+def _converter_banestes(pdf_path, opcoes):
+    df = importlib.import_module("conversor_banestes").extrair_dados_do_pdf(pdf_path)
+    return (*_salvar_df(df, pdf_path, decimal=','), df.attrs["calibracao"])
+
+
+def _converter_stone(pdf_path, opcoes):
+    module = importlib.import_module("conversor_stone")
+    tabelas = module.extrair_tabelas_pdf(pdf_path)
+    if not tabelas:
+        raise ValueError("Nenhuma tabela encontrada no PDF.")
+    caminho = caminho_csv(pdf_path)
+    module.salvar_csv(tabelas, caminho)
+    return sum(len(t) for t in tabelas), caminho
+
+
+# Mesmas chaves de Conversor.CONVERTERS (exceto "ofx", que não é PDF).
+PROCESSADORES = {
+    "bb": _converter_bb,
+    "inter": _converter_inter,
+    "itau": _converter_itau,
+    "sicoob": _converter_sicoob,
+    "bradesco": _converter_bradesco,
+    "pagbank": _converter_pagbank,
+    "santander": _converter_santander,
+    "cef": _converter_cef,
+    "c6": _converter_c6,
+    "banestes": _converter_banestes,
+    "stone": _converter_stone,
+}
+
+
+def senha_incorreta(erro):
+    """Se o erro ao abrir o PDF é de senha ausente ou errada (o pdfplumber embrulha o erro do pdfminer)."""
+    return any(isinstance(motivo, PDFPasswordIncorrect) for motivo in erro.args)
+
+
+def detectar_banco(pdf_path, senha=None):
+    """Identifica o banco (e o modelo, quando houver) pelo texto da primeira página."""
+    try:
+        with sessao_documento.abrir(pdf_path) as sessao:
+            texto = (sessao.texto(0) or "").upper() if len(sessao) else ""
+    except PdfminerException as e:
+        if not senha_incorreta(e):
+            raise
+        # Os extratos do C6 vêm protegidos por senha.
+        c6 = importlib.import_module("conversor_c6")
+        with pdfplumber.open(pdf_path, password=senha or c6.SENHA_PADRAO):
+            return "c6", None
+
+    for assinatura, chave, modelo in ASSINATURAS:
+        if assinatura in texto:
+            return chave, modelo
+    raise ValueError("Não foi possível identificar o banco do extrato.")
+
+
+def processar_arquivo(chave, pdf_path, opcoes):
+    """
+    Converte um único PDF. Roda dentro do processo trabalhador e nunca propaga
+    exceções: o resultado (status, linhas, páginas, tempo, erro) volta como dict.
+    """
+    inicio = time.perf_counter()
+    resultado = novo_resultado(pdf_path, chave)
+    cache_antes = cache_paginas.estatisticas()
+    _processar_arquivo(chave, pdf_path, opcoes, resultado)
+    resultado["tempo"] = time.perf_counter() - inicio
+    # Páginas lidas do cache em disco (acertos) e extraídas pelo pdfplumber (faltas) neste arquivo
+    cache_depois = cache_paginas.estatisticas()
+    resultado["cache"] = {campo: cache_depois[campo] - cache_antes[campo] for campo in ("acertos", "faltas")}
+    return resultado
+
+
+def _processar_arquivo(chave, pdf_path, opcoes, resultado):
+    try:
+        # Uma sessão para o arquivo todo: detecção, contagem de páginas e conversão leem o PDF uma vez só
+        with contextlib.ExitStack() as pilha:
+            try:
+                pilha.enter_context(sessao_documento.abrir(pdf_path, opcoes.get("senha")))
+            except PdfminerException as e:
+                if not senha_incorreta(e):
+                    raise
+                # Protegido por senha (C6): o conversor abre com a senha certa
+            _converter(chave, pdf_path, opcoes, resultado)
+    except Exception as e:
+        resultado["status"] = "falha"
+        resultado["erro"] = f"{type(e).__name__}: {e}"
+
+
+def _converter(chave, pdf_path, opcoes, resultado):
+    opcoes = dict(opcoes)
+    if chave == "auto":
+        chave, modelo = detectar_banco(pdf_path, opcoes.get("senha"))
+        resultado["banco"] = chave
+        opcoes["modelo"] = opcoes.get("modelo") or modelo
+    if chave in MODELOS and not opcoes.get("modelo"):
+        opcoes["modelo"] = MODELOS[chave][0]
+    if chave == "c6" and not opcoes.get("senha"):
+        opcoes["senha"] = importlib.import_module("conversor_c6").SENHA_PADRAO
+    resultado["paginas"] = contar_paginas(pdf_path, opcoes.get("senha"))
+    # Os conversores com colunas calibradas (colunas.limites_calibrados) devolvem também a calibração
+    resultado["linhas"], resultado["saida"], *calibracao = PROCESSADORES[chave](pdf_path, opcoes)
+    if calibracao:
+        resultado["calibracao"] = calibracao[0]
+
+
+def listar_pdfs(entradas, recursivo=False):
+    """Expande diretórios em seus PDFs, preservando a ordem das entradas."""
+    arquivos = []
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            if recursivo:
+                encontrados = [os.path.join(raiz, nome) for raiz, _, nomes in os.walk(entrada) for nome in nomes]
+            else:
+                encontrados = [os.path.join(entrada, nome) for nome in os.listdir(entrada)]
+            arquivos.extend(sorted(p for p in encontrados if p.lower().endswith(".pdf")))
+        else:
+            arquivos.append(entrada)
+    # Remove duplicados mantendo a ordem
+    return list(dict.fromkeys(os.path.abspath(p) for p in arquivos))
+
+
+def executar_lote(chave, arquivos, workers, opcoes):
+    """Gera os resultados na ordem em que os arquivos terminam."""
+    if workers <= 1:
+        for pdf_path in arquivos:
+            yield processar_arquivo(chave, pdf_path, opcoes)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futuros = [executor.submit(processar_arquivo, chave, pdf_path, opcoes) for pdf_path in arquivos]
+        for futuro in as_completed(futuros):
+            yield futuro.result()
+
+
+def imprimir_resultado(resultado):
+    nome = os.path.basename(resultado["arquivo"])
+    if resultado["status"] == "ok":
+        linhas = "?" if resultado["linhas"] is None else resultado["linhas"]
+        print(f"[OK]    {nome}  ({resultado['banco']})  {linhas} linha(s)  "
+              f"{resultado['paginas']} página(s)  {resultado['tempo']:.1f}s")
+        for parte, calibracao in resultado["calibracao"].items():
+            deslocamento = calibracao["deslocamento"]
+            if calibracao["aplicado"]:
+                print(f"        colunas ({parte}) deslocadas {deslocamento:+d} pontos para acompanhar o layout")
+            else:
+                print(f"        colunas ({parte}): deslocamento de {deslocamento:+d} pontos acima da tolerância, "
+                      f"não aplicado")
+    else:
+        print(f"[FALHA] {nome}  ({resultado['banco']})  {resultado['erro']}")
+
+
+def imprimir_resumo(resultados, tempo_total):
+    sucessos = [r for r in resultados if r["status"] == "ok"]
+    falhas = [r for r in resultados if r["status"] != "ok"]
+    paginas = sum(r["paginas"] for r in resultados)
+    linhas = sum(r["linhas"] or 0 for r in sucessos)
+    tempo_total = max(tempo_total, 1e-9)
+
+    print("=" * 60)
+    print(f"{len(resultados)} arquivo(s): {len(sucessos)} convertido(s), {len(falhas)} falha(s) em {tempo_total:.1f}s")
+    print(f"Vazão: {len(resultados) / tempo_total:.2f} arquivos/s, {paginas / tempo_total:.1f} páginas/s, "
+          f"{linhas / tempo_total:.1f} linhas/s")
+    acertos = sum(r["cache"]["acertos"] for r in resultados if r.get("cache"))
+    faltas = sum(r["cache"]["faltas"] for r in resultados if r.get("cache"))
+    if acertos or faltas:
+        print(f"Cache de páginas: {acertos} acerto(s), {faltas} falta(s)")
+    if falhas:
+        print("\nArquivos com falha:")
+        for r in falhas:
+            print(f"  - {r['arquivo']}: {r['erro']}")
+    print("=" * 60)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Converte extratos bancários em PDF em lote, sem interface gráfica.')
+    parser.add_argument('banco', choices=sorted(PROCESSADORES) + ['auto'],
+                        help='Chave do banco (a mesma de CONVERTERS) ou "auto" para detectar pelo conteúdo')
+    parser.add_argument('entradas', nargs='+', help='Arquivos PDF e/ou diretórios contendo PDFs')
+    parser.add_argument('--workers', '-w', type=int, default=os.cpu_count() or 1,
+                        help='Número de processos trabalhadores (padrão: número de CPUs)')
+    parser.add_argument('--modelo', choices=['modelo1', 'modelo2'],
+                        help='Modelo do extrato para bancos com mais de um layout (bb, sicoob)')
+    parser.add_argument('--paginas', help='Páginas com tabelas para o Itaú (ex: 1,2,4-6). Padrão: detecção automática')
+    parser.add_argument('--motor', choices=['camelot', 'pdfplumber'],
+                        help='Motor de extração das tabelas do Itaú (padrão: camelot)')
+    parser.add_argument('--senha', help='Senha dos PDFs protegidos (C6)')
+    parser.add_argument('--recursivo', '-r', action='store_true', help='Procura PDFs também nos subdiretórios')
+    parser.add_argument('--workers-paginas', type=int,
+                        help='Processos que extraem as páginas de um mesmo PDF (padrão: CONVERSOR_WORKERS_PAGINAS '
+                             'ou 1; sempre 1 com vários arquivos em paralelo, se não for informado)')
+    parser.add_argument('--motor-texto', choices=sorted(motores.MOTORES),
+                        help='Motor de extração do texto, para os bancos que o declaram em MOTORES (padrão: pdfplumber)')
+    parser.add_argument('--cache', action='store_true',
+                        help='Guarda o texto das páginas num cache em disco, para reconverter mais rápido '
+                             '(desligado por padrão: o cache contém os dados dos extratos)')
+    args = parser.parse_args(argv)
+
+    if args.cache:
+        # Pela variável de ambiente, para valer também nos processos trabalhadores
+        os.environ["CONVERSOR_CACHE_PAGINAS"] = "1"
+        cache_paginas.configurar(ativo=True)
+
+    if args.motor_texto:
+        os.environ["CONVERSOR_MOTOR_TEXTO"] = args.motor_texto
+        motores.configurar(args.motor_texto)
+
+    arquivos = listar_pdfs(args.entradas, args.recursivo)
+    if not arquivos:
+        print("Erro: Nenhum arquivo PDF encontrado.")
+        return 1
+
+    workers = max(1, min(args.workers, len(arquivos)))
+    # Com vários arquivos em paralelo, cada arquivo usa um único processo (evita pools aninhados)
+    opcoes = {"modelo": args.modelo, "paginas": args.paginas, "senha": args.senha, "motor": args.motor,
+              "workers_por_arquivo": 1 if workers > 1 else None}
+    workers_paginas = args.workers_paginas or (1 if workers > 1 else None)
+    if workers_paginas:
+        # Pela variável de ambiente, para valer também nos processos trabalhadores
+        os.environ["CONVERSOR_WORKERS_PAGINAS"] = str(workers_paginas)
+        sessao_documento.configurar(workers=workers_paginas)
+    print(f"Convertendo {len(arquivos)} arquivo(s) com {workers} processo(s)...")
+
+    inicio = time.perf_counter()
+    resultados = []
+    for resultado in executar_lote(args.banco, arquivos, workers, opcoes):
+        imprimir_resultado(resultado)
+        resultados.append(resultado)
+    imprimir_resumo(resultados, time.perf_counter() - inicio)
+
+    return 0 if all(r["status"] == "ok" for r in resultados) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
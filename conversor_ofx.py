@@ -1,16 +1,291 @@
 # conversor_ofx.py (CORRIGIDO PARA C6 BANK)
 
+import codecs
+import decimal
+import html
+import io
 import os
-from ofxparse import OfxParser
-from openpyxl import Workbook
-from tkinter import filedialog, messagebox
 import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from tkinter import filedialog
 import traceback
+from progresso import aguardar, verificar_cancelamento
+
+CABECALHO_PLANILHA = ['Data', 'Descrição', 'Valor']
+TAMANHO_BLOCO = 1 << 20  # Caracteres lidos por vez do arquivo OFX
+
+# <TAG>texto, </TAG> ou <TAG/>: serve para OFX 1.x (SGML, folhas sem fechamento) e 2.x (XML)
+ELEMENTO_REGEX = re.compile(r"<(/?)([A-Za-z0-9_.]+)[^>]*>([^<]*)")
+# Cabeçalho SGML ("CHARSET:1252", "ENCODING:UTF-8") ou prólogo XML (encoding="...")
+CHARSET_REGEX = re.compile(rb"CHARSET:\s*([\w-]+)", re.IGNORECASE)
+ENCODING_SGML_REGEX = re.compile(rb"ENCODING:\s*([\w-]+)", re.IGNORECASE)
+ENCODING_XML_REGEX = re.compile(rb"encoding=[\"']([\w-]+)[\"']", re.IGNORECASE)
+FUSO_REGEX = re.compile(r"\[.*\]$")
+
+# Nomes de planilha do Excel: até 31 caracteres, sem []:*?/\ e sem apóstrofo nas pontas
+MAX_NOME_PLANILHA = 31
+CARACTERES_INVALIDOS_PLANILHA = re.compile(r"[\[\]:*?/\\]")
+
+# Agregados que contêm a conta do extrato (a conta de destino, BANKACCTTO, fica dentro do STMTTRN)
+AGREGADOS_DE_EXTRATO = ('STMTRS', 'CCSTMTRS')
+
+
+def _latin1_nos_bytes_invalidos(erro):
+    """Bytes que não pertencem à codificação declarada são lidos como Latin-1, em vez de descartados."""
+    return erro.object[erro.start:erro.end].decode('latin-1'), erro.end
+
+
+codecs.register_error('ofx_latin1', _latin1_nos_bytes_invalidos)
+
+
+def detectar_codificacao(inicio):
+    """Codificação declarada no cabeçalho do OFX (UTF-8 se nada for declarado)."""
+    match = ENCODING_XML_REGEX.search(inicio)
+    if match:
+        declarada = match.group(1).decode('ascii')
+    else:
+        charset = CHARSET_REGEX.search(inicio)
+        encoding = ENCODING_SGML_REGEX.search(inicio)
+        if charset and charset.group(1).upper() not in (b'NONE', b'UTF-8', b'UTF8'):
+            declarada = charset.group(1).decode('ascii')
+            if declarada.isdigit():
+                declarada = f"cp{declarada}"  # CHARSET:1252
+        elif encoding and encoding.group(1).upper() not in (b'USASCII', b'NONE'):
+            declarada = encoding.group(1).decode('ascii')
+        else:
+            declarada = 'utf-8'
+    try:
+        return codecs.lookup(declarada).name
+    except LookupError:
+        return 'utf-8'
+
+
+def iterar_elementos(arquivo, tamanho_bloco=TAMANHO_BLOCO):
+    """(fechamento, TAG, texto) de cada elemento, lendo o arquivo em blocos."""
+    resto = ""
+    while True:
+        bloco = arquivo.read(tamanho_bloco)
+        texto = resto + bloco
+        # Só processa até o último "<": o elemento seguinte pode continuar no próximo bloco
+        corte = texto.rfind("<") if bloco else len(texto)
+        if corte <= 0 and bloco:
+            resto = texto
+            continue
+        for match in ELEMENTO_REGEX.finditer(texto, 0, corte):
+            valor = match.group(3).strip()
+            if "&" in valor:
+                valor = html.unescape(valor)
+            yield bool(match.group(1)), match.group(2).upper(), valor
+        if not bloco:
+            return
+        resto = texto[corte:]
+
+
+def iterar_transacoes(caminho_arquivo):
+    """
+    Lê o OFX incrementalmente e devolve um dict por STMTTRN, com os campos da transação
+    (a primeira ocorrência de cada tag, como no ofxparse) mais "conta", a conta do extrato.
+    Vários extratos e contas no mesmo arquivo são lidos em sequência.
+    """
+    with open(caminho_arquivo, 'rb') as bruto:
+        codificacao = detectar_codificacao(bruto.read(4096))
+        bruto.seek(0)
+        arquivo = io.TextIOWrapper(bruto, encoding=codificacao, errors='ofx_latin1', newline='')
+        conta, transacao = None, None
+        for fechamento, tag, texto in iterar_elementos(arquivo):
+            if transacao is not None:
+                if fechamento and tag == 'STMTTRN':
+                    transacao['conta'] = conta
+                    yield transacao
+                    transacao = None
+                elif not fechamento and texto and tag not in transacao:
+                    transacao[tag] = texto
+            elif fechamento:
+                continue
+            elif tag == 'STMTTRN':
+                transacao = {}
+            elif tag in AGREGADOS_DE_EXTRATO:
+                conta = None
+            elif tag == 'ACCTID' and texto:
+                conta = texto
+
+
+def valor_ofx(texto):
+    """TRNAMT como Decimal, aceitando ponto ou vírgula como separador decimal (mesmas regras do ofxparse)."""
+    valor = texto.strip()
+    if re.search(r'.*\..*,', valor):  # 10.000,50
+        valor = valor.replace('.', '')
+    if re.search(r'.*,.*\.', valor):  # 10,000.50
+        valor = valor.replace(',', '')
+    if '.' not in valor and ',' in valor:  # 10000,50
+        valor = valor.replace(',', '.')
+    valor = valor.replace(' ', '').replace('+', '')
+    try:
+        return decimal.Decimal(valor)
+    except decimal.InvalidOperation:
+        # Alguns bancos usam "null" em transações informativas
+        if valor in ('null', '-null'):
+            return decimal.Decimal(0)
+        raise ValueError(f"Valor de transação inválido: '{texto}'")
+
+
+def data_ofx(texto):
+    """DTPOSTED ("20250102120000[-3:BRT]") como dd/mm/aaaa, na data local informada pelo banco."""
+    texto = FUSO_REGEX.sub('', texto)
+    return datetime.strptime(texto[:8], '%Y%m%d').strftime('%d/%m/%Y')
+
+
+def linha_da_transacao(transacao):
+    descricao = transacao.get('MEMO') or transacao.get('NAME') or ''
+    if 'TRNAMT' not in transacao:
+        raise ValueError("Transação sem valor (TRNAMT) no arquivo OFX.")
+    return [data_ofx(transacao.get('DTPOSTED', '')), descricao, valor_ofx(transacao['TRNAMT'])]
+
+
+def _truncar(texto, limite):
+    # O Excel conta o nome em unidades UTF-16: emojis e afins ocupam duas
+    while len(texto.encode('utf-16-le')) // 2 > limite:
+        texto = texto[:-1]
+    return texto
+
+
+def nome_de_planilha(titulo, usados):
+    """
+    Nome válido e único (sem diferenciar maiúsculas) para a planilha: troca os caracteres
+    proibidos por "_", corta em 31 caracteres e, se o nome já existir, acrescenta " (2)",
+    " (3)"... sem passar do limite. O nome escolhido é registrado em ``usados``.
+    """
+    base = CARACTERES_INVALIDOS_PLANILHA.sub('_', str(titulo)).strip().strip("'").strip() or "Planilha"
+    nome = _truncar(base, MAX_NOME_PLANILHA)
+    contador = 1
+    while nome.lower() in usados or nome.lower() == 'history':  # "History" é reservado pelo Excel
+        contador += 1
+        sufixo = f" ({contador})"
+        nome = _truncar(base, MAX_NOME_PLANILHA - len(sufixo)).rstrip().rstrip("'") + sufixo
+    usados.add(nome.lower())
+    return nome
+
+
+def _nova_planilha(pasta_trabalho, titulo, usados):
+    planilha = pasta_trabalho.create_sheet(title=nome_de_planilha(titulo, usados))
+    planilha.append(CABECALHO_PLANILHA)
+    return planilha
+
+
+def _titulo(nome, conta, indice):
+    """Primeira conta do arquivo: o nome do arquivo; as demais: "<nome> <conta>"."""
+    return nome if indice == 0 else f"{nome} {conta}"
+
+
+def escrever_arquivo(pasta_trabalho, caminho_arquivo, usados=None):
+    """
+    Escreve as transações de um arquivo em planilhas da pasta (modo write-only): uma planilha
+    com o nome do arquivo e, se ele tiver outras contas, uma planilha a mais para cada uma.
+    Devolve o número de transações.
+    """
+    usados = set() if usados is None else usados
+    nome = os.path.splitext(os.path.basename(caminho_arquivo))[0]
+    planilhas, linhas = {}, 0
+    for transacao in iterar_transacoes(caminho_arquivo):
+        conta = transacao['conta']
+        planilha = planilhas.get(conta)
+        if planilha is None:
+            planilha = _nova_planilha(pasta_trabalho, _titulo(nome, conta, len(planilhas)), usados)
+            planilhas[conta] = planilha
+        planilha.append(linha_da_transacao(transacao))
+        linhas += 1
+    if not planilhas:
+        _nova_planilha(pasta_trabalho, nome, usados)
+    return linhas
+
+
+def ler_arquivo(caminho_arquivo):
+    """
+    Roda nos processos de trabalho: lê o OFX inteiro e devolve [(conta, linhas)], com as contas
+    na ordem em que aparecem. Cada linha é uma tupla (data, descrição, valor) só com texto,
+    que atravessa o limite entre processos mais barato que listas com Decimal.
+    """
+    contas = {}
+    for transacao in iterar_transacoes(caminho_arquivo):
+        data, descricao, valor = linha_da_transacao(transacao)
+        contas.setdefault(transacao['conta'], []).append((data, descricao, str(valor)))
+    return list(contas.items())
+
+
+def escrever_contas(pasta_trabalho, caminho_arquivo, contas, usados):
+    """Escreve na pasta as linhas devolvidas por ler_arquivo, nas mesmas planilhas de escrever_arquivo."""
+    nome = os.path.splitext(os.path.basename(caminho_arquivo))[0]
+    if not contas:
+        _nova_planilha(pasta_trabalho, nome, usados)
+        return 0
+    linhas = 0
+    for indice, (conta, linhas_da_conta) in enumerate(contas):
+        planilha = _nova_planilha(pasta_trabalho, _titulo(nome, conta, indice), usados)
+        for data, descricao, valor in linhas_da_conta:
+            planilha.append([data, descricao, decimal.Decimal(valor)])
+        linhas += len(linhas_da_conta)
+    return linhas
+
+
+def _escrever_pasta(pasta_trabalho, caminhos_dos_arquivos, ao_iniciar_arquivo, max_workers):
+    usados = set()
+    if max_workers <= 1 or len(caminhos_dos_arquivos) <= 1:
+        for caminho_arquivo in caminhos_dos_arquivos:
+            verificar_cancelamento()
+            if ao_iniciar_arquivo:
+                ao_iniciar_arquivo(caminho_arquivo)
+            escrever_arquivo(pasta_trabalho, caminho_arquivo, usados)
+        return
+
+    executor = ProcessPoolExecutor(max_workers=min(max_workers, len(caminhos_dos_arquivos)))
+    try:
+        futuros = [executor.submit(ler_arquivo, caminho) for caminho in caminhos_dos_arquivos]
+        for indice, caminho_arquivo in enumerate(caminhos_dos_arquivos):
+            if ao_iniciar_arquivo:
+                ao_iniciar_arquivo(caminho_arquivo)
+            contas = aguardar(futuros[indice])
+            futuros[indice] = None  # Libera as linhas do arquivo assim que forem escritas
+            escrever_contas(pasta_trabalho, caminho_arquivo, contas, usados)
+            verificar_cancelamento()
+    finally:
+        # Em erro ou cancelamento, os arquivos que ainda não começaram são descartados
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def converter_ofx(caminhos_dos_arquivos, caminho_salvamento=None, ao_iniciar_arquivo=None, max_workers=None):
+    """
+    Converte os arquivos OFX numa única planilha Excel (por padrão ao lado do primeiro arquivo)
+    e devolve o caminho salvo. A pasta é escrita em modo write-only.
+
+    Com mais de um arquivo, a leitura é distribuída entre processos (``max_workers``, por
+    padrão um por CPU) e só este processo escreve a pasta, na ordem em que os arquivos foram
+    selecionados. Com um único arquivo (ou ``max_workers=1``) as linhas vão para o disco à
+    medida que o OFX é lido, e a memória não cresce com o tamanho do arquivo.
+    """
+    from openpyxl import Workbook
+
+    caminhos_dos_arquivos = list(caminhos_dos_arquivos)
+    max_workers = max_workers or os.cpu_count() or 1
+    pasta_trabalho = Workbook(write_only=True)
+    try:
+        _escrever_pasta(pasta_trabalho, caminhos_dos_arquivos, ao_iniciar_arquivo, max_workers)
+    except BaseException:
+        # Fecha as planilhas já começadas, que do contrário ficam com o XML aberto até o fim do programa
+        for planilha in pasta_trabalho.worksheets:
+            planilha.close()
+        raise
+
+    if not pasta_trabalho.worksheets:
+        raise Exception("Nenhum arquivo OFX válido foi processado.")
+    caminho_salvamento = caminho_salvamento or os.path.splitext(caminhos_dos_arquivos[0])[0] + ".xlsx"
+    pasta_trabalho.save(caminho_salvamento)
+    return caminho_salvamento
+
 
 def processar_ofx(*args):
     """
-    Função principal para converter arquivos OFX em uma planilha Excel,
-    com pré-processamento para corrigir formatos de número (ponto decimal).
+    Função principal para converter arquivos OFX em uma planilha Excel.
     """
     caminhos_dos_arquivos = filedialog.askopenfilenames(
         title="Selecione os arquivos OFX para conversão",
@@ -22,42 +297,9 @@ def processar_ofx(*args):
         raise UserWarning("Nenhum arquivo selecionado.")
 
     try:
-        pasta_trabalho = Workbook()
-        planilha_padrao = pasta_trabalho.active
-        sheets_criadas = 0
-
-        for caminho_arquivo in caminhos_dos_arquivos:
-            nome_arquivo = os.path.basename(caminho_arquivo)
-            
-            # --- ETAPA DE CORREÇÃO ---
-            # 1. Lê todo o conteúdo do arquivo para uma string
-            with open(caminho_arquivo, 'r', encoding='utf-8', errors='ignore') as file_handle:
-                conteudo_original = file_handle.read()
-
-            # 2. Usa uma expressão regular para encontrar e corrigir os valores monetários
-            # Procura por <TRNAMT> seguido de um número com ponto decimal e o substitui por vírgula
-            conteudo_corrigido = re.sub(r'(<TRNAMT>)(-?[\d]+)\.(\d{2})', r'\1\2,\3', conteudo_original)
-            
-            # 3. Passa o conteúdo corrigido para a biblioteca ofxparse
-            ofx = OfxParser.parse(conteudo_corrigido)
-            
-            nome_planilha = os.path.splitext(nome_arquivo)[0][:31]
-            planilha = pasta_trabalho.create_sheet(title=nome_planilha)
-            sheets_criadas += 1
-            planilha.append(['Data', 'Descrição', 'Valor'])
-            
-            for transacao in ofx.account.statement.transactions:
-                planilha.append([transacao.date.strftime('%d/%m/%Y'), transacao.memo, transacao.amount])
-        
-        if sheets_criadas > 0:
-            pasta_trabalho.remove(planilha_padrao)
-            caminho_salvamento = os.path.splitext(caminhos_dos_arquivos[0])[0] + ".xlsx"
-            pasta_trabalho.save(caminho_salvamento)
-            # A mensagem de sucesso agora é controlada pelo menu principal
-        else:
-            raise Exception("Nenhum arquivo OFX válido foi processado.")
-
+        # A mensagem de sucesso é controlada pelo menu principal
+        return converter_ofx(caminhos_dos_arquivos)
     except Exception as e:
         # Propaga o erro para o menu principal, que mostrará a janela de erro detalhada
         traceback.print_exc() # Imprime o erro no console para depuração
-        raise e
\ No newline at end of file
+        raise e
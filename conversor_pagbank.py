@@ -1,10 +1,18 @@
-import pdfplumber
-import pandas as pd
+import csv
 import re
 import os
 import unicodedata
 import tkinter as tk
 from tkinter import filedialog, messagebox
+import motores
+import sessao_documento
+from resultados import converter_arquivos, mostrar_relatorio
+
+# Motores de extração cujo texto este parser aceita (ver motores)
+MOTORES = ("pdfplumber",)
+# Data, descrição (numa linha) e valor; os espaços entre eles podem incluir quebras de linha
+TRANSACAO_REGEX = re.compile(r"(\d{2}/\d{2}/\d{4})\s+(.+?)\s+(-?R?\$\s?[\d\.]+,\d{2})")
+CABECALHO_CSV = ["Data", "Descrição", "Valor"]
 
 def remover_caracteres(texto):
     texto = unicodedata.normalize("NFKD", texto)
@@ -27,32 +35,84 @@ def selecionar_pdfs():
     # CORREÇÃO: Adicionado o retorno dos caminhos dos arquivos selecionados.
     return pdf_paths
 
+def inicio_das_ultimas_linhas(texto):
+    """Posição onde começa a penúltima linha com texto (0 se houver menos de duas)."""
+    fim, encontradas = len(texto), 0
+    while fim > 0:
+        quebra = texto.rfind("\n", 0, fim)
+        if texto[quebra + 1:fim].strip():
+            encontradas += 1
+            if encontradas == 2:
+                return quebra + 1
+        if quebra < 0:
+            break
+        fim = quebra
+    return 0
+
+def iterar_transacoes(textos):
+    """
+    (data, descrição, valor) de cada transação, página por página, como se o texto das páginas
+    estivesse unido por quebras de linha. Só uma transação que comece numa das duas últimas
+    linhas com texto pode continuar (ou ser outra) na página seguinte: esse trecho fica para
+    ser lido junto com ela.
+    """
+    resto = None
+    for texto in textos:
+        if not texto:
+            continue
+        trecho = texto if resto is None else resto + "\n" + texto
+        corte = inicio_das_ultimas_linhas(trecho)
+        fim_ultima = 0
+        for match in TRANSACAO_REGEX.finditer(trecho):
+            if match.start() >= corte:
+                break
+            yield match.groups()
+            fim_ultima = match.end()
+        resto = trecho[max(fim_ultima, corte):]
+    if resto:
+        for match in TRANSACAO_REGEX.finditer(resto):
+            yield match.groups()
+
+def textos_das_paginas(sessao):
+    opcoes = motores.opcoes(MOTORES)
+    for page in sessao.percorrer(extrair=[("texto", opcoes)]):
+        yield sessao.texto(page, **opcoes)
+
 def extrair_texto_pdf(pdf_path):
     """
-    Extrai transações de um único arquivo PDF e o salva como CSV.
+    Extrai transações de um único arquivo PDF e o salva como CSV, escrevendo as linhas
+    à medida que cada página é lida. Devolve o número de transações.
+    Problemas no arquivo levantam exceção, para que um lote continue nos arquivos seguintes.
     """
+    caminho_csv = os.path.splitext(pdf_path)[0] + ".csv"
+    linhas = 0
+    arquivo = None
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            text = "\n".join([page.extract_text() for page in pdf.pages if page.extract_text()])
+        with sessao_documento.abrir(pdf_path) as sessao:
+            for transacao in iterar_transacoes(textos_das_paginas(sessao)):
+                if arquivo is None:
+                    # O CSV só é criado quando a primeira transação aparece
+                    arquivo = open(caminho_csv, "w", newline="", encoding="utf-8-sig")
+                    escritor = csv.writer(arquivo, delimiter=";", lineterminator=os.linesep)
+                    escritor.writerow(CABECALHO_CSV)
+                escritor.writerow(transacao)
+                linhas += 1
+    finally:
+        if arquivo is not None:
+            arquivo.close()
 
-        pattern_corrected = re.compile(r"(\d{2}/\d{2}/\d{4})\s+(.+?)\s+(-?R?\$\s?[\d\.]+,\d{2})")
-        matches = pattern_corrected.findall(text)
+    if not linhas:
+        raise ValueError("Nenhuma transação encontrada.")
 
-        if not matches:
-            print(f"Nenhuma transação encontrada no arquivo: {pdf_path}")
-            # Silenciosamente ignora ou pode mostrar um aviso por arquivo
-            return
+    print(f"Arquivo salvo em: {caminho_csv}")
+    return linhas
+    # A mensagem de sucesso agora será controlada pelo script principal (conversor.py)
+    # para não aparecer para cada arquivo.
 
-        df = pd.DataFrame(matches, columns=["Data", "Descrição", "Valor"])
-        caminho_csv = os.path.splitext(pdf_path)[0] + ".csv"
-        df.to_csv(caminho_csv, index=False, sep=";", encoding="utf-8-sig")
 
-        print(f"Arquivo salvo em: {caminho_csv}")
-        # A mensagem de sucesso agora será controlada pelo script principal (conversor.py)
-        # para não aparecer para cada arquivo.
-        
-    except Exception as e:
-        messagebox.showerror("Erro ao Processar Arquivo", f"Não foi possível processar o arquivo:\n{pdf_path}\n\nErro: {e}")
+def processar_pdfs(caminhos_pdf):
+    """Converte todos os arquivos, sem parar nas falhas, e devolve um resultado por arquivo."""
+    return converter_arquivos(extrair_texto_pdf, caminhos_pdf, "pagbank")
 
 
 # --- Bloco de Execução Principal (Corrigido) ---
@@ -67,9 +127,8 @@ if __name__ == "__main__":
     if not caminhos_pdf:
         messagebox.showwarning("Aviso", "Nenhum arquivo PDF foi selecionado.")
     else:
-        # 3. Itera sobre cada caminho de arquivo na tupla retornada.
-        for caminho_do_arquivo in caminhos_pdf:
-            extrair_texto_pdf(caminho_do_arquivo)
+        # 3. Processa todos os arquivos; as falhas não interrompem os demais.
+        resultados = processar_pdfs(caminhos_pdf)
         
-        # 4. Mostra uma mensagem de sucesso única no final do processo.
-        messagebox.showinfo("Sucesso", f"{len(caminhos_pdf)} arquivo(s) processado(s) com sucesso!")
\ No newline at end of file
+        # 4. Mostra um relatório único no final do processo.
+        mostrar_relatorio(resultados, "PagBank")
\ No newline at end of file
@@ -1,10 +1,16 @@
 # conversor_sicoobmod1.py (Corrigido)
 
-import pdfplumber
 import pandas as pd
-from tkinter import filedialog, messagebox
+from tkinter import filedialog
 import os
 import re
+import motores
+import sessao_documento
+from resultados import converter_arquivos
+
+OPCOES_TEXTO = {"x_tolerance": 2}
+# Motores de extração cujo texto este parser aceita (ver motores)
+MOTORES = ("pdfplumber",)
 
 def extrair_dados_do_pdf(caminho_pdf):
     """
@@ -16,69 +22,79 @@ def extrair_dados_do_pdf(caminho_pdf):
     transacoes = []
     data_atual = None
 
-    try:
-        with pdfplumber.open(caminho_pdf) as pdf:
-            for page in pdf.pages:
-                texto_pagina = page.extract_text(x_tolerance=2)
-                if not texto_pagina:
+    with sessao_documento.abrir(caminho_pdf) as sessao:
+        # A extração das páginas pode rodar em paralelo; data_atual segue página a página, em ordem
+        opcoes = motores.opcoes(MOTORES, **OPCOES_TEXTO)
+        for page in sessao.percorrer(transacoes, extrair=[("texto", opcoes)]):
+            texto_pagina = sessao.texto(page, **opcoes)
+            if not texto_pagina:
+                continue
+
+            linhas = texto_pagina.split('\n')
+            
+            for linha in linhas:
+                if "SALDO ANTERIOR" in linha or "SALDO DO DIA" in linha or "EXTRATO CONTA CORRENTE" in linha:
                     continue
 
-                linhas = texto_pagina.split('\n')
-                
-                for linha in linhas:
-                    if "SALDO ANTERIOR" in linha or "SALDO DO DIA" in linha or "EXTRATO CONTA CORRENTE" in linha:
-                        continue
+                match_data = date_pattern.search(linha)
+                if match_data:
+                    data_atual = match_data.group(1)
 
-                    match_data = date_pattern.search(linha)
+                match_valor = value_pattern.search(linha.strip())
+                if match_valor and data_atual:
+                    valor_original = f"{match_valor.group(1)}{match_valor.group(2)}"
+                    lancamento = linha[:match_valor.start()].strip()
+                    
                     if match_data:
-                        data_atual = match_data.group(1)
-
-                    match_valor = value_pattern.search(linha.strip())
-                    if match_valor and data_atual:
-                        valor_original = f"{match_valor.group(1)}{match_valor.group(2)}"
-                        lancamento = linha[:match_valor.start()].strip()
-                        
-                        if match_data:
-                            lancamento = lancamento[match_data.end():].strip()
-                        
-                        # Remove o número do documento que pode vir no início
-                        lancamento = re.sub(r"^\S+\s", "", lancamento, count=1)
-
-                        if lancamento:
-                            transacoes.append([data_atual, lancamento.strip(), valor_original])
-
-        if not transacoes:
-            return pd.DataFrame()
-
-        df = pd.DataFrame(transacoes, columns=["Data", "Lancamento", "Valor_Original"])
-
-        # --- FUNÇÃO DE FORMATAÇÃO CORRIGIDA ---
-        def formatar_valor(valor_str):
-            """
-            Formata o valor para o padrão CSV brasileiro.
-            Ex: "1.234,56D" -> "-1234,56"
-            """
-            # Verifica se é Débito (D) e remove a letra
-            is_debit = valor_str.endswith('D')
-            valor_numerico_str = valor_str[:-1]
-
-            # 1. Remove o ponto separador de milhar.
-            valor_sem_ponto = valor_numerico_str.replace('.', '')
-            
-            # 2. Adiciona o sinal de negativo se for débito.
-            if is_debit:
-                return '-' + valor_sem_ponto
-            else:
-                return valor_sem_ponto
-
-        df['Valor'] = df['Valor_Original'].apply(formatar_valor)
-        df_final = df[["Data", "Lancamento", "Valor"]]
+                        lancamento = lancamento[match_data.end():].strip()
+                    
+                    # Remove o número do documento que pode vir no início
+                    lancamento = re.sub(r"^\S+\s", "", lancamento, count=1)
+
+                    if lancamento:
+                        transacoes.append([data_atual, lancamento.strip(), valor_original])
+
+    if not transacoes:
+        return pd.DataFrame()
+
+    df = pd.DataFrame(transacoes, columns=["Data", "Lancamento", "Valor_Original"])
+
+    # --- FUNÇÃO DE FORMATAÇÃO CORRIGIDA ---
+    def formatar_valor(valor_str):
+        """
+        Formata o valor para o padrão CSV brasileiro.
+        Ex: "1.234,56D" -> "-1234,56"
+        """
+        # Verifica se é Débito (D) e remove a letra
+        is_debit = valor_str.endswith('D')
+        valor_numerico_str = valor_str[:-1]
+
+        # 1. Remove o ponto separador de milhar.
+        valor_sem_ponto = valor_numerico_str.replace('.', '')
         
-        return df_final
+        # 2. Adiciona o sinal de negativo se for débito.
+        if is_debit:
+            return '-' + valor_sem_ponto
+        else:
+            return valor_sem_ponto
+
+    df['Valor'] = df['Valor_Original'].apply(formatar_valor)
+    df_final = df[["Data", "Lancamento", "Valor"]]
+    
+    return df_final
+
+def converter_pdf(caminho_pdf):
+    """Extrai as transações e salva o CSV ao lado do PDF; levanta exceção se não houver transações."""
+    df_transacoes = extrair_dados_do_pdf(caminho_pdf)
+    if df_transacoes.empty:
+        raise ValueError("Nenhuma transação válida encontrada.")
+    csv_path = os.path.splitext(caminho_pdf)[0] + '.csv'
+    df_transacoes.to_csv(csv_path, index=False, sep=';', encoding='utf-8-sig')
+    return df_transacoes
 
-    except Exception as e:
-        messagebox.showerror("Erro no Modelo 1", f"Ocorreu um erro ao processar o PDF:\n{e}")
-        return None
+def processar_pdfs(caminhos):
+    """Converte todos os arquivos, sem parar nas falhas, e devolve um resultado por arquivo."""
+    return converter_arquivos(converter_pdf, caminhos, "sicoob")
 
 def iniciar_processamento():
     """Função chamada pelo programa principal para iniciar a conversão."""
@@ -89,16 +105,5 @@ def iniciar_processamento():
     if not caminhos:
         raise UserWarning("") # Levanta aviso de cancelamento para o menu principal
 
-    sucesso_geral = False
-    for path in caminhos:
-        df_transacoes = extrair_dados_do_pdf(path)
-        if df_transacoes is not None and not df_transacoes.empty:
-            csv_path = os.path.splitext(path)[0] + '.csv'
-            df_transacoes.to_csv(csv_path, index=False, sep=';', encoding='utf-8-sig')
-            sucesso_geral = True
-    
-    if not sucesso_geral:
-        # Se nenhum arquivo gerou transações, considera como um cancelamento ou falha
-        raise UserWarning("Nenhuma transação válida encontrada nos arquivos selecionados.")
-
-    return True # Retorna True para sinalizar sucesso ao menu principal
\ No newline at end of file
+    # Um resultado por arquivo; o menu principal mostra o relatório consolidado
+    return processar_pdfs(caminhos)
\ No newline at end of file
@@ -1,67 +1,170 @@
 # conversor_sicoobmod2.py
 
-import pdfplumber
+import contextlib
 import pandas as pd
 import tkinter as tk
 from tkinter import filedialog, messagebox
 import os
 import re
+import motores
+import sessao_documento
+from metadados import ano_do_mes, metadados_do_extrato
+from resultados import converter_arquivos, mostrar_relatorio
 
-def extrair_ano_do_pdf(pdf_pages):
-    """Extrai o ano da linha 'PERÍODO' na primeira página para construir a data completa."""
+AVISO_SEM_ANO = "Não foi possível determinar o ano do extrato. Usando o ano atual como padrão."
+
+def avisar_na_janela(mensagem):
+    """Aviso da interface gráfica; o lote (sem janela) usa print."""
+    messagebox.showwarning("Ano não encontrado", mensagem)
+
+def extrair_metadados_do_pdf(caminho_pdf, pdf, avisar=print):
+    """Lê o 'PERÍODO' no cabeçalho da primeira página para construir a data completa."""
     try:
-        primeira_pagina_texto = pdf_pages[0].extract_text(x_tolerance=2)
-        match = re.search(r"PERÍODO: \d{2}\/\d{2}\/(\d{4})", primeira_pagina_texto)
-        if match:
-            return match.group(1)
+        metadados = metadados_do_extrato(caminho_pdf, pdf=pdf)
     except Exception:
-        pass
-    messagebox.showwarning("Ano não encontrado", "Não foi possível determinar o ano do extrato. Usando o ano atual como padrão.")
-    return str(pd.Timestamp.now().year)
+        metadados = {"inicio": None, "fim": None, "ano": None}
+    if not metadados["ano"]:
+        avisar(AVISO_SEM_ANO)
+        metadados["ano"] = str(pd.Timestamp.now().year)
+    return metadados
+
+OPCOES_TEXTO = {"x_tolerance": 2}
+# Motores de extração cujo texto este parser aceita (ver motores)
+MOTORES = ("pdfplumber",)
+CABECALHO_MOVIMENTACAO = "HISTÓRICO DE MOVIMENTAÇÃO"
+SALDO_ANTERIOR = "SALDO ANTERIOR"
+INICIO_RESUMO = "RESUMO"
+DATA_REGEX = re.compile(r'(\d{2}/\d{2})')
+DATA_INICIAL_REGEX = re.compile(r'^\d{2}/\d{2}\s*')
+VALOR_TIPO_REGEX = re.compile(r'(\d{1,3}(?:\.\d{3})*,\d{2}|\d+,\d{2}|\d+\.\d{2})\s*([CD])')
+ESPACOS_REGEX = re.compile(r'\s{2,}')
 
-def extrair_dados_do_pdf(caminho_pdf):
+def erro_de_leitura(e):
+    return ValueError(f"Não foi possível ler o arquivo PDF: {e}")
+
+def iterar_linhas(sessao, resultado=None):
     """
-    Extrai dados de um extrato Sicoob (Modelo 2) e RETORNA um DataFrame.
+    Linhas do texto das páginas, em ordem, extraindo uma página por vez.
+    Só as falhas da leitura das páginas viram erro de leitura; as do parser passam como estão.
     """
-    try:
-        with pdfplumber.open(caminho_pdf) as pdf:
-            ano = extrair_ano_do_pdf(pdf.pages)
-            texto_completo = "\n".join([page.extract_text(x_tolerance=2) or "" for page in pdf.pages])
-    except Exception as e:
-        messagebox.showerror("Erro de Leitura", f"Não foi possível ler o arquivo PDF:\n{e}")
-        return None
+    opcoes = motores.opcoes(MOTORES, **OPCOES_TEXTO)
+    paginas = sessao.percorrer(resultado, extrair=[("texto", opcoes)])
+    while True:
+        try:
+            page = next(paginas, None)
+            if page is None:
+                return
+            texto = sessao.texto(page, **opcoes) or ""
+        except Exception as e:
+            raise erro_de_leitura(e) from e
+        yield from texto.split("\n")
 
-    texto_completo = re.sub(r".*HISTÓRICO DE MOVIMENTAÇÃO\n", "", texto_completo, flags=re.DOTALL)
-    texto_completo = re.sub(r"SALDO ANTERIOR.*?\n", "", texto_completo, flags=re.DOTALL)
-    texto_completo = re.sub(r"\nRESUMO.*", "", texto_completo, flags=re.DOTALL)
-    
-    blocos = re.split(r'\n(?=\d{2}/\d{2})', texto_completo.strip())
-    transacoes = []
+def com_proxima(linhas):
+    """(linha, se há uma linha depois dela): as marcações do extrato só valem seguidas de outra linha."""
+    linhas = iter(linhas)
+    anterior = next(linhas, None)
+    if anterior is None:
+        return
+    for linha in linhas:
+        yield anterior, True
+        anterior = linha
+    yield anterior, False
+
+def normalizar_bloco(linhas):
+    return ESPACOS_REGEX.sub(' ', " ".join(linhas).strip())
+
+def iterar_blocos(linhas):
+    """
+    Monta os blocos de lançamento linha a linha. Um bloco começa numa linha "dd/mm" e
+    termina na próxima; só o que vem depois do cabeçalho de movimentação é emitido, e a
+    leitura para na linha "RESUMO" (as páginas seguintes não são lidas).
+    A linha do SALDO ANTERIOR é descartada a partir dele, e o que vem antes é colado à linha seguinte.
+    """
+    achou_cabecalho = False
+    antes_do_cabecalho = []  # Usados só se o extrato não tiver o cabeçalho
+    resumo_antes_do_cabecalho = False
+    bloco, inicio_do_texto = [], True
+    pendente = None  # Trecho da linha antes do SALDO ANTERIOR
 
-    for bloco in blocos:
-        texto_bloco = re.sub(r'\s{2,}', ' ', bloco.replace('\n', ' ').strip())
-        if "SALDO DO DIA" in texto_bloco:
+    for linha, tem_proxima in com_proxima(linhas):
+        if tem_proxima and linha.endswith(CABECALHO_MOVIMENTACAO):
+            if not achou_cabecalho:
+                # Descarta tudo o que veio antes do cabeçalho
+                achou_cabecalho, antes_do_cabecalho, resumo_antes_do_cabecalho = True, [], False
+                bloco, inicio_do_texto, pendente = [], True, None
+            continue
+        if resumo_antes_do_cabecalho:
             continue
-        
-        match_valor_tipo = re.search(r'(\d{1,3}(?:\.\d{3})*,\d{2}|\d+,\d{2}|\d+\.\d{2})\s*([CD])', texto_bloco)
-        data_match = re.match(r'(\d{2}/\d{2})', texto_bloco)
-        
-        if data_match and match_valor_tipo:
-            data = f"{data_match.group(1)}/{ano}"
-            valor_str = match_valor_tipo.group(1)
-            tipo = match_valor_tipo.group(2)
-            
-            descricao = texto_bloco
-            descricao = re.sub(r'^\d{2}/\d{2}\s*', '', descricao).strip()
-            descricao = descricao.replace(match_valor_tipo.group(0), '', 1).strip()
-            descricao = re.sub(r'\s{2,}', ' ', descricao).strip()
-
-            valor_numerico = float(valor_str.replace('.', '').replace(',', '.'))
-            if tipo == 'D':
-                valor_numerico *= -1
-
-            if descricao:
-                transacoes.append([data, descricao, valor_numerico])
+
+        if pendente is not None:
+            linha, pendente = pendente + linha, None
+        if tem_proxima and SALDO_ANTERIOR in linha:
+            pendente = linha[:linha.index(SALDO_ANTERIOR)]
+            continue
+
+        if not inicio_do_texto and linha.startswith(INICIO_RESUMO):
+            if achou_cabecalho:
+                break
+            resumo_antes_do_cabecalho = True
+            continue
+
+        if not inicio_do_texto and DATA_REGEX.match(linha):
+            texto_bloco = normalizar_bloco(bloco)
+            if achou_cabecalho:
+                yield texto_bloco
+            else:
+                antes_do_cabecalho.append(texto_bloco)
+            bloco = []
+        bloco.append(linha)
+        inicio_do_texto = False
+
+    if achou_cabecalho:
+        if bloco:
+            yield normalizar_bloco(bloco)
+    else:
+        yield from antes_do_cabecalho
+        if bloco:
+            yield normalizar_bloco(bloco)
+
+def bloco_para_transacao(texto_bloco, metadados):
+    """[data, descrição, valor] de um bloco, ou None se o bloco não for um lançamento."""
+    if "SALDO DO DIA" in texto_bloco:
+        return None
+    match_valor_tipo = VALOR_TIPO_REGEX.search(texto_bloco)
+    data_match = DATA_REGEX.match(texto_bloco)
+    if not (data_match and match_valor_tipo):
+        return None
+
+    data = f"{data_match.group(1)}/{ano_do_mes(data_match.group(1)[3:], metadados)}"
+    valor_str = match_valor_tipo.group(1)
+    tipo = match_valor_tipo.group(2)
+
+    descricao = DATA_INICIAL_REGEX.sub('', texto_bloco).strip()
+    descricao = descricao.replace(match_valor_tipo.group(0), '', 1).strip()
+    descricao = ESPACOS_REGEX.sub(' ', descricao).strip()
+
+    valor_numerico = float(valor_str.replace('.', '').replace(',', '.'))
+    if tipo == 'D':
+        valor_numerico *= -1
+    return [data, descricao, valor_numerico] if descricao else None
+
+def extrair_dados_do_pdf(caminho_pdf, avisar=print):
+    """
+    Extrai dados de um extrato Sicoob (Modelo 2) e RETORNA um DataFrame.
+    As páginas são lidas em sequência e só até o RESUMO; a memória fica na ordem de um bloco.
+    avisar recebe o aviso de ano não encontrado (a interface passa avisar_na_janela).
+    """
+    transacoes = []
+    with contextlib.ExitStack() as pilha:
+        try:
+            sessao = pilha.enter_context(sessao_documento.abrir(caminho_pdf))
+        except Exception as e:
+            raise erro_de_leitura(e) from e
+        metadados = extrair_metadados_do_pdf(caminho_pdf, sessao, avisar)
+        for texto_bloco in iterar_blocos(iterar_linhas(sessao, transacoes)):
+            transacao = bloco_para_transacao(texto_bloco, metadados)
+            if transacao:
+                transacoes.append(transacao)
 
     if not transacoes:
         return pd.DataFrame()
@@ -72,6 +175,19 @@ def extrair_dados_do_pdf(caminho_pdf):
     # ALTERAÇÃO: A função agora retorna o DataFrame.
     return df
 
+def converter_pdf(caminho_pdf):
+    """Extrai as transações e salva o CSV ao lado do PDF; levanta exceção se não houver transações."""
+    df_transacoes = extrair_dados_do_pdf(caminho_pdf, avisar=avisar_na_janela)
+    if df_transacoes.empty:
+        raise ValueError("Nenhuma transação encontrada.")
+    caminho_csv = os.path.splitext(caminho_pdf)[0] + '.csv'
+    df_transacoes.to_csv(caminho_csv, index=False, sep=';', encoding='utf-8-sig', decimal=',')
+    return df_transacoes
+
+def processar_pdfs(caminhos):
+    """Converte todos os arquivos, sem parar nas falhas, e devolve um resultado por arquivo."""
+    return converter_arquivos(converter_pdf, caminhos, "sicoob")
+
 def iniciar_processamento():
     """Função chamada pelo programa principal para iniciar a conversão."""
     caminhos_dos_arquivos = filedialog.askopenfilenames(
@@ -81,38 +197,13 @@ def iniciar_processamento():
     if not caminhos_dos_arquivos:
         raise UserWarning("Nenhum arquivo foi selecionado.")
 
-    sucessos, erros = 0, []
-    for arquivo_path in caminhos_dos_arquivos:
-        nome_arquivo_original = os.path.basename(arquivo_path)
-        try:
-            df_transacoes = extrair_dados_do_pdf(arquivo_path)
-            
-            if df_transacoes is not None and not df_transacoes.empty:
-                nome_base, _ = os.path.splitext(arquivo_path)
-                caminho_csv = nome_base + '.csv'
-                df_transacoes.to_csv(caminho_csv, index=False, sep=';', encoding='utf-8-sig', decimal=',')
-                print(f"SUCESSO! '{nome_arquivo_original}' salvo em: {caminho_csv}")
-                sucessos += 1
-            elif df_transacoes is not None:
-                 print(f"AVISO! Nenhuma transação encontrada em '{nome_arquivo_original}'.")
-                 erros.append(f"{nome_arquivo_original} (vazio)")
-            else:
-                erros.append(nome_arquivo_original)
-
-        except Exception as e:
-            print(f"ERRO! Falha em '{nome_arquivo_original}': {e}")
-            erros.append(nome_arquivo_original)
-    
-    if erros:
-        raise Exception(f"Falha ao processar {len(erros)} arquivo(s): {', '.join(erros)}")
-    if sucessos == 0:
-        raise Exception("Nenhuma transação foi extraída dos arquivos selecionados.")
+    # Um resultado por arquivo; o menu principal mostra o relatório consolidado
+    return processar_pdfs(caminhos_dos_arquivos)
 
 if __name__ == "__main__":
     root = tk.Tk()
     root.withdraw()
     try:
-        iniciar_processamento()
-        messagebox.showinfo("Concluído", "Processamento finalizado.")
+        mostrar_relatorio(iniciar_processamento(), "Sicoob - Modelo 2")
     except Exception as e:
         messagebox.showerror("Erro Final", str(e))
\ No newline at end of file
@@ -1,12 +1,12 @@
-import pdfplumber
 import pandas as pd
+import sessao_documento
 
 def extrair_tabelas_pdf(pdf_path):
     # Lista para armazenar DataFrames de cada página
     tabelas = []
-    with pdfplumber.open(pdf_path) as pdf:
-        for i, pagina in enumerate(pdf.pages):
-            tabelas_pag = pagina.extract_tables()
+    with sessao_documento.abrir(pdf_path) as sessao:
+        for i, pagina in enumerate(sessao.percorrer(tabelas, extrair=[("tabelas", {})])):
+            tabelas_pag = sessao.tabelas(pagina)
             for tabela in tabelas_pag:
                 # Converte a tabela em DataFrame, remove linhas vazias
                 df = pd.DataFrame(tabela)
@@ -0,0 +1,181 @@
+"""
+Metadados do extrato lidos no cabeçalho da primeira página.
+
+Período (início e fim), ano, agência e conta são procurados apenas na faixa
+superior da primeira página; se o período não estiver ali, o restante da
+primeira página é consultado. O resultado fica em cache por arquivo (caminho,
+data de modificação e tamanho), de modo que chamadas repetidas para o mesmo
+PDF não voltam a extrair texto.
+"""
+
+import calendar
+import os
+import re
+import threading
+from collections import OrderedDict
+from datetime import date
+
+import sessao_documento
+
+# Fração da altura da primeira página tratada como cabeçalho
+FRACAO_CABECALHO = 0.3
+MAX_ARQUIVOS_EM_CACHE = 64
+
+MESES = {
+    "janeiro": 1, "fevereiro": 2, "março": 3, "marco": 3, "abril": 4, "maio": 5, "junho": 6,
+    "julho": 7, "agosto": 8, "setembro": 9, "outubro": 10, "novembro": 11, "dezembro": 12,
+}
+MESES_ABREV = ["JAN", "FEV", "MAR", "ABR", "MAI", "JUN", "JUL", "AGO", "SET", "OUT", "NOV", "DEZ"]
+
+_DATA = r"(\d{2})/(\d{2})/(\d{4})"
+_DATA_EXTENSO = r"(\d{1,2}) de ([A-Za-zçÇ]+)"
+_SEPARADOR = r"\s*(?:a|à|até|-|–)\s*"
+
+# "01/06/2025 a 30/06/2025"
+PERIODO_NUMERICO = re.compile(_DATA + _SEPARADOR + _DATA)
+# "1 de junho [de 2025] a 30 de junho de 2025"
+PERIODO_EXTENSO = re.compile(_DATA_EXTENSO + r"(?: de (\d{4}))?" + _SEPARADOR + _DATA_EXTENSO + r" de (\d{4})",
+                             re.IGNORECASE)
+# Só a data inicial: "PERÍODO: 01/06/2025" / "Período 1 de junho de 2025"
+INICIO_NUMERICO = re.compile(r"PER[ÍI]ODO:?\s*" + _DATA, re.IGNORECASE)
+INICIO_EXTENSO = re.compile(r"PER[ÍI]ODO:?\s*" + _DATA_EXTENSO + r" de (\d{4})", re.IGNORECASE)
+# Mês inteiro: "JUNHO/2025", "Junho de 2025"
+MES_ANO = re.compile(r"\b([A-Za-zçÇ]+)\s*(?:/|de)\s*(\d{4})\b", re.IGNORECASE)
+# "5 de julho de 2025" é uma data, não o mês inteiro
+DIA_ANTES = re.compile(r"\d{1,2} de $")
+# Data de emissão, usada apenas para o ano: "exportado no dia 5 de julho de 2025"
+EMISSAO = re.compile(r"(?:exportado|emitido|gerado) (?:no dia|em) \d{1,2} de [A-Za-zçÇ]+ de (\d{4})", re.IGNORECASE)
+
+AGENCIA = re.compile(r"\bAG(?:[ÊE]NCIA|\.)?\s*:?\s*(\d{3,5}(?:-[\dXx])?)\b", re.IGNORECASE)
+CONTA = re.compile(r"\bCONTA(?:\s+CORRENTE)?\s*:?\s*(\d[\d.]*(?:-[\dXx])?)\b", re.IGNORECASE)
+
+_cache = OrderedDict()
+_trava = threading.Lock()
+
+
+def _mes(nome):
+    return MESES.get(nome.lower())
+
+
+def _data(dia, mes, ano):
+    try:
+        return date(int(ano), int(mes), int(dia))
+    except (TypeError, ValueError):
+        return None
+
+
+def _extenso(dia, nome_mes, ano):
+    mes = _mes(nome_mes)
+    return _data(dia, mes, ano) if mes else None
+
+
+def procurar_periodo(texto):
+    """Devolve (inicio, fim) encontrados no texto; qualquer um pode ser None."""
+    match = PERIODO_NUMERICO.search(texto)
+    if match:
+        d1, m1, a1, d2, m2, a2 = match.groups()
+        return _data(d1, m1, a1), _data(d2, m2, a2)
+
+    match = PERIODO_EXTENSO.search(texto)
+    if match:
+        d1, mes1, a1, d2, mes2, a2 = match.groups()
+        fim = _extenso(d2, mes2, a2)
+        inicio = _extenso(d1, mes1, a1 or a2)
+        if inicio and fim and inicio > fim and not a1:
+            inicio = _extenso(d1, mes1, int(a2) - 1)  # "15 de dezembro a 14 de janeiro de 2025"
+        return inicio, fim
+
+    match = INICIO_NUMERICO.search(texto)
+    if match:
+        return _data(*match.groups()), None
+    match = INICIO_EXTENSO.search(texto)
+    if match:
+        return _extenso(*match.groups()), None
+
+    for match in MES_ANO.finditer(texto):
+        mes = _mes(match.group(1))
+        if mes and not DIA_ANTES.search(texto, 0, match.start()):
+            ano = int(match.group(2))
+            return date(ano, mes, 1), date(ano, mes, calendar.monthrange(ano, mes)[1])
+    return None, None
+
+
+def ler_metadados(texto):
+    """Metadados encontrados num trecho de texto (sem cache)."""
+    inicio, fim = procurar_periodo(texto)
+    referencia = fim or inicio
+    ano = str(referencia.year) if referencia else None
+    if ano is None:
+        match = EMISSAO.search(texto)
+        ano = match.group(1) if match else None
+    agencia = AGENCIA.search(texto)
+    conta = CONTA.search(texto)
+    return {
+        "inicio": inicio,
+        "fim": fim,
+        "ano": ano,
+        "agencia": agencia.group(1) if agencia else None,
+        "conta": conta.group(1) if conta else None,
+    }
+
+
+def _texto_cabecalho(sessao, pagina):
+    x0, topo, x1, base = pagina.bbox
+    recorte = (x0, topo, x1, topo + (base - topo) * FRACAO_CABECALHO)
+    return sessao.texto(pagina, recorte=recorte, x_tolerance=2) or ""
+
+
+def _ler_primeira_pagina(sessao):
+    if not len(sessao):
+        return ler_metadados("")
+    pagina = sessao.pagina(0)
+    metadados = ler_metadados(_texto_cabecalho(sessao, pagina))
+    if metadados["ano"] is None:
+        # Layout com o período fora da faixa do cabeçalho (o texto fica memorizado na sessão)
+        completo = ler_metadados(sessao.texto(pagina, x_tolerance=2) or "")
+        metadados = {chave: valor if valor is not None else completo[chave] for chave, valor in metadados.items()}
+    return metadados
+
+
+def metadados_do_extrato(caminho_pdf, pdf=None, senha=None):
+    """
+    Devolve {"inicio", "fim", "ano", "agencia", "conta"} do extrato; o que não for
+    encontrado vem como None. Se o PDF já estiver aberto, passe a sessão (ou o PDF do
+    pdfplumber) em ``pdf`` para reaproveitá-lo. O resultado fica em cache por arquivo.
+    """
+    estado = os.stat(caminho_pdf)
+    chave = (os.path.abspath(caminho_pdf), estado.st_mtime_ns, estado.st_size)
+    with _trava:
+        if chave in _cache:
+            _cache.move_to_end(chave)
+            return dict(_cache[chave])
+
+    if pdf is not None:
+        metadados = _ler_primeira_pagina(sessao_documento.sessao_de(pdf))
+    else:
+        with sessao_documento.abrir(caminho_pdf, senha) as sessao:
+            metadados = _ler_primeira_pagina(sessao)
+
+    with _trava:
+        _cache[chave] = metadados
+        while len(_cache) > MAX_ARQUIVOS_EM_CACHE:
+            _cache.popitem(last=False)
+    return dict(metadados)
+
+
+def ano_do_mes(mes, metadados):
+    """Ano de um lançamento "dd/mm": em períodos que viram o ano, os meses do início ficam no ano inicial."""
+    inicio, fim = metadados["inicio"], metadados["fim"]
+    if inicio and fim and inicio.year != fim.year:
+        return str(inicio.year if int(mes) >= inicio.month else fim.year)
+    return metadados["ano"]
+
+
+def mes_inicial(metadados):
+    """(mês, ano) do início do período, para extratos cujos lançamentos trazem só o dia."""
+    referencia = metadados["inicio"] or metadados["fim"]
+    return (referencia.month, referencia.year) if referencia else None
+
+
+def proximo_mes(mes, ano):
+    return (1, ano + 1) if mes == 12 else (mes + 1, ano)
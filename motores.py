@@ -0,0 +1,286 @@
+"""
+Motores de extração de texto: a mesma interface para bibliotecas diferentes.
+
+O pdfplumber é a referência: os conversores foram escritos sobre o texto e as
+palavras dele. O pdfium (pypdfium2, em C) extrai o texto dezenas de vezes mais
+rápido, mas não faz a mesma análise de layout; o PyPDF2 é o que o Santander
+sempre usou. Cada documento aberto com ``abrir(motor, caminho)`` tem:
+
+    len(documento)                          número de páginas
+    documento.texto(indice, recorte=None)   texto da página (linhas separadas por "\\n")
+    documento.linhas(indice, ...)           as linhas desse texto
+    documento.palavras(indice, ...)         palavras com x0, x1, top, bottom e text
+
+``indice`` começa em 0 e ``recorte`` é (x0, top, x1, bottom), como no
+``crop`` do pdfplumber. Os parâmetros do pdfplumber (x_tolerance...) são
+aceitos por todos os motores; o pdfium usa os de ``palavras`` e ignora os de
+``texto``. Nem todo motor extrai palavras ou o texto de uma área: cada um
+declara o que sabe fazer em ``suporta_palavras`` e ``suporta_recorte``.
+
+Cada conversor declara em ``MOTORES`` os motores cujo resultado ele aceita
+(conferidos com ``benchmarks/motores_texto.py`` em extratos reais), e
+``escolher(MOTORES)`` devolve o motor configurado (``configurar(motor=...)``
+ou a variável de ambiente ``CONVERSOR_MOTOR_TEXTO``) se o conversor o aceitar
+e ele fizer o que o conversor pede (``usa_palavras``, ``usa_recorte``), ou o
+primeiro da lista.
+"""
+
+import os
+
+REFERENCIA = "pdfplumber"
+
+_config = {"motor": os.environ.get("CONVERSOR_MOTOR_TEXTO") or None, "forcar": False}
+
+
+def configurar(motor=None, forcar=False):
+    """Motor preferido; com ``forcar``, ele é usado mesmo nos conversores que não o declaram (comparações)."""
+    _config["motor"], _config["forcar"] = motor, forcar
+
+
+def escolher(tolerados=(REFERENCIA,), usa_palavras=False, usa_recorte=False):
+    """
+    O motor configurado, se estiver em ``tolerados``, instalado e souber extrair o que o
+    conversor usa (palavras, áreas da página); senão o primeiro de ``tolerados``.
+    """
+    motor = _config["motor"]
+    if (motor and (_config["forcar"] or motor in tolerados) and suporta(motor, usa_palavras, usa_recorte)
+            and disponivel(motor)):
+        return motor
+    return tolerados[0]
+
+
+def opcoes(tolerados, usa_palavras=False, usa_recorte=False, **parametros):
+    """Parâmetros de ``SessaoDocumento.texto``/``palavras`` com o motor escolhido (omitido se for a referência)."""
+    motor = escolher(tolerados, usa_palavras, usa_recorte)
+    return parametros if motor == REFERENCIA else dict(parametros, motor=motor)
+
+
+def suporta(motor, usa_palavras=False, usa_recorte=False):
+    """Se o motor extrai palavras (``usa_palavras``) e o texto de uma área (``usa_recorte``)."""
+    documento = MOTORES.get(motor)
+    return (documento is not None and (documento.suporta_palavras or not usa_palavras)
+            and (documento.suporta_recorte or not usa_recorte))
+
+
+def disponivel(motor):
+    try:
+        MOTORES[motor].importar()
+    except (KeyError, ImportError):
+        return False
+    return True
+
+
+def abrir(motor, caminho, senha=None):
+    if motor not in MOTORES:
+        raise ValueError(f"Motor de extração desconhecido: {motor} (disponíveis: {', '.join(MOTORES)})")
+    return MOTORES[motor](caminho, senha)
+
+
+def linhas(caminho, pagina, motor=REFERENCIA, **parametros):
+    """Linhas de uma página (índice a partir de 0), abrindo e fechando o arquivo."""
+    with abrir(motor, caminho) as documento:
+        return documento.linhas(pagina, **parametros)
+
+
+def palavras(caminho, pagina, motor=REFERENCIA, **parametros):
+    """Palavras de uma página (índice a partir de 0), abrindo e fechando o arquivo."""
+    with abrir(motor, caminho) as documento:
+        return documento.palavras(pagina, **parametros)
+
+
+class Documento:
+    nome = ""
+    # Aberto com senha: o texto não deve ir para o cache em disco
+    protegido = False
+    # O que o motor extrai além do texto da página inteira (ver escolher)
+    suporta_palavras = True
+    suporta_recorte = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *erro):
+        self.fechar()
+
+    def linhas(self, indice, recorte=None, **parametros):
+        return (self.texto(indice, recorte, **parametros) or "").split("\n")
+
+
+class DocumentoPdfplumber(Documento):
+    nome = "pdfplumber"
+
+    @staticmethod
+    def importar():
+        import pdfplumber
+        return pdfplumber
+
+    def __init__(self, caminho, senha=None):
+        self.pdf = self.importar().open(caminho, password=senha)
+        self.versao = self.importar().__version__
+
+    def __len__(self):
+        return len(self.pdf.pages)
+
+    def _pagina(self, indice, recorte):
+        pagina = self.pdf.pages[indice]
+        return pagina.crop(recorte) if recorte is not None else pagina
+
+    def texto(self, indice, recorte=None, **parametros):
+        return self._pagina(indice, recorte).extract_text(**parametros)
+
+    def palavras(self, indice, recorte=None, **parametros):
+        return self._pagina(indice, recorte).extract_words(**parametros)
+
+    def fechar(self):
+        self.pdf.close()
+
+
+class DocumentoPdfium(Documento):
+    """
+    Texto na ordem em que o pdfium o entrega. As palavras são montadas a partir da caixa de
+    cada caractere, agrupando por linha e pela distância horizontal como o ``extract_words``.
+    """
+
+    nome = "pdfium"
+
+    @staticmethod
+    def importar():
+        import pypdfium2
+        return pypdfium2
+
+    def __init__(self, caminho, senha=None):
+        pdfium = self.importar()
+        self.documento = pdfium.PdfDocument(caminho, password=senha)
+        self.versao = pdfium.version.PYPDFIUM_INFO.version
+        self._alturas = None
+
+    def __len__(self):
+        return len(self.documento)
+
+    def _pagina_de_texto(self, indice):
+        pagina = self.documento[indice]
+        return pagina, pagina.get_textpage()
+
+    def texto(self, indice, recorte=None, **parametros):
+        pagina, texto = self._pagina_de_texto(indice)
+        try:
+            if recorte is None:
+                bruto = texto.get_text_range()
+            else:
+                x0, top, x1, bottom = recorte
+                altura = pagina.get_height()
+                bruto = texto.get_text_bounded(left=x0, bottom=altura - bottom, right=x1, top=altura - top)
+            return bruto.replace("\r\n", "\n").replace("\r", "\n")
+        finally:
+            texto.close()
+            pagina.close()
+
+    def _deslocamento(self, indice):
+        """Soma das alturas das páginas anteriores (o doctop do pdfplumber)."""
+        if self._alturas is None:
+            self._alturas = [0.0]
+            for i in range(len(self.documento)):
+                pagina = self.documento[i]
+                self._alturas.append(self._alturas[-1] + pagina.get_height())
+                pagina.close()
+        return self._alturas[indice]
+
+    def _caracteres(self, pagina, texto, recorte):
+        import pypdfium2.raw as raw
+
+        altura = pagina.get_height()
+        conteudo = texto.get_text_range()
+        total = texto.count_chars()
+        caracteres = []
+        for i in range(total):
+            caractere = conteudo[i] if len(conteudo) == total else texto.get_text_range(i, 1)
+            if caractere in "\r\n":
+                continue  # Quebras de linha geradas pelo pdfium, sem caixa
+            x0, y0, x1, _ = texto.get_charbox(i, loose=True)
+            # Base da caixa "solta" (com a descida da fonte) e topo pelo tamanho da fonte, como no pdfminer
+            bottom = altura - y0
+            top = bottom - (raw.FPDFText_GetFontSize(texto.raw, i) or 0)
+            if recorte is not None and not (x0 >= recorte[0] and x1 <= recorte[2]
+                                            and top >= recorte[1] and bottom <= recorte[3]):
+                continue
+            caracteres.append((top, x0, x1, bottom, caractere))
+        return caracteres
+
+    def palavras(self, indice, recorte=None, x_tolerance=3, y_tolerance=3, keep_blank_chars=False, **parametros):
+        pagina, texto = self._pagina_de_texto(indice)
+        try:
+            caracteres = self._caracteres(pagina, texto, recorte)
+        finally:
+            texto.close()
+            pagina.close()
+        deslocamento = self._deslocamento(indice)
+
+        palavras, atual = [], []
+
+        def fechar_palavra():
+            if atual:
+                x0, top = min(c[1] for c in atual), min(c[0] for c in atual)
+                x1, bottom = max(c[2] for c in atual), max(c[3] for c in atual)
+                palavras.append({"text": "".join(c[4] for c in atual), "x0": x0, "x1": x1, "top": top,
+                                 "doctop": deslocamento + top, "bottom": bottom, "upright": True,
+                                 "height": bottom - top, "width": x1 - x0, "direction": "ltr"})
+                atual.clear()
+
+        for linha in _agrupar_por_top(caracteres, y_tolerance):
+            for caractere in sorted(linha, key=lambda c: c[1]):
+                if caractere[4].isspace() and not keep_blank_chars:
+                    fechar_palavra()
+                    continue
+                if atual and caractere[1] > atual[-1][2] + x_tolerance:
+                    fechar_palavra()
+                atual.append(caractere)
+            fechar_palavra()
+        return palavras
+
+    def fechar(self):
+        self.documento.close()
+
+
+def _agrupar_por_top(caracteres, tolerancia):
+    """Linhas de caracteres: um novo grupo começa quando o top se afasta mais que ``tolerancia`` do anterior."""
+    linhas, ultimo = [], None
+    for caractere in sorted(caracteres, key=lambda c: c[0]):
+        if ultimo is None or caractere[0] > ultimo + tolerancia:
+            linhas.append([])
+        linhas[-1].append(caractere)
+        ultimo = caractere[0]
+    return linhas
+
+
+class DocumentoPypdf2(Documento):
+    """Só o texto da página inteira: o PyPDF2 não dá a posição das palavras."""
+
+    nome = "pypdf2"
+    suporta_palavras = False
+    suporta_recorte = False
+
+    @staticmethod
+    def importar():
+        import PyPDF2
+        return PyPDF2
+
+    def __init__(self, caminho, senha=None):
+        pypdf2 = self.importar()
+        self.leitor = pypdf2.PdfReader(caminho)
+        self.protegido = self.leitor.is_encrypted
+        if self.protegido:
+            self.leitor.decrypt(senha or "")
+        self.versao = pypdf2.__version__
+
+    def __len__(self):
+        return len(self.leitor.pages)
+
+    def texto(self, indice, recorte=None, **parametros):
+        # Sem suporta_recorte, escolher() não entrega este motor a quem pede uma área
+        return self.leitor.pages[indice].extract_text()
+
+    def fechar(self):
+        pass
+
+
+MOTORES = {documento.nome: documento for documento in (DocumentoPdfplumber, DocumentoPdfium, DocumentoPypdf2)}
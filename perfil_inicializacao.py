@@ -0,0 +1,123 @@
+"""
+Medição do tempo de inicialização da interface (``Conversor.py --profile-startup``).
+
+Quando ativado, ``builtins.__import__`` passa a cronometrar cada módulo
+importado pela primeira vez, com o tempo próprio (sem os módulos que ele
+importou) e o acumulado, como o ``python -X importtime``, mas funcionando
+também no executável do PyInstaller. Marcos como "janela exibida" são
+registrados com ``marcar`` e o relatório sai no console ou, no executável
+sem console, num arquivo texto.
+
+Este módulo só usa a biblioteca padrão: é importado antes de tudo, para que
+as importações pesadas já sejam medidas.
+"""
+
+import builtins
+import importlib
+import importlib.util
+import os
+import sys
+import threading
+import time
+
+INICIO = time.perf_counter()
+MAX_MODULOS_NO_RELATORIO = 30
+
+_importar_original = None
+_local = threading.local()
+_trava = threading.Lock()
+_importacoes = []  # (módulo, próprio, acumulado, profundidade, thread)
+_marcos = []  # (rótulo, segundos desde o início)
+
+
+def ativo():
+    return _importar_original is not None
+
+
+def ativar():
+    """Passa a cronometrar as importações a partir deste ponto."""
+    global _importar_original
+    if _importar_original is None:
+        _importar_original = builtins.__import__
+        builtins.__import__ = _importar_medindo
+
+
+def _nome_absoluto(nome, globais, nivel):
+    if not nivel:
+        return nome
+    pacote = (globais or {}).get("__package__") or ""
+    try:
+        return importlib.util.resolve_name("." * nivel + nome, pacote)
+    except (ImportError, ValueError):
+        return None
+
+
+def _medir(nome, importar):
+    pilha = getattr(_local, "pilha", None)
+    if pilha is None:
+        pilha = _local.pilha = []
+    pilha.append(0.0)  # Tempo gasto nos módulos importados por este
+    inicio = time.perf_counter()
+    try:
+        return importar()
+    finally:
+        acumulado = time.perf_counter() - inicio
+        filhos = pilha.pop()
+        if pilha:
+            pilha[-1] += acumulado
+        with _trava:
+            _importacoes.append((nome, acumulado - filhos, acumulado, len(pilha), threading.current_thread().name))
+
+
+def _importar_medindo(nome, globais=None, locais=None, lista=(), nivel=0):
+    absoluto = _nome_absoluto(nome, globais, nivel)
+    if absoluto is None or absoluto in sys.modules:
+        return _importar_original(nome, globais, locais, lista, nivel)
+    return _medir(absoluto, lambda: _importar_original(nome, globais, locais, lista, nivel))
+
+
+def importar(nome):
+    """importlib.import_module, com o tempo registrado quando a medição estiver ativa."""
+    if not ativo() or nome in sys.modules:
+        return importlib.import_module(nome)
+    return _medir(nome, lambda: importlib.import_module(nome))
+
+
+def marcar(rotulo):
+    if ativo():
+        with _trava:
+            _marcos.append((rotulo, time.perf_counter() - INICIO))
+
+
+def relatorio(max_modulos=MAX_MODULOS_NO_RELATORIO):
+    with _trava:
+        importacoes, marcos = list(_importacoes), list(_marcos)
+
+    partes = ["Inicialização (segundos desde o início do Conversor.py):"]
+    partes.extend(f"  {segundos:7.3f}  {rotulo}" for rotulo, segundos in marcos)
+
+    por_thread = {}
+    for _, _, acumulado, profundidade, thread in importacoes:
+        if profundidade == 0:
+            por_thread[thread] = por_thread.get(thread, 0.0) + acumulado
+    partes.append("\nImportações por thread:")
+    partes.extend(f"  {segundos:7.3f}  {thread}" for thread, segundos in por_thread.items())
+
+    partes.append(f"\nMódulos mais lentos (de {len(importacoes)}), em ms:")
+    partes.append(f"  {'próprio':>9} {'acumulado':>10}  módulo")
+    for nome, proprio, acumulado, profundidade, thread in sorted(importacoes, key=lambda i: -i[1])[:max_modulos]:
+        partes.append(f"  {proprio * 1000:9.1f} {acumulado * 1000:10.1f}  {nome}  [{thread}]")
+    return "\n".join(partes)
+
+
+def mostrar_relatorio(pasta_alternativa):
+    """Imprime o relatório; sem console (executável sem janela de terminal), grava em pasta_alternativa."""
+    texto = relatorio()
+    if sys.stdout is not None:
+        print(texto, flush=True)
+        return None
+    os.makedirs(pasta_alternativa, exist_ok=True)
+    caminho = os.path.join(pasta_alternativa, "perfil_inicializacao.txt")
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        arquivo.write(texto + "\n")
+    return caminho
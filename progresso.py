@@ -0,0 +1,113 @@
+"""
+Progresso e cancelamento das conversões.
+
+Os conversores percorrem as páginas com ``acompanhar_paginas``. Quando a
+conversão é disparada pela interface, há um ``Progresso`` ativo na thread
+trabalhadora: cada página concluída é enviada para a fila da interface e o
+pedido de cancelamento é verificado entre uma página e outra. Fora da
+interface (execução direta, conversor_lote) as funções apenas repassam as
+páginas, sem custo adicional.
+"""
+
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+
+class ConversaoCancelada(BaseException):
+    """
+    Interrompe a conversão entre páginas. Herda de BaseException (como
+    KeyboardInterrupt) para não ser engolida pelos ``except Exception`` dos conversores.
+    """
+
+
+_local = threading.local()
+
+
+class Progresso:
+    """Estado de uma conversão em andamento, compartilhado entre a thread trabalhadora e a interface."""
+
+    def __init__(self, fila=None, intervalo=0.25):
+        self.fila = fila if fila is not None else queue.Queue()
+        # Intervalo mínimo entre mensagens, para que a interface não atrase a extração.
+        self.intervalo = intervalo
+        self.inicio = time.perf_counter()
+        self._cancelado = threading.Event()
+        self._ultimo_envio = 0.0
+
+    def cancelar(self):
+        self._cancelado.set()
+
+    @property
+    def cancelado(self):
+        return self._cancelado.is_set()
+
+    def verificar_cancelamento(self):
+        if self._cancelado.is_set():
+            raise ConversaoCancelada()
+
+    def reportar(self, concluidas, total, linhas=None, forcar=False):
+        agora = time.perf_counter()
+        if not forcar and agora - self._ultimo_envio < self.intervalo:
+            return
+        self._ultimo_envio = agora
+        self.fila.put(("progresso", {
+            "paginas": concluidas,
+            "total": total,
+            "linhas": linhas,
+            "tempo": agora - self.inicio,
+        }))
+
+
+@contextmanager
+def em_uso(progresso):
+    """Torna ``progresso`` o acompanhamento ativo da thread atual."""
+    anterior = getattr(_local, "atual", None)
+    _local.atual = progresso
+    try:
+        yield progresso
+    finally:
+        _local.atual = anterior
+
+
+def atual():
+    return getattr(_local, "atual", None)
+
+
+def verificar_cancelamento():
+    progresso = atual()
+    if progresso is not None:
+        progresso.verificar_cancelamento()
+
+
+def aguardar(futuro, intervalo=0.2):
+    """Espera o resultado de um processo trabalhador sem deixar de atender ao cancelamento pela interface."""
+    from concurrent.futures import FIRST_COMPLETED, wait
+
+    while not wait([futuro], timeout=intervalo, return_when=FIRST_COMPLETED).done:
+        verificar_cancelamento()
+    return futuro.result()
+
+
+def reportar_progresso(concluidas, total, linhas=None):
+    progresso = atual()
+    if progresso is not None:
+        progresso.reportar(concluidas, total, linhas, forcar=concluidas >= total)
+
+
+def acompanhar_paginas(paginas, linhas=None):
+    """
+    Percorre ``paginas`` reportando o progresso após cada uma.
+    ``linhas`` é, opcionalmente, a lista de transações que o conversor vai preenchendo.
+    """
+    progresso = atual()
+    if progresso is None:
+        yield from paginas
+        return
+
+    total = len(paginas)
+    for indice, pagina in enumerate(paginas, 1):
+        progresso.verificar_cancelamento()
+        yield pagina
+        progresso.reportar(indice, total, len(linhas) if linhas is not None else None, forcar=indice == total)
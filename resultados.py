@@ -0,0 +1,102 @@
+"""
+Resultados por arquivo das conversões com vários PDFs.
+
+Cada arquivo convertido vira um dict (arquivo, banco, status, linhas, paginas,
+saida, erro, tempo, calibracao), o mesmo formato usado pelo conversor_lote. A falha de um
+arquivo fica registrada no seu resultado e os demais continuam sendo
+processados; ao final, um único relatório consolidado é exibido.
+"""
+
+import os
+import time
+
+from progresso import verificar_cancelamento
+
+# Quantos arquivos com falha são listados na janela do relatório (o console recebe a lista completa)
+MAX_FALHAS_NA_JANELA = 15
+
+
+def novo_resultado(arquivo, banco=None):
+    return {"arquivo": arquivo, "banco": banco, "status": "ok", "linhas": None,
+            "paginas": 0, "saida": None, "erro": None, "tempo": 0.0, "calibracao": {}}
+
+
+def contar_paginas(pdf_path, senha=None):
+    import sessao_documento  # Aqui: a interface importa este módulo ao abrir, antes de precisar do pdfplumber
+
+    try:
+        with sessao_documento.abrir(pdf_path, senha) as sessao:
+            return len(sessao)
+    except Exception:
+        return 0
+
+
+def caminho_csv(pdf_path):
+    return os.path.splitext(pdf_path)[0] + ".csv"
+
+
+def converter_arquivo(funcao, pdf_path, banco=None, saida=caminho_csv):
+    """
+    Roda funcao(pdf_path), que devolve o DataFrame gerado (ou o número de linhas escritas) ou
+    levanta uma exceção, e devolve o resultado do arquivo. Só Exception é registrada como
+    falha: o cancelamento pela interface (ConversaoCancelada) continua interrompendo a conversão.
+    """
+    inicio = time.perf_counter()
+    resultado = novo_resultado(pdf_path, banco)
+    try:
+        resultado["paginas"] = contar_paginas(pdf_path)
+        saida_funcao = funcao(pdf_path)
+        resultado["linhas"] = saida_funcao if isinstance(saida_funcao, int) or saida_funcao is None else len(saida_funcao)
+        resultado["saida"] = saida(pdf_path) if saida else None
+    except Exception as e:
+        resultado["status"] = "falha"
+        resultado["erro"] = f"{type(e).__name__}: {e}"
+    resultado["tempo"] = time.perf_counter() - inicio
+    return resultado
+
+
+def converter_arquivos(funcao, caminhos, banco=None, saida=caminho_csv):
+    """Converte os arquivos em sequência, sem parar nas falhas, e devolve a lista de resultados."""
+    resultados = []
+    for pdf_path in caminhos:
+        verificar_cancelamento()
+        resultado = converter_arquivo(funcao, pdf_path, banco, saida)
+        if resultado["status"] != "ok":
+            print(f"[FALHA] {os.path.basename(pdf_path)}: {resultado['erro']}")
+        resultados.append(resultado)
+    return resultados
+
+
+def houve_sucesso(resultados):
+    return any(r["status"] == "ok" for r in resultados)
+
+
+def relatorio(resultados, max_falhas=None):
+    """Texto consolidado: totais e, para cada arquivo com falha, o erro."""
+    sucessos = [r for r in resultados if r["status"] == "ok"]
+    falhas = [r for r in resultados if r["status"] != "ok"]
+    linhas = sum(r["linhas"] or 0 for r in sucessos)
+    paginas = sum(r["paginas"] for r in resultados)
+    tempo = sum(r["tempo"] for r in resultados)
+
+    partes = [f"{len(resultados)} arquivo(s): {len(sucessos)} convertido(s), {len(falhas)} falha(s).",
+              f"{paginas} página(s), {linhas} linha(s) em {tempo:.1f}s."]
+    if falhas:
+        partes.append("\nArquivos com falha:")
+        listadas = falhas if max_falhas is None else falhas[:max_falhas]
+        partes.extend(f"- {os.path.basename(r['arquivo'])}: {r['erro']}" for r in listadas)
+        if len(listadas) < len(falhas):
+            partes.append(f"... e mais {len(falhas) - len(listadas)} arquivo(s) (lista completa no console).")
+    return "\n".join(partes)
+
+
+def mostrar_relatorio(resultados, titulo):
+    """Imprime o relatório completo e o mostra numa única janela ao final."""
+    from tkinter import messagebox
+
+    print(relatorio(resultados))
+    texto = relatorio(resultados, MAX_FALHAS_NA_JANELA)
+    if all(r["status"] == "ok" for r in resultados):
+        messagebox.showinfo(titulo, texto)
+    else:
+        messagebox.showwarning(titulo, texto)
@@ -0,0 +1,270 @@
+"""
+Sessão de leitura de um PDF: um único ``pdfplumber.open`` por arquivo, com o
+texto, as palavras e as tabelas de cada página memorizados.
+
+Numa mesma conversão, a mesma página costuma ser pedida mais de uma vez: os
+metadados leem a primeira página antes do laço principal, a calibração das
+colunas lê as primeiras páginas, o conversor em lote identifica o banco pela
+primeira página. Com a sessão, cada combinação (página, parâmetros) é extraída
+uma só vez (e passa pelo cache em disco de ``cache_paginas``).
+
+``percorrer()`` entrega as páginas em ordem, com progresso e cancelamento, e
+libera cada página (resultados memorizados e objetos do pdfplumber) assim que o
+laço passa para a seguinte, para a memória não crescer com o número de páginas.
+
+``abrir(caminho)`` reaproveita a sessão já aberta para o mesmo arquivo, com a
+mesma senha e o mesmo número de processos, na mesma thread: quem abre o PDF primeiro (o lote, por exemplo)
+compartilha a sessão com os metadados e o conversor.
+
+Extração em paralelo: ``percorrer(extrair=[("texto", {"x_tolerance": 2})])``
+declara o que o conversor vai pedir de cada página. Em PDFs grandes, essas
+extrações (a parte cara, a análise de layout do pdfplumber) rodam em processos
+trabalhadores, em blocos de páginas, e os resultados entram na memória da
+sessão na ordem das páginas. O conversor continua lendo uma página de cada vez,
+com o estado que carrega entre as páginas (a data corrente, por exemplo), e a
+saída é a mesma da leitura num só processo. Número de processos:
+``configurar(workers=...)`` ou a variável de ambiente ``CONVERSOR_WORKERS_PAGINAS``.
+Sem nenhum dos dois, a extração fica num só processo: o custo de abrir os
+processos no executável do PyInstaller ainda não foi medido.
+
+``texto`` e ``palavras`` aceitam ``motor`` (ver ``motores``): o conversor que
+tolera um motor mais rápido que o pdfplumber recebe o texto dele, memorizado
+do mesmo jeito.
+"""
+
+import itertools
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+import pdfplumber
+
+import cache_paginas
+import motores
+from progresso import acompanhar_paginas, aguardar
+
+# Abaixo disso, abrir os processos custa mais do que extrair as páginas num só
+MIN_PAGINAS_PARALELO = 24
+PAGINAS_POR_BLOCO = 4
+# Blocos enviados a cada processo antes de o conversor consumir o primeiro (limita a memória)
+BLOCOS_POR_PROCESSO = 2
+
+_config = {"workers": int(os.environ.get("CONVERSOR_WORKERS_PAGINAS", "0")) or 1}
+_local = threading.local()
+_pdf_do_processo = None  # PDF aberto em cada processo trabalhador
+
+
+def configurar(workers=None):
+    """Número de processos que extraem as páginas em ``percorrer`` (1 = tudo no processo atual)."""
+    if workers is not None:
+        _config["workers"] = max(1, workers)
+
+
+def _chave(tipo, recorte, parametros):
+    chave = (tipo, tuple(recorte) if recorte is not None else None, tuple(sorted(parametros.items())))
+    try:
+        hash(chave)
+    except TypeError:
+        return None  # Parâmetros mutáveis (listas em extra_attrs...): sem memorização
+    return chave
+
+
+def _extrair(pagina, tipo, parametros):
+    if tipo == "texto":
+        return cache_paginas.texto(pagina, **parametros)
+    if tipo == "palavras":
+        return cache_paginas.palavras(pagina, **parametros)
+    return pagina.extract_tables(**parametros)
+
+
+def _abrir_no_processo(caminho, senha):
+    global _pdf_do_processo
+    _pdf_do_processo = pdfplumber.open(caminho, password=senha)
+
+
+def _extrair_bloco(inicio, fim, pedidos):
+    """No processo trabalhador: {chave: resultado} de cada página do bloco, em ordem."""
+    resultados = []
+    for indice in range(inicio, fim):
+        pagina = _pdf_do_processo.pages[indice]
+        resultados.append({_chave(tipo, None, parametros): _extrair(pagina, tipo, parametros)
+                           for tipo, parametros in pedidos})
+        pagina.close()
+    return resultados
+
+
+class SessaoDocumento:
+    """Um PDF aberto, com as extrações de cada página memorizadas até a página ser liberada."""
+
+    def __init__(self, origem, senha=None, workers=None):
+        if hasattr(origem, "pages"):
+            # PDF já aberto pelo chamador: a sessão não o fecha
+            self.pdf, self._fechar_pdf = origem, False
+            self.caminho = str(origem.path) if getattr(origem, "path", None) else None
+        else:
+            self.pdf, self._fechar_pdf = pdfplumber.open(origem, password=senha), True
+            self.caminho = os.path.abspath(origem)
+        self.senha = senha
+        self.workers = workers
+        self._documentos = {}  # motor -> documento aberto por ele (motores)
+        self._memoria = {}  # número da página -> {(tipo, recorte, parâmetros): resultado}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *erro):
+        self.fechar()
+
+    def fechar(self):
+        self._memoria.clear()
+        for documento in self._documentos.values():
+            if documento is not None:
+                documento.fechar()
+        self._documentos.clear()
+        if self._fechar_pdf:
+            self.pdf.close()
+
+    @property
+    def paginas(self):
+        return self.pdf.pages
+
+    def __len__(self):
+        return len(self.pdf.pages)
+
+    def pagina(self, pagina):
+        """Aceita a página do pdfplumber ou o índice dela (0 é a primeira)."""
+        return self.pdf.pages[pagina] if isinstance(pagina, int) else pagina
+
+    def _memorizado(self, pagina, tipo, recorte, parametros, calcular):
+        chave = _chave(tipo, recorte, parametros)
+        if chave is None:
+            return calcular()
+        memoria = self._memoria.setdefault(pagina.page_number, {})
+        if chave not in memoria:
+            memoria[chave] = calcular()
+        return memoria[chave]
+
+    def _documento(self, motor):
+        """O mesmo arquivo aberto por outro motor de extração (ver ``motores``), ou None."""
+        if motor not in self._documentos:
+            self._documentos[motor] = motores.abrir(motor, self.caminho, self.senha) if self.caminho else None
+        return self._documentos[motor]
+
+    def _extrair_com_motor(self, pagina, tipo, recorte, parametros, motor, calcular):
+        """Extração pelo pdfplumber (``calcular``) ou, com ``motor``, pelo motor escolhido pelo conversor."""
+        if not motor or motor == motores.REFERENCIA or self._documento(motor) is None:
+            return self._memorizado(pagina, tipo, recorte, parametros, calcular)
+        documento = self._documento(motor)
+        extrair = documento.texto if tipo == "texto" else documento.palavras
+        return self._memorizado(pagina, tipo, recorte, dict(parametros, motor=motor),
+                                lambda: extrair(pagina.page_number - 1, recorte, **parametros))
+
+    def texto(self, pagina, recorte=None, motor=None, **parametros):
+        """``extract_text(**parametros)`` da página (ou da área ``recorte``), ou o texto do ``motor`` indicado."""
+        pagina = self.pagina(pagina)
+        return self._extrair_com_motor(pagina, "texto", recorte, parametros, motor,
+                                       lambda: cache_paginas.texto(pagina, recorte=recorte, **parametros))
+
+    def palavras(self, pagina, recorte=None, motor=None, **parametros):
+        """``extract_words(**parametros)`` da página (ou da área ``recorte``), ou as palavras do ``motor`` indicado."""
+        pagina = self.pagina(pagina)
+        return self._extrair_com_motor(pagina, "palavras", recorte, parametros, motor,
+                                       lambda: cache_paginas.palavras(pagina, recorte=recorte, **parametros))
+
+    def tabelas(self, pagina, **parametros):
+        """``extract_tables(**parametros)`` da página."""
+        pagina = self.pagina(pagina)
+        return self._memorizado(pagina, "tabelas", None, parametros, lambda: _extrair(pagina, "tabelas", parametros))
+
+    def liberar(self, pagina):
+        """Descarta o que foi memorizado da página e os objetos que o pdfplumber guarda dela."""
+        pagina = self.pagina(pagina)
+        self._memoria.pop(pagina.page_number, None)
+        pagina.close()
+
+    def percorrer(self, resultado=None, extrair=()):
+        """
+        Páginas em ordem, via ``acompanhar_paginas`` (``resultado`` é a lista cujo tamanho
+        aparece no progresso). Cada página é liberada quando o laço avança ou é interrompido.
+
+        ``extrair`` lista os pares (tipo, parâmetros) que o conversor vai pedir de cada página
+        (tipo "texto", "palavras" ou "tabelas"); em PDFs grandes eles são extraídos em paralelo.
+        """
+        extraidas = self._extrair_em_paralelo(extrair)
+        try:
+            for pagina in acompanhar_paginas(self.pdf.pages, resultado):
+                if extraidas is not None:
+                    memoria = self._memoria.setdefault(pagina.page_number, {})
+                    for chave, valor in next(extraidas).items():
+                        memoria.setdefault(chave, valor)
+                try:
+                    yield pagina
+                finally:
+                    self.liberar(pagina)
+        finally:
+            if extraidas is not None:
+                extraidas.close()
+
+    def _extrair_em_paralelo(self, extrair):
+        """Gerador com as extrações de cada página, na ordem, ou None se não valer a pena paralelizar."""
+        # Os outros motores (pdfium...) já são rápidos o bastante para extrair aqui mesmo
+        pedidos = [(tipo, {nome: valor for nome, valor in parametros.items() if nome != "motor"})
+                   for tipo, parametros in extrair
+                   if _chave(tipo, None, parametros) is not None
+                   and parametros.get("motor", motores.REFERENCIA) == motores.REFERENCIA]
+        workers = self.workers or _config["workers"]
+        total = len(self.pdf.pages)
+        # Só PDFs abertos pela sessão: os processos precisam reabrir o arquivo do mesmo jeito
+        if not pedidos or workers <= 1 or total < MIN_PAGINAS_PARALELO or not self._fechar_pdf:
+            return None
+        return self._extracoes(pedidos, min(workers, -(-total // PAGINAS_POR_BLOCO)), total)
+
+    def _extracoes(self, pedidos, workers, total):
+        blocos = ((inicio, min(inicio + PAGINAS_POR_BLOCO, total)) for inicio in range(0, total, PAGINAS_POR_BLOCO))
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_abrir_no_processo,
+                                       initargs=(self.caminho, self.senha))
+        try:
+            pendentes = deque(executor.submit(_extrair_bloco, inicio, fim, pedidos)
+                              for inicio, fim in itertools.islice(blocos, workers * BLOCOS_POR_PROCESSO))
+            while pendentes:
+                paginas = aguardar(pendentes.popleft())
+                for inicio, fim in itertools.islice(blocos, 1):
+                    pendentes.append(executor.submit(_extrair_bloco, inicio, fim, pedidos))
+                yield from paginas
+        finally:
+            # Em erro ou cancelamento, os blocos que ainda não começaram são descartados
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _sessoes_abertas():
+    abertas = getattr(_local, "sessoes", None)
+    if abertas is None:
+        abertas = _local.sessoes = {}
+    return abertas
+
+
+@contextmanager
+def abrir(caminho, senha=None, workers=None):
+    """
+    Sessão do arquivo: a que já estiver aberta nesta thread com a mesma senha e os mesmos
+    ``workers`` (por um ``abrir`` mais externo) ou uma nova, fechada ao sair do bloco mais externo.
+    """
+    abertas = _sessoes_abertas()
+    chave = (os.path.abspath(caminho), senha, workers)
+    sessao = abertas.get(chave)
+    if sessao is not None:
+        yield sessao
+        return
+    with SessaoDocumento(caminho, senha, workers) as sessao:
+        abertas[chave] = sessao
+        try:
+            yield sessao
+        finally:
+            del abertas[chave]
+
+
+def sessao_de(pdf):
+    """Sessão para um PDF que pode ser uma SessaoDocumento ou um PDF do pdfplumber já aberto."""
+    return pdf if isinstance(pdf, SessaoDocumento) else SessaoDocumento(pdf)
@@ -0,0 +1,56 @@
+import pdfplumber
+import pytest
+
+import cache_paginas
+import colunas
+from benchmarks import extratos_sinteticos
+
+LIMITES = [75, 480]
+OPCOES = {"x_tolerance": 2, "y_tolerance": 2, "keep_blank_chars": True}
+
+
+@pytest.fixture(scope="module")
+def paginas(tmp_path_factory):
+    caminho = tmp_path_factory.mktemp("extratos") / "banestes.pdf"
+    extratos_sinteticos.gerar("banestes", str(caminho), 3)
+    with pdfplumber.open(caminho) as pdf:
+        yield pdf.pages
+
+
+@pytest.fixture
+def cache_ligado(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_paginas, "_config", dict(cache_paginas._config))
+    cache_paginas.configurar(ativo=True, pasta=str(tmp_path))
+
+
+def test_layout_no_lugar_nao_e_deslocado(paginas):
+    limites, calibracao = colunas.limites_calibrados(paginas, LIMITES, **OPCOES)
+    assert limites == LIMITES
+    assert calibracao == {"deslocamento": 0, "aplicado": False}
+
+
+def test_deslocamento_dentro_da_tolerancia_e_aplicado(paginas):
+    deslocados = [limite + 10 for limite in LIMITES]
+    limites, calibracao = colunas.limites_calibrados(paginas, deslocados, **OPCOES)
+    assert calibracao["aplicado"]
+    assert 0 < -calibracao["deslocamento"] <= colunas.TOLERANCIA_DESLOCAMENTO
+    assert limites == [limite + calibracao["deslocamento"] for limite in deslocados]
+
+
+def test_deslocamento_acima_da_tolerancia_so_e_relatado(paginas):
+    deslocados = [limite + 10 for limite in LIMITES]
+    limites, calibracao = colunas.limites_calibrados(paginas, deslocados, tolerancia=5, **OPCOES)
+    assert not calibracao["aplicado"]
+    assert calibracao["deslocamento"] < -5
+    assert limites == deslocados
+
+
+def test_deslocamento_fica_no_cache_de_paginas(paginas, cache_ligado, monkeypatch):
+    deslocados = [limite + 10 for limite in LIMITES]
+    _, calibracao = colunas.limites_calibrados(paginas, deslocados, **OPCOES)
+
+    def sem_calibracao(*args):
+        raise AssertionError("o deslocamento deveria vir do cache")
+
+    monkeypatch.setattr(colunas, "_deslocamento_calibrado", sem_calibracao)
+    assert colunas.limites_calibrados(paginas, deslocados, **OPCOES)[1] == calibracao
@@ -0,0 +1,145 @@
+import contextlib
+import io
+import random
+import re
+import time
+
+import pandas as pd
+import pytest
+
+import conversor_caixa
+
+DATA = r'\d{2}/\d{2}/\d{4}'
+
+# Padrões e laço de extract_transactions_from_text antes da versão em tempo linear
+PADROES_ORIGINAIS = [
+    rf'({DATA})\s+(\d+|\w+)\s+(.*?)\s+([\d\.,]+\s*[DC]?)\s+([\d\.,]+\s*[DC]?)',
+    rf'({DATA})\s+(.*?)\s+([\d\.,]+\s*[DC]?)\s+([\d\.,]+\s*[DC]?)',
+    rf'({DATA})(.+)',
+]
+PALAVRAS_IGNORADAS = ["SALDO DIA", "SALDO ANTERIOR", "TOTAL", "Data Mov", "Histórico", "Valor"]
+
+PECAS = ["01/02/2024", "31/12/2023", "12/12/2024/12/2024", "1.234,56", "12,00", "7", "0,5", ".", ",",
+         "D", "C", "DC", "123456", "12ab", "PIX", "TED", "RECEBIDO", "JOSÉ", "SALDO DIA", "TOTAL", "/",
+         "-", "R$", "ç", "_x"]
+ESPACOS = ["", " ", " ", "  ", "\t", "   "]
+
+
+def extrair_original(linhas):
+    transacoes = []
+    for linha in linhas:
+        linha = linha.strip()
+        if not linha or not re.search(DATA, linha):
+            continue
+        for indice, padrao in enumerate(PADROES_ORIGINAIS):
+            match = re.search(padrao, linha)
+            if not match:
+                continue
+            if indice == 0:
+                data, descricao, saldo = match.group(1), match.group(3).strip(), match.group(5).strip()
+            elif indice == 1:
+                data, descricao, saldo = match.group(1), match.group(2).strip(), match.group(4).strip()
+            else:
+                data, resto = match.group(1), match.group(2).strip()
+                saldo_match = re.search(r'([\d\.,]+\s*[DC]?)\s*$', resto)
+                if saldo_match:
+                    saldo = saldo_match.group(1).strip()
+                    descricao = resto.rsplit(saldo, 1)[0].strip()
+                else:
+                    descricao, saldo = resto, "Não identificado"
+            if any(palavra in descricao for palavra in PALAVRAS_IGNORADAS):
+                continue
+            transacoes.append({'Data': data, 'Histórico': descricao, 'Saldo': saldo})
+            break
+    return transacoes
+
+
+def linha_aleatoria(aleatorio):
+    pecas = [aleatorio.choice(PECAS) for _ in range(aleatorio.randint(1, 12))]
+    if aleatorio.random() < 0.8:
+        pecas.insert(aleatorio.randint(0, min(2, len(pecas))), aleatorio.choice(PECAS[:3]))
+    return "".join(peca + aleatorio.choice(ESPACOS) for peca in pecas)
+
+
+@pytest.mark.parametrize("semente", range(5))
+def test_mesmo_resultado_dos_padroes_originais(semente):
+    aleatorio = random.Random(semente)
+    linhas = [linha_aleatoria(aleatorio) for _ in range(2000)]
+    assert conversor_caixa.extract_transactions_from_lines(linhas, DATA) == extrair_original(linhas)
+
+
+def test_linha_longa_e_mantida():
+    historico = " ".join(["PAGAMENTO REFERENTE AO CONTRATO 12345"] * 20)
+    linha = f"05/03/2024 000123 {historico} 1.500,00 D 8.250,75 C"
+    assert len(linha) > 500
+    assert conversor_caixa.extract_transactions_from_lines([linha], DATA) == extrair_original([linha])
+
+
+def test_linha_de_lixo_em_tempo_linear():
+    # Com as regex de (.*?), a primeira levava ~1s e a segunda (3000 espaços) mais de um minuto
+    linhas = ["01/01/2024 a " * 20000, "01/01/2024 " + " " * 50000 + "1 x", "1" * 50000 + " 01/01/2024 " + "9" * 50000]
+    inicio = time.perf_counter()
+    transacoes = conversor_caixa.extract_transactions_from_lines(linhas, DATA)
+    assert time.perf_counter() - inicio < 2
+    assert len(transacoes) == 3
+
+
+# Caracteres que aparecem (ou podem aparecer por engano) na coluna de saldo
+ALFABETO_SALDO = "0123456789.,-+DC dcXã"
+
+
+def saldo_aleatorio(aleatorio):
+    sorteio = aleatorio.random()
+    if sorteio < 0.5:
+        # Valor bem formado, com separador de milhar e indicador D/C
+        inteiro = f"{aleatorio.randint(0, 9999999):,}".replace(',', '.')
+        valor = f"{inteiro},{aleatorio.randint(0, 99):02d}"
+        return aleatorio.choice(['', '-', '+']) + valor + aleatorio.choice(['', 'D', ' D', 'C', ' C', '-'])
+    if sorteio < 0.6:
+        return aleatorio.choice(['', ' ', 'Não identificado', 'D', 'C', '-', ',', '.'])
+    if sorteio < 0.7:
+        # Sem vírgula: o ponto é o separador decimal
+        return f"{aleatorio.uniform(0, 99999):.{aleatorio.randint(0, 3)}f}" + aleatorio.choice(['', 'D', 'C'])
+    return ''.join(aleatorio.choice(ALFABETO_SALDO) for _ in range(aleatorio.randint(0, 10)))
+
+
+def data_aleatoria(aleatorio, formato):
+    dia, mes, ano = aleatorio.randint(1, 31), aleatorio.randint(1, 12), aleatorio.randint(1990, 2035)
+    if aleatorio.random() < 0.05:
+        mes = aleatorio.randint(13, 99)  # data inválida
+    if aleatorio.random() < 0.03:
+        return aleatorio.choice(['', ' ', 'lixo'])
+    return formato.replace('%d', f"{dia:02d}").replace('%m', f"{mes:02d}").replace('%Y', f"{ano:04d}")
+
+
+def iguais(a, b):
+    return a.dtype == b.dtype and a.equals(b)
+
+
+@pytest.mark.parametrize("semente", range(3))
+def test_clean_monetary_values_igual_a_clean_monetary_value(semente):
+    aleatorio = random.Random(semente)
+    for _ in range(300):
+        saldos = pd.Series([saldo_aleatorio(aleatorio) for _ in range(aleatorio.randint(1, 30))])
+        with contextlib.redirect_stdout(io.StringIO()):
+            esperado = saldos.apply(conversor_caixa.clean_monetary_value)
+        obtido, invalidos = conversor_caixa.clean_monetary_values(saldos)
+        assert iguais(esperado, obtido), pd.DataFrame({'entrada': saldos, 'por_linha': esperado, 'vetorizada': obtido})
+        assert invalidos.tolist() == esperado.isna().tolist()
+
+
+@pytest.mark.parametrize("padrao", list(conversor_caixa.DATE_FORMATS) + [None])
+def test_parse_dates_igual_a_parse_date(padrao):
+    aleatorio = random.Random(str(padrao))
+    for _ in range(200):
+        formato = conversor_caixa.DATE_FORMATS.get(padrao) or aleatorio.choice(conversor_caixa.FALLBACK_DATE_FORMATS)
+        datas = pd.Series([data_aleatoria(aleatorio, formato) for _ in range(aleatorio.randint(1, 30))])
+        obtido, invalidas = conversor_caixa.parse_dates(datas, padrao)
+        with contextlib.redirect_stdout(io.StringIO()):
+            try:
+                esperado = datas.apply(lambda data: conversor_caixa.parse_date(data, padrao))
+            except ValueError:
+                # Com o formato conhecido, parse_date levantava exceção e as datas ficavam como texto
+                assert padrao in conversor_caixa.DATE_FORMATS and invalidas.any()
+                continue
+        assert iguais(esperado, obtido), pd.DataFrame({'entrada': datas, 'por_linha': esperado, 'vetorizada': obtido})
@@ -0,0 +1,30 @@
+import pytest
+
+import cache_paginas
+import conversor_itau
+from benchmarks import extratos_sinteticos
+
+
+@pytest.fixture(scope="module")
+def extrato(tmp_path_factory):
+    caminho = tmp_path_factory.mktemp("extratos") / "itau.pdf"
+    extratos_sinteticos.gerar("itau", str(caminho), 3)
+    return str(caminho)
+
+
+@pytest.fixture
+def cache_ligado(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_paginas, "_config", dict(cache_paginas._config))
+    cache_paginas.configurar(ativo=True, pasta=str(tmp_path))
+
+
+def test_paginas_detectadas_ficam_no_cache_de_paginas(extrato, cache_ligado, monkeypatch):
+    extrator = conversor_itau.PDFTableExtractor(extrato, conversor_itau.DEFAULT_CONFIGS)
+    paginas = extrator.detect_transaction_pages()
+    assert paginas == ["1", "2", "3"]
+
+    def sem_varredura():
+        raise AssertionError("as páginas deveriam vir do cache")
+
+    monkeypatch.setattr(extrator, "scan_pages", sem_varredura)
+    assert extrator.detect_transaction_pages() == paginas
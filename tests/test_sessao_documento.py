@@ -0,0 +1,44 @@
+import importlib
+
+import pytest
+
+import sessao_documento
+from benchmarks import extratos_sinteticos
+
+
+@pytest.fixture(scope="module")
+def extrato(tmp_path_factory):
+    caminho = tmp_path_factory.mktemp("extratos") / "stone.pdf"
+    extratos_sinteticos.gerar("stone", str(caminho), 2)
+    return str(caminho)
+
+
+def test_abrir_reaproveita_a_sessao_do_mesmo_arquivo(extrato):
+    with sessao_documento.abrir(extrato) as externa:
+        with sessao_documento.abrir(extrato) as interna:
+            assert interna is externa
+
+
+def test_abrir_com_outra_senha_abre_outra_sessao(extrato):
+    with sessao_documento.abrir(extrato) as externa:
+        with sessao_documento.abrir(extrato, "1234") as interna:
+            assert interna is not externa
+            assert interna.senha == "1234"
+        with sessao_documento.abrir(extrato) as de_novo:
+            assert de_novo is externa
+
+
+def test_abrir_com_outro_numero_de_processos_abre_outra_sessao(extrato):
+    with sessao_documento.abrir(extrato) as externa:
+        with sessao_documento.abrir(extrato, workers=4) as interna:
+            assert interna is not externa
+            assert interna.workers == 4
+
+
+def test_extracao_em_um_so_processo_por_padrao(monkeypatch):
+    monkeypatch.delenv("CONVERSOR_WORKERS_PAGINAS", raising=False)
+    modulo = importlib.reload(sessao_documento)
+    try:
+        assert modulo._config["workers"] == 1
+    finally:
+        importlib.reload(sessao_documento)